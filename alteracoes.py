@@ -0,0 +1,59 @@
+# Comparação entre duas versões da mesma planilha
+# Quando o professor envia de novo a planilha corrigida, as linhas são comparadas pelo
+# "Numero": o registro de alterações mostra quem entrou, quem saiu e cada nota corrigida,
+# e os índices só são recalculados para os estudantes e disciplinas que mudaram.
+import numpy as np
+import pandas as pd
+
+COLUNAS_REGISTRO = ["Numero", "Nome", "Disciplina", "Antes", "Depois"]
+
+
+# Compara a planilha anterior com a nova. "incremental" indica se a nova pode ser
+# aplicada sobre os índices da anterior (mesmas colunas e mesma sequência de "Numero");
+# caso contrário os índices são recalculados por completo.
+def comparar_planilhas(anterior, nova):
+    numeros_anteriores = pd.Index(anterior["Numero"])
+    numeros_novos = pd.Index(nova["Numero"])
+    disciplinas = [coluna for coluna in nova.columns if coluna not in ("Numero", "Nome")]
+    mesmas_colunas = list(anterior.columns) == list(nova.columns)
+
+    # Notas alteradas dos estudantes presentes nas duas versões (comparação por "Numero")
+    em_comum = numeros_novos.intersection(numeros_anteriores, sort=False)
+    registro = pd.DataFrame(columns=COLUNAS_REGISTRO)
+    comuns = [d for d in disciplinas if d in anterior.columns]
+    if len(em_comum) and comuns and numeros_anteriores.is_unique and numeros_novos.is_unique:
+        antes = anterior.set_index("Numero").loc[em_comum, comuns].to_numpy(dtype=np.float64)
+        depois = nova.set_index("Numero").loc[em_comum, comuns].to_numpy(dtype=np.float64)
+        alteradas = ~((antes == depois) | (np.isnan(antes) & np.isnan(depois)))
+        linhas, colunas = np.nonzero(alteradas)
+        nomes = nova.set_index("Numero").loc[em_comum, "Nome"].astype(str).to_numpy(dtype=object)
+        registro = pd.DataFrame({
+            "Numero": np.asarray(em_comum)[linhas],
+            "Nome": nomes[linhas],
+            "Disciplina": np.asarray(comuns, dtype=object)[colunas],
+            "Antes": antes[linhas, colunas],
+            "Depois": depois[linhas, colunas],
+        })
+
+    return {
+        "incremental": mesmas_colunas and numeros_anteriores.equals(numeros_novos),
+        "registro": registro,
+        "adicionados": numeros_novos.difference(numeros_anteriores, sort=False).tolist(),
+        "removidos": numeros_anteriores.difference(numeros_novos, sort=False).tolist(),
+        "colunas_adicionadas": [c for c in nova.columns if c not in anterior.columns],
+        "colunas_removidas": [c for c in anterior.columns if c not in nova.columns],
+    }
+
+
+# Resumo em texto do registro de alterações
+def resumo_alteracoes(comparacao):
+    partes = [f"{len(comparacao['registro'])} nota(s) alterada(s)"]
+    if len(comparacao["registro"]):
+        partes[0] += f" de {comparacao['registro']['Numero'].nunique()} estudante(s)"
+    if comparacao["adicionados"]:
+        partes.append(f"{len(comparacao['adicionados'])} estudante(s) incluído(s)")
+    if comparacao["removidos"]:
+        partes.append(f"{len(comparacao['removidos'])} estudante(s) removido(s)")
+    if comparacao["colunas_adicionadas"] or comparacao["colunas_removidas"]:
+        partes.append("colunas alteradas")
+    return ", ".join(partes)
@@ -0,0 +1,315 @@
+# Motor de análise das notas
+# Funções puras sobre a matriz de notas (estudantes x disciplinas, NaN = nota em branco):
+# estatísticas da turma, rankings, percentis, perfil de um estudante, matriz de comparação,
+# distâncias entre estudantes e os parâmetros das curvas normais. Não dependem do Streamlit
+# nem de DataFrames, e por isso podem ser memorizadas, medidas nos benchmarks e usadas em
+# relatórios em lote.
+import warnings
+
+import numpy as np
+
+COLUNA_FINAL = "Final score"
+PONTOS_CURVA = 100
+SIGMAS = np.arange(-3, 4)  # De -3σ a +3σ
+PASSOS_CURVA = np.linspace(-4, 4, PONTOS_CURVA)  # Grade padronizada: de média - 4σ a média + 4σ
+RAIZ_2PI = np.sqrt(2 * np.pi)
+# Densidade da normal padrão tabelada nos pontos da grade e nos desvios: para N(média, σ)
+# nos pontos média + z·σ basta dividir a tabela por σ
+DENSIDADE_PASSOS = np.exp(-0.5 * PASSOS_CURVA ** 2) / RAIZ_2PI
+DENSIDADE_SIGMAS = np.exp(-0.5 * SIGMAS ** 2) / RAIZ_2PI
+FAIXAS_HISTOGRAMA = np.linspace(0, 10, 21)  # Faixas de 0.5 ponto entre 0 e 10
+AMPLITUDE_CERCAS = 1.5  # Cercas de Tukey: 1,5 x intervalo interquartil
+
+
+# Densidade da normal em x, pela fórmula fechada (mesmo resultado de scipy.stats.norm.pdf,
+# sem importar o scipy na partida do app); NaN quando o desvio não é positivo
+def densidade_normal(x, media, desvio):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (np.asarray(x, dtype=np.float64) - media) / desvio
+        return np.where(np.asarray(desvio) > 0, np.exp(-0.5 * z * z) / (RAIZ_2PI * desvio), np.nan)
+
+
+# Densidade nos pontos de uma tabela padronizada para um desvio ou um array de desvios
+# (uma linha por desvio); NaN quando o desvio não é positivo
+def densidade_tabelada(tabela, desvios):
+    desvios = np.asarray(desvios, dtype=np.float64)[..., None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(desvios > 0, tabela / desvios, np.nan)
+
+
+# Calcula, em uma única passada NumPy sobre a matriz de notas (estudantes x disciplinas),
+# média, desvio padrão, curva normal e linhas de desvio padrão de todas as disciplinas
+def parametros_normais(matriz):
+    matriz = np.asarray(matriz, dtype=np.float64)
+    validas = ~np.isnan(matriz)
+    contagens = validas.sum(axis=0)
+    somas = np.where(validas, matriz, 0.0).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        medias = somas / contagens
+    m2 = np.where(validas, (matriz - medias) ** 2, 0.0).sum(axis=0)
+    return curvas_normais(contagens, medias, m2)
+
+
+# Desvio padrão (amostral), curvas normais e linhas de desvio padrão a partir dos momentos
+# de cada disciplina (contagem, média e soma dos quadrados dos desvios "m2")
+def curvas_normais(contagens, medias, m2):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        desvios = np.sqrt(m2 / (contagens - 1))
+
+    # Grade de 100 pontos entre média - 4σ e média + 4σ para cada disciplina
+    x_curvas = medias[:, None] + PASSOS_CURVA[None, :] * desvios[:, None]
+    y_curvas = densidade_tabelada(DENSIDADE_PASSOS, desvios)
+
+    x_sigmas = medias[:, None] + SIGMAS[None, :] * desvios[:, None]
+    y_sigmas = densidade_tabelada(DENSIDADE_SIGMAS, desvios)
+
+    return {
+        "contagens": contagens,
+        "medias": medias,
+        "m2": m2,
+        "desvios": desvios,
+        "x_curvas": x_curvas,
+        "y_curvas": y_curvas,
+        "x_sigmas": x_sigmas,
+        "y_sigmas": y_sigmas,
+    }
+
+
+# Contagem, média e m2 de cada coluna de um lote de valores (NaN = sem valor)
+def _momentos_lote(valores):
+    validas = ~np.isnan(valores)
+    contagens = validas.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        medias = np.where(validas, valores, 0.0).sum(axis=0) / contagens
+    m2 = np.where(validas, (valores - medias) ** 2, 0.0).sum(axis=0)
+    return contagens, np.where(contagens > 0, medias, 0.0), m2
+
+
+# Atualiza os momentos por disciplina (contagem, média, m2) sem percorrer a turma inteira:
+# retira as notas antigas e acrescenta as novas em lote (fórmulas de Welford/Chan para
+# combinar e separar momentos). "removidas" e "adicionadas" são matrizes com NaN onde
+# não há nota a retirar/acrescentar.
+def atualizar_momentos(contagens, medias, m2, removidas, adicionadas):
+    contagens = np.asarray(contagens, dtype=np.float64)
+    medias = np.where(contagens > 0, medias, 0.0)
+    m2 = np.where(contagens > 0, m2, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Retirada: separa o lote "b" do conjunto "a"
+        n_b, media_b, m2_b = _momentos_lote(np.asarray(removidas, dtype=np.float64))
+        n = contagens - n_b
+        media = np.where(n > 0, (contagens * medias - n_b * media_b) / n, 0.0)
+        delta = media_b - media
+        m2 = np.where(n > 0, m2 - m2_b - delta ** 2 * n * n_b / contagens, 0.0)
+        contagens, medias = n, media
+
+        # Inclusão: combina o lote "b" com o conjunto "a"
+        n_b, media_b, m2_b = _momentos_lote(np.asarray(adicionadas, dtype=np.float64))
+        n = contagens + n_b
+        delta = media_b - medias
+        media = np.where(n > 0, medias + delta * n_b / n, np.nan)
+        m2 = np.where(n > 0, m2 + m2_b + delta ** 2 * contagens * n_b / n, 0.0)
+    return n.astype(np.int64), media, np.maximum(m2, 0.0)
+
+
+# Estatísticas por disciplina: curvas normais, mediana e quantis (mín, Q1, mediana, Q3, máx)
+def estatisticas_turma(matriz):
+    matriz = np.asarray(matriz, dtype=np.float64)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # Disciplinas sem nenhuma nota
+        estatisticas = parametros_normais(matriz)
+        estatisticas["quantis"] = np.nanpercentile(matriz, [0, 25, 50, 75, 100], axis=0)
+    estatisticas["medianas"] = estatisticas["quantis"][2]
+    return estatisticas
+
+
+# Notas só das disciplinas (sem a coluna Final score, que é derivada delas)
+def sem_final(matriz, disciplinas):
+    colunas = [j for j, disciplina in enumerate(disciplinas) if disciplina != COLUNA_FINAL]
+    return np.asarray(matriz, dtype=np.float64)[:, colunas]
+
+
+# Média de cada estudante nas disciplinas (sem o Final score)
+def medias_estudantes(matriz, disciplinas):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # Estudantes sem nenhuma nota
+        return np.nanmean(sem_final(matriz, disciplinas), axis=1)
+
+
+# Histogramas de todas as disciplinas de uma vez: faixa de cada nota + contagem por coluna
+def histogramas(matriz, faixas=FAIXAS_HISTOGRAMA):
+    matriz = np.asarray(matriz, dtype=np.float64)
+    n_faixas = len(faixas) - 1
+    n_disciplinas = matriz.shape[1]
+    indices = np.clip(np.searchsorted(faixas, matriz, side="right") - 1, 0, n_faixas - 1)
+    indices = np.where(np.isnan(matriz), n_faixas, indices)
+    deslocamento = np.arange(n_disciplinas) * (n_faixas + 1)
+    return np.bincount(
+        (indices + deslocamento).ravel(), minlength=n_disciplinas * (n_faixas + 1)
+    ).reshape(n_disciplinas, n_faixas + 1)[:, :n_faixas]
+
+
+# Resumo do boxplot de cada disciplina a partir dos quartis (os já calculados no índice,
+# se informados): q1, mediana, q3, cercas (nota mais extrema dentro de 1,5 x o intervalo
+# interquartil, como no Plotly) e os outliers agrupados por valor (valores, quantidades).
+# O tamanho do resumo não depende do número de estudantes.
+def resumo_boxplot(matriz, quantis=None):
+    matriz = np.asarray(matriz, dtype=np.float64)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # Disciplinas sem nenhuma nota
+        if quantis is None:
+            quantis = np.nanpercentile(matriz, [0, 25, 50, 75, 100], axis=0)
+        q1, q3 = quantis[1], quantis[3]
+        amplitude = AMPLITUDE_CERCAS * (q3 - q1)
+        dentro = (matriz >= q1 - amplitude) & (matriz <= q3 + amplitude)
+        cercas_inferiores = np.nanmin(np.where(dentro, matriz, np.nan), axis=0)
+        cercas_superiores = np.nanmax(np.where(dentro, matriz, np.nan), axis=0)
+    fora = ~dentro & ~np.isnan(matriz)
+    return {
+        "q1": q1,
+        "medianas": quantis[2],
+        "q3": q3,
+        "cercas_inferiores": cercas_inferiores,
+        "cercas_superiores": cercas_superiores,
+        "outliers": [np.unique(matriz[fora[:, j], j], return_counts=True) for j in range(matriz.shape[1])],
+    }
+
+
+# Densidade suavizada (KDE gaussiano) de uma disciplina calculada sobre as faixas do
+# histograma, e não sobre cada nota: o custo e o número de pontos não dependem do número
+# de estudantes. Largura de banda pela regra de Silverman (no mínimo a largura da faixa).
+def densidade_histograma(contagens, faixas=FAIXAS_HISTOGRAMA, pontos=PONTOS_CURVA):
+    contagens = np.asarray(contagens, dtype=np.float64)
+    centros = (faixas[:-1] + faixas[1:]) / 2
+    x = np.linspace(faixas[0], faixas[-1], pontos)
+    total = contagens.sum()
+    if total == 0:
+        return x, np.zeros(pontos)
+    media = (centros * contagens).sum() / total
+    desvio = np.sqrt((contagens * (centros - media) ** 2).sum() / total)
+    largura = max(1.06 * desvio * total ** -0.2, faixas[1] - faixas[0])
+    nucleos = np.exp(-0.5 * ((x[np.newaxis, :] - centros[:, np.newaxis]) / largura) ** 2)
+    return x, (contagens[:, np.newaxis] * nucleos).sum(axis=0) / (total * largura * np.sqrt(2 * np.pi))
+
+
+# Ordem decrescente das notas (estável, com as notas em branco no final)
+def ordem_decrescente(valores):
+    valores = np.asarray(valores, dtype=np.float64)
+    chave = np.where(np.isnan(valores), np.inf, -valores)
+    return np.argsort(chave, kind="stable")
+
+
+# Permutações de ranking de todas as disciplinas
+def rankings(matriz, disciplinas):
+    return {disciplina: ordem_decrescente(matriz[:, j]) for j, disciplina in enumerate(disciplinas)}
+
+
+# Percentil de cada nota dentro da sua disciplina (% de notas menores ou iguais)
+def calcular_percentis(matriz):
+    percentis = np.full(matriz.shape, np.nan)
+    for j in range(matriz.shape[1]):
+        coluna = matriz[:, j]
+        validas = ~np.isnan(coluna)
+        ordenadas = np.sort(coluna[validas])
+        if ordenadas.size:
+            percentis[validas, j] = np.searchsorted(ordenadas, coluna[validas], side="right") / ordenadas.size * 100
+    return percentis
+
+
+# Notas de uma disciplina sem as em branco, com os nomes correspondentes
+def notas_validas(nomes, notas):
+    validas = ~np.isnan(notas)
+    return np.asarray(nomes, dtype=object)[validas], notas[validas]
+
+
+# Perfil de um estudante: notas preenchidas, diferença para a média da turma,
+# posição no ranking de cada disciplina e percentis
+def perfil_estudante(matriz, linha, disciplinas, medias=None, percentis=None):
+    notas = matriz[linha]
+    preenchidas = ~np.isnan(notas)
+    if medias is None:
+        medias = parametros_normais(matriz)["medias"]
+    # Posição = 1 + número de estudantes com nota maior na disciplina
+    posicoes = (matriz > notas).sum(axis=0) + 1
+    return {
+        "disciplinas": [disciplina for disciplina, ok in zip(disciplinas, preenchidas) if ok],
+        "notas": notas[preenchidas],
+        "diferencas": notas[preenchidas] - medias[preenchidas],
+        "posicoes": posicoes[preenchidas],
+        "percentis": percentis[linha][preenchidas] if percentis is not None else None,
+    }
+
+
+# Linhas dos estudantes selecionados pelo nome, na ordem da seleção
+def linhas_por_nome(nomes, selecionados):
+    nomes = np.asarray(nomes, dtype=object)
+    linhas = []
+    for nome in selecionados:
+        encontradas = np.flatnonzero(nomes == nome)
+        if encontradas.size:
+            linhas.append(int(encontradas[0]))
+    return np.asarray(linhas, dtype=np.intp)
+
+
+# Distâncias entre estudantes (linhas de "a" contra linhas de "b"), considerando só as
+# disciplinas em que os dois têm nota. Tudo é calculado com produtos de matrizes sobre
+# as notas com NaN trocado por 0 e as máscaras de notas preenchidas:
+# - "euclidiana": distância euclidiana reescalada para o total de disciplinas
+#   (sqrt(total / em_comum * soma dos quadrados das diferenças))
+# - "cosseno": 1 - similaridade do cosseno
+# - "correlacao": 1 - correlação de Pearson
+# Pares sem disciplinas em comum (ou sem variação, na correlação) ficam com NaN.
+METRICAS = ["euclidiana", "cosseno", "correlacao"]
+LIMITE_MATRIZ_DISTANCIAS = 2_000  # Acima disso, só a linha consultada é calculada
+
+
+def distancias(a, b=None, metrica="euclidiana"):
+    if metrica not in METRICAS:
+        raise ValueError(f"métrica desconhecida: {metrica!r} (use {', '.join(METRICAS)})")
+    a = np.asarray(a, dtype=np.float64)
+    b = a if b is None else np.asarray(b, dtype=np.float64)
+    mascara_a, mascara_b = (~np.isnan(a)).astype(np.float64), (~np.isnan(b)).astype(np.float64)
+    notas_a, notas_b = np.nan_to_num(a), np.nan_to_num(b)
+    em_comum = mascara_a @ mascara_b.T
+    produto = notas_a @ notas_b.T
+    quadrados_a = (notas_a ** 2) @ mascara_b.T  # Soma de a² nas disciplinas em comum com cada b
+    quadrados_b = mascara_a @ (notas_b ** 2).T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if metrica == "euclidiana":
+            soma = np.maximum(quadrados_a + quadrados_b - 2 * produto, 0.0)
+            resultado = np.sqrt(a.shape[1] / em_comum * soma)
+        elif metrica == "cosseno":
+            resultado = 1 - produto / np.sqrt(quadrados_a * quadrados_b)
+        else:
+            soma_a = notas_a @ mascara_b.T
+            soma_b = mascara_a @ notas_b.T
+            covariancia = produto - soma_a * soma_b / em_comum
+            variancias = (quadrados_a - soma_a ** 2 / em_comum) * (quadrados_b - soma_b ** 2 / em_comum)
+            resultado = 1 - covariancia / np.sqrt(np.where(variancias > 1e-12, variancias, np.nan))
+    resultado[em_comum == 0] = np.nan
+    return resultado
+
+
+# Matriz de distâncias da turma inteira (estudantes x estudantes), em float32
+def matriz_distancias(matriz, metrica="euclidiana"):
+    resultado = distancias(matriz, metrica=metrica).astype(np.float32)
+    diagonal = np.arange(len(resultado))
+    resultado[diagonal, diagonal] = np.where(np.isnan(resultado[diagonal, diagonal]), np.nan, 0.0)
+    return resultado
+
+
+# Os "k" estudantes mais semelhantes a uma linha (menor distância primeiro, sem ela mesma).
+# Usa a matriz pré-calculada quando informada; senão calcula só a linha consultada
+def mais_semelhantes(matriz, linha, k=5, metrica="euclidiana", distancias_turma=None):
+    if distancias_turma is not None:
+        linha_distancias = np.asarray(distancias_turma[linha], dtype=np.float64)
+    else:
+        linha_distancias = distancias(np.asarray(matriz)[[linha]], matriz, metrica)[0]
+    chave = np.where(np.isnan(linha_distancias), np.inf, linha_distancias)
+    chave[linha] = np.inf
+    candidatas = np.flatnonzero(np.isfinite(chave))
+    k = min(k, candidatas.size)
+    if k == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0)
+    melhores = candidatas[np.argpartition(chave[candidatas], k - 1)[:k]]
+    melhores = melhores[np.argsort(chave[melhores], kind="stable")]
+    return melhores, linha_distancias[melhores]
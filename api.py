@@ -0,0 +1,313 @@
+# API HTTP somente leitura com os agregados do dashboard
+# Serve em JSON, para o portal da escola, as médias da turma, os rankings e o perfil de
+# cada estudante, calculados pelos mesmos índices das abas do dashboard (estatisticas.py,
+# busca.py), sem Streamlit. As planilhas vêm do mesmo cache em disco do dashboard
+# (arquivos enviados pela interface ou importados pelo importar.py), e os índices e as
+# respostas ficam no cache em memória do processo (cache_do_processo), com as mesmas chaves
+# (hash do arquivo, planilha, ...) usadas pelo dashboard: no mesmo processo do dashboard,
+# os dois compartilham os índices; em processos separados, só o cache em disco das planilhas.
+#
+# Cada resposta tem um ETag com o hash do conteúdo: clientes que consultam periodicamente
+# enviam If-None-Match e recebem 304 (sem corpo) enquanto os dados não mudam. Uma planilha
+# é identificada pelo hash do arquivo, portanto a resposta de uma URL de turma nunca muda.
+#
+# Rotas (GET ou HEAD):
+#   /turmas                                            arquivos e planilhas disponíveis
+#   /turmas/{hash}/{planilha}                          resumo da turma
+#   /turmas/{hash}/{planilha}/medias[?situacao=]       média, mediana e desvio por disciplina
+#   /turmas/{hash}/{planilha}/ranking[?coluna=&limite=&deslocamento=&situacao=]
+#   /turmas/{hash}/{planilha}/estudantes/{numero}      perfil do estudante
+# "coluna" é uma disciplina ou "Média Geral" (padrão: Final score, como no dashboard);
+# "situacao" é "aprovados" ou "reprovados" (Final score em relação à nota de aprovação).
+#
+# Uso: python api.py [--host 127.0.0.1] [--porta 8502] [--cache DIR] [--log]
+import argparse
+import hashlib
+import json
+import sys
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from analise import COLUNA_FINAL, perfil_estudante
+from busca import IndiceEstudantes
+from cache_compartilhado import cache_do_processo
+from coortes import APROVADOS, REPROVADOS
+from dados import DadosTurma
+from estatisticas import COLUNA_MEDIA, IndiceEstatisticas
+from ingestao import arquivos_em_cache, ler_planilha
+from instrumentacao import VERSAO
+from tabelas import filtrar_ordem
+
+SITUACOES = {"aprovados": APROVADOS, "reprovados": REPROVADOS}
+LIMITE_RANKING = 50
+LIMITE_MAXIMO_RANKING = 1_000
+
+
+# Nota em JSON (nota em branco -> null)
+def _nota(valor):
+    valor = float(valor)
+    return None if valor != valor else round(valor, 4)
+
+
+def _numero(valor):
+    return None if valor != valor else int(valor)
+
+
+def _inteiro(consulta, nome, padrao, minimo=0, maximo=None):
+    texto = consulta.get(nome, [str(padrao)])[-1]
+    try:
+        valor = int(texto)
+    except ValueError:
+        raise ValueError(f"Parâmetro '{nome}' deve ser um número inteiro.") from None
+    if valor < minimo or (maximo is not None and valor > maximo):
+        raise ValueError(f"Parâmetro '{nome}' fora do intervalo permitido.")
+    return valor
+
+
+def _situacao(consulta):
+    situacao = consulta.get("situacao", [None])[-1]
+    if situacao is None:
+        return None
+    if situacao not in SITUACOES:
+        raise ValueError(f"Situação desconhecida: '{situacao}' (use {' ou '.join(SITUACOES)}).")
+    return SITUACOES[situacao]
+
+
+# Corpo JSON e ETag (hash do corpo) de uma resposta
+def _resposta(dados):
+    corpo = json.dumps(dados, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    return corpo, f'"{hashlib.blake2b(corpo, digest_size=16).hexdigest()}"'
+
+
+# Consultas da API, independentes do HTTP (usadas pelo servidor e pelo benchmark)
+class APIHumanitas:
+    def __init__(self, diretorio_cache=None, cache=None):
+        self.diretorio_cache = diretorio_cache
+        self.cache = cache if cache is not None else cache_do_processo()
+
+    # Mesmo índice (e mesma chave) que o dashboard monta ao carregar a planilha
+    def indice(self, hash_arquivo, planilha, situacao=None):
+        chave_dados = (hash_arquivo, planilha)
+        indice = self.cache.obter(
+            chave_dados + ("indice",),
+            lambda: IndiceEstatisticas(DadosTurma(ler_planilha(hash_arquivo, planilha, self.diretorio_cache)))
+        )
+        if situacao is None or situacao not in indice.coortes.mapas:
+            return indice
+        return self.cache.obter((indice.assinatura, "coorte", situacao), lambda: indice.coorte(situacao))
+
+    def estudantes(self, hash_arquivo, planilha):
+        indice = self.indice(hash_arquivo, planilha)
+        return self.cache.obter(
+            (hash_arquivo, planilha, "estudantes"),
+            lambda: IndiceEstudantes(indice.dados)
+        )
+
+    def turmas(self):
+        return {"turmas": arquivos_em_cache(self.diretorio_cache)}
+
+    def resumo(self, hash_arquivo, planilha):
+        indice = self.indice(hash_arquivo, planilha)
+        resumo = {
+            "hash": hash_arquivo,
+            "planilha": planilha,
+            "estudantes": len(indice.numeros),
+            "disciplinas": indice.disciplinas,
+            "nota_aprovacao": indice.coortes.nota_aprovacao,
+        }
+        if APROVADOS in indice.coortes.mapas:
+            resumo["aprovados"] = indice.coortes.contar(APROVADOS)
+            resumo["reprovados"] = indice.coortes.contar(REPROVADOS)
+        return resumo
+
+    def medias(self, hash_arquivo, planilha, situacao=None):
+        indice = self.indice(hash_arquivo, planilha, situacao)
+        return {
+            "estudantes": len(indice.numeros),
+            "disciplinas": [
+                {"disciplina": disciplina, "notas": int(indice.contagens[j]), "media": _nota(indice.medias[j]),
+                 "mediana": _nota(indice.medianas[j]), "desvio": _nota(indice.desvios[j])}
+                for j, disciplina in enumerate(indice.disciplinas)
+            ],
+        }
+
+    # Ranking por uma disciplina ou pela média geral, só com os estudantes com nota
+    # (e da situação pedida: interseção com o mapa de bits da coorte)
+    def ranking(self, hash_arquivo, planilha, coluna=COLUNA_FINAL, limite=LIMITE_RANKING, deslocamento=0, situacao=None):
+        indice = self.indice(hash_arquivo, planilha)
+        if coluna != COLUNA_MEDIA and coluna not in indice.posicao:
+            raise KeyError(f"Coluna '{coluna}' não encontrada.")
+        ordem = indice.ordem(coluna)[:indice.validas(coluna)]
+        if situacao is not None:
+            ordem = filtrar_ordem(ordem, indice.coortes.mascara(situacao))
+        linhas = ordem[deslocamento:deslocamento + limite]
+        notas = indice.notas(coluna)
+        return {
+            "coluna": coluna,
+            "total": len(ordem),
+            "deslocamento": deslocamento,
+            "estudantes": [
+                {"posicao": deslocamento + i + 1, "numero": _numero(indice.numeros[linha]),
+                 "nome": indice.nomes[linha], "nota": _nota(notas[linha])}
+                for i, linha in enumerate(linhas.tolist())
+            ],
+        }
+
+    def estudante(self, hash_arquivo, planilha, numero):
+        indice = self.indice(hash_arquivo, planilha)
+        estudantes = self.estudantes(hash_arquivo, planilha)
+        linha = estudantes.linha(numero)
+        if linha is None:
+            raise KeyError(f"Estudante {numero} não encontrado.")
+        perfil = perfil_estudante(indice.matriz, linha, indice.disciplinas, indice.medias, estudantes.percentis)
+        return {
+            "numero": int(numero),
+            "nome": indice.nomes[linha],
+            "media_geral": _nota(indice.medias_estudantes[linha]),
+            "final": _nota(indice.notas(COLUNA_FINAL)[linha]) if COLUNA_FINAL in indice.posicao else None,
+            "disciplinas": [
+                {"disciplina": disciplina, "nota": _nota(nota), "percentil": _nota(percentil),
+                 "posicao": int(posicao), "diferenca_media": _nota(diferenca)}
+                for disciplina, nota, percentil, posicao, diferenca in zip(
+                    perfil["disciplinas"], perfil["notas"], perfil["percentis"], perfil["posicoes"], perfil["diferencas"]
+                )
+            ],
+        }
+
+    # Corpo JSON e ETag para um caminho e os parâmetros da URL. As respostas de uma turma
+    # ficam no cache (a URL inclui o hash do arquivo); a lista de turmas é sempre relida
+    def responder(self, caminho, consulta):
+        partes = [unquote(parte) for parte in caminho.strip("/").split("/") if parte]
+        if partes in ([], ["turmas"]):
+            return _resposta(self.turmas())
+        if len(partes) < 3 or partes[0] != "turmas":
+            raise KeyError(f"Rota não encontrada: {caminho}")
+        hash_arquivo, planilha, recurso = partes[1], partes[2], partes[3:]
+        if recurso == []:
+            chave, calcular = (), lambda: self.resumo(hash_arquivo, planilha)
+        elif recurso == ["medias"]:
+            situacao = _situacao(consulta)
+            chave, calcular = ("medias", situacao), lambda: self.medias(hash_arquivo, planilha, situacao)
+        elif recurso == ["ranking"]:
+            coluna = consulta.get("coluna", [COLUNA_FINAL])[-1]
+            limite = _inteiro(consulta, "limite", LIMITE_RANKING, 1, LIMITE_MAXIMO_RANKING)
+            deslocamento = _inteiro(consulta, "deslocamento", 0)
+            situacao = _situacao(consulta)
+            chave, calcular = ("ranking", coluna, limite, deslocamento, situacao), \
+                lambda: self.ranking(hash_arquivo, planilha, coluna, limite, deslocamento, situacao)
+        elif len(recurso) == 2 and recurso[0] == "estudantes":
+            if not recurso[1].isdigit():
+                raise ValueError("O número do estudante deve ser inteiro.")
+            numero = int(recurso[1])
+            chave, calcular = ("estudante", numero), lambda: self.estudante(hash_arquivo, planilha, numero)
+        else:
+            raise KeyError(f"Rota não encontrada: {caminho}")
+        self._verificar_planilha(hash_arquivo, planilha)
+        return self.cache.obter(
+            (hash_arquivo, planilha, "api") + chave, lambda: _resposta(calcular()), tamanho=lambda resposta: len(resposta[0])
+        )
+
+    def _verificar_planilha(self, hash_arquivo, planilha):
+        if self.cache.contem((hash_arquivo, planilha, "indice")):
+            return
+        # O hash vira nome de pasta no cache: só hashes SHA-256 em hexadecimal
+        if len(hash_arquivo) != 64 or not set(hash_arquivo) <= set("0123456789abcdef"):
+            raise KeyError(f"Arquivo '{hash_arquivo}' não encontrado no cache.")
+        try:
+            self.indice(hash_arquivo, planilha)
+        except FileNotFoundError:
+            raise KeyError(f"Arquivo '{hash_arquivo}' não encontrado no cache.") from None
+
+
+# If-None-Match com o ETag atual (lista separada por vírgulas, "*" ou ETags fracos W/"...")
+def etag_corresponde(if_none_match, etag):
+    if not if_none_match:
+        return False
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*" or candidato.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ManipuladorAPI(BaseHTTPRequestHandler):
+    server_version = f"HumanitasAPI/{VERSAO}"
+    protocol_version = "HTTP/1.1"  # Conexões persistentes para os clientes que consultam periodicamente
+    # Cabeçalhos e corpo são escritos separadamente: sem isso, em conexões persistentes,
+    # cada resposta espera o ACK atrasado do cliente (~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._responder(enviar_corpo=True)
+
+    def do_HEAD(self):
+        self._responder(enviar_corpo=False)
+
+    def _responder(self, enviar_corpo):
+        url = urlsplit(self.path)
+        try:
+            corpo, etag = self.server.api.responder(url.path, parse_qs(url.query))
+        except KeyError as erro:
+            return self._erro(HTTPStatus.NOT_FOUND, erro.args[0] if erro.args else "Não encontrado.", enviar_corpo)
+        except ValueError as erro:
+            return self._erro(HTTPStatus.BAD_REQUEST, str(erro), enviar_corpo)
+        if etag_corresponde(self.headers.get("If-None-Match"), etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+        self._enviar(HTTPStatus.OK, corpo, enviar_corpo, etag)
+
+    def _erro(self, status, mensagem, enviar_corpo):
+        self._enviar(status, _resposta({"erro": str(mensagem)})[0], enviar_corpo)
+
+    def _enviar(self, status, corpo, enviar_corpo, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            # O cliente pode guardar a resposta, mas deve revalidar (If-None-Match) a cada consulta
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if enviar_corpo:
+            self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        if self.server.log:
+            super().log_message(formato, *args)
+
+
+# Servidor com uma thread por conexão; porta 0 escolhe uma porta livre (testes e benchmark)
+def criar_servidor(host="127.0.0.1", porta=8502, diretorio_cache=None, log=False, api=None):
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorAPI)
+    servidor.daemon_threads = True
+    servidor.api = api if api is not None else APIHumanitas(diretorio_cache)
+    servidor.log = log
+    return servidor
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="API HTTP somente leitura com os agregados do dashboard.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8502)
+    parser.add_argument("--cache", help="Diretório do cache de planilhas (padrão: o mesmo do dashboard)")
+    parser.add_argument("--log", action="store_true", help="Registra cada requisição no terminal")
+    args = parser.parse_args(argumentos)
+
+    servidor = criar_servidor(args.host, args.porta, args.cache, args.log)
+    host, porta = servidor.server_address[:2]
+    print(f"API em http://{host}:{porta}/turmas (Ctrl+C para encerrar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
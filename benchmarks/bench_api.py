@@ -0,0 +1,95 @@
+# Benchmark da API HTTP (api.py) numa instância local
+# Grava uma turma sintética num cache temporário, sobe o servidor numa porta livre e
+# dispara requisições de vários clientes simultâneos (conexões persistentes) para as
+# médias, uma página do ranking e perfis de estudantes: primeiro sem ETag (200 com corpo)
+# e depois como um cliente que consulta periodicamente, com If-None-Match (304).
+#
+# Uso: python benchmarks/bench_api.py [--estudantes 5000] [--clientes 8] [--requisicoes 500]
+import argparse
+import http.client
+import os
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from api import criar_servidor  # noqa: E402
+from gerar_planilha import gerar_turma  # noqa: E402
+from ingestao import gravar_planilhas  # noqa: E402
+
+HASH = "0" * 64
+PLANILHA = "1A"
+
+
+def rotas(estudantes):
+    base = f"/turmas/{HASH}/{quote(PLANILHA)}"
+    return [f"{base}/medias", f"{base}/ranking?limite=50", f"{base}/ranking?coluna=Final%20score&situacao=aprovados"] + \
+        [f"{base}/estudantes/{numero}" for numero in range(1, estudantes + 1, max(1, estudantes // 20))]
+
+
+def cliente(porta, caminhos, requisicoes, condicional, latencias, status):
+    conexao = http.client.HTTPConnection("127.0.0.1", porta)
+    etags = {}
+    for i in range(requisicoes):
+        caminho = caminhos[i % len(caminhos)]
+        cabecalhos = {"If-None-Match": etags[caminho]} if condicional and caminho in etags else {}
+        inicio = time.perf_counter()
+        conexao.request("GET", caminho, headers=cabecalhos)
+        resposta = conexao.getresponse()
+        resposta.read()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        status.append(resposta.status)
+        etags[caminho] = resposta.getheader("ETag")
+    conexao.close()
+
+
+def rodada(porta, caminhos, clientes, requisicoes, condicional):
+    latencias, status = [], []
+    threads = [threading.Thread(target=cliente, args=(porta, caminhos, requisicoes, condicional, latencias, status))
+               for _ in range(clientes)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - inicio
+    latencias = np.array(latencias)
+    return len(latencias) / total, float(np.median(latencias)), float(np.percentile(latencias, 95)), \
+        {codigo: status.count(codigo) for codigo in sorted(set(status))}
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mede a API HTTP numa instância local.")
+    parser.add_argument("--estudantes", type=int, default=5_000)
+    parser.add_argument("--disciplinas", type=int, default=14)
+    parser.add_argument("--clientes", type=int, default=8)
+    parser.add_argument("--requisicoes", type=int, default=500, help="Requisições por cliente")
+    args = parser.parse_args(argumentos)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        gravar_planilhas(HASH, {PLANILHA: gerar_turma(args.estudantes, args.disciplinas, 0.05)}, pasta)
+        servidor = criar_servidor(porta=0, diretorio_cache=pasta)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        porta = servidor.server_address[1]
+        caminhos = rotas(args.estudantes)
+        try:
+            inicio = time.perf_counter()
+            cliente(porta, caminhos, len(caminhos), False, [], [])
+            print(f"Primeiras respostas ({len(caminhos)} rotas, índices calculados): {time.perf_counter() - inicio:.2f}s")
+            print(f"{args.clientes} clientes x {args.requisicoes} requisições")
+            print(f"{'Rodada':<26}{'req/s':>10}{'mediana (ms)':>14}{'p95 (ms)':>10}  status")
+            for rotulo, condicional in [("sem ETag (200)", False), ("If-None-Match (304)", True)]:
+                vazao, mediana, p95, status = rodada(porta, caminhos, args.clientes, args.requisicoes, condicional)
+                print(f"{rotulo:<26}{vazao:>10.0f}{mediana:>14.2f}{p95:>10.2f}  {status}")
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# Benchmark das consultas do histórico (SQLite)
+# Grava uma turma sintética em dois bimestres e compara a página do ranking de uma
+# disciplina com nota mínima, consultada no banco pelo índice, com a varredura da
+# planilha em pandas (filtro + ordenação + recorte), e a consulta com o pool de conexões
+# com uma conexão nova por consulta.
+#
+# Uso: python benchmarks/bench_banco.py [--estudantes 20000] [--disciplinas 14] [--repeticoes 50]
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import historico  # noqa: E402
+from gerar_planilha import gerar_turma  # noqa: E402
+from ingestao import normalizar_planilha  # noqa: E402
+
+TURMA = "T"
+BIMESTRE = "1º Bimestre"
+MINIMO = 8.0
+PAGINA = 50
+
+
+def cronometrar(executar, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        executar()
+    return (time.perf_counter() - inicio) * 1000 / repeticoes
+
+
+def pagina_pandas(df, disciplina):
+    filtradas = df[df[disciplina] >= MINIMO]
+    return len(filtradas), filtradas.sort_values(disciplina, ascending=False).head(PAGINA)[["Numero", "Nome", disciplina]]
+
+
+def contar_sem_pool(caminho, disciplina):
+    with closing(historico.conectar(caminho)) as conexao:
+        return conexao.execute(
+            "SELECT COUNT(*) FROM notas WHERE turma = ? AND bimestre = ? AND disciplina = ? AND valor >= ?",
+            (TURMA, BIMESTRE, disciplina, MINIMO),
+        ).fetchone()[0]
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mede as consultas do histórico de notas.")
+    parser.add_argument("--estudantes", type=int, default=20_000)
+    parser.add_argument("--disciplinas", type=int, default=14)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args(argumentos)
+
+    df = normalizar_planilha(gerar_turma(args.estudantes, args.disciplinas, 0.05))
+    disciplina = df.columns[2]
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "historico.db")
+        inicio = time.perf_counter()
+        historico.gravar_bimestre(TURMA, BIMESTRE, df, caminho)
+        historico.gravar_bimestre(TURMA, "2º Bimestre", normalizar_planilha(gerar_turma(args.estudantes, args.disciplinas, 0.05, 1)), caminho)
+        print(f"Gravação de 2 bimestres ({args.estudantes} estudantes x {args.disciplinas} disciplinas): "
+              f"{time.perf_counter() - inicio:.2f}s")
+
+        medicoes = [
+            ("página do ranking (pandas)", lambda: pagina_pandas(df, disciplina)),
+            ("página do ranking (banco)", lambda: (
+                historico.contar(TURMA, BIMESTRE, disciplina, MINIMO, caminho),
+                historico.ranking(TURMA, BIMESTRE, disciplina, MINIMO, limite=PAGINA, caminho=caminho),
+            )),
+            ("contagem, conexão nova", lambda: contar_sem_pool(caminho, disciplina)),
+            ("contagem, pool de conexões", lambda: historico.contar(TURMA, BIMESTRE, disciplina, MINIMO, caminho)),
+            ("evolução da turma (banco)", lambda: historico.evolucao(TURMA, caminho=caminho)),
+            ("evolução de um estudante", lambda: historico.evolucao(TURMA, int(df["Numero"].iloc[0]), caminho=caminho)),
+        ]
+        print(f"{'Consulta':<30}{'ms':>10}")
+        for rotulo, executar in medicoes:
+            print(f"{rotulo:<30}{cronometrar(executar, args.repeticoes):>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+# Benchmark dos filtros de estudantes (coortes)
+# Compara a seleção de uma coorte (aprovados com nota acima de um limiar numa disciplina)
+# filtrando o DataFrame a cada interação com a interseção dos mapas de bits calculados no
+# carregamento, e mede o custo de montar o índice de estatísticas da coorte.
+#
+# Uso: python benchmarks/bench_coortes.py [--estudantes 50000] [--disciplinas 14] [--repeticoes 200]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from coortes import APROVADOS, NOTA_APROVACAO  # noqa: E402
+from dados import DadosTurma  # noqa: E402
+from estatisticas import IndiceEstatisticas  # noqa: E402
+from gerar_planilha import gerar_turma  # noqa: E402
+from ingestao import normalizar_planilha  # noqa: E402
+
+LIMIAR = 8.0
+
+
+def cronometrar(executar, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        executar()
+    return (time.perf_counter() - inicio) * 1000 / repeticoes
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mede os filtros de estudantes por mapas de bits.")
+    parser.add_argument("--estudantes", type=int, default=50_000)
+    parser.add_argument("--disciplinas", type=int, default=14)
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args(argumentos)
+
+    df = normalizar_planilha(gerar_turma(args.estudantes, args.disciplinas, 0.05))
+    disciplina = df.columns[2]
+    inicio = time.perf_counter()
+    indice = IndiceEstatisticas(DadosTurma(df))
+    print(f"Índice com mapas de bits ({args.estudantes} estudantes x {args.disciplinas} disciplinas): "
+          f"{time.perf_counter() - inicio:.2f}s")
+    condicao = indice.coortes.condicao(disciplina, ">", LIMIAR)
+    print(f"Mapas: {len(indice.coortes.mapas)} · "
+          f"{sum(mapa.nbytes for mapa in indice.coortes.mapas.values()) / 1024:.0f} KiB")
+
+    medicoes = [
+        ("filtro no DataFrame", lambda: df[(df["Final score"] >= NOTA_APROVACAO) & (df[disciplina] > LIMIAR)]),
+        ("interseção dos mapas", lambda: indice.coortes.mascara(APROVADOS, condicao)),
+        ("contagem da coorte", lambda: indice.coortes.contar(APROVADOS, condicao)),
+    ]
+    print(f"{'Etapa':<30}{'ms':>10}")
+    for rotulo, executar in medicoes:
+        print(f"{rotulo:<30}{cronometrar(executar, args.repeticoes):>10.3f}")
+    print(f"{'índice da coorte':<30}{cronometrar(lambda: indice.coorte(APROVADOS, condicao), 3):>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# Benchmark da fila de trabalhos com várias sessões simultâneas
+# Simula N sessões abrindo "Estatísticas da Turma" (boxplot + curvas normais de todas as
+# disciplinas) ao mesmo tempo que outras sessões fazem pedidos leves (página da tabela da
+# Visão Geral). Compara cada sessão calculando na própria thread com a fila limitada, e
+# mede o tempo total dos pedidos pesados e a latência dos leves.
+#
+# Uso: python benchmarks/bench_fila.py [--estudantes 5000] [--sessoes 16] [--trabalhadores 2]
+#                                      [--mesma-turma] [--processos]
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dados import DadosTurma  # noqa: E402
+from estatisticas import IndiceEstatisticas  # noqa: E402
+from gerar_planilha import gerar_turma  # noqa: E402
+from graficos import figura_boxplot, figura_normal_turma  # noqa: E402
+from ingestao import normalizar_planilha  # noqa: E402
+from tabelas import fatia_pagina  # noqa: E402
+from trabalhos import FilaTrabalhos, figura_json  # noqa: E402
+
+BIMESTRE = "1º Bimestre"
+
+
+def pedidos_pesados(indice, sessao):
+    pedidos = [((sessao, "boxplot"), figura_boxplot, (indice.disciplinas, indice.matriz, BIMESTRE, indice.quantis))]
+    pedidos += [((sessao, "normal", disciplina), figura_normal_turma,
+                 (indice.nomes, indice.matriz, j, disciplina, BIMESTRE, indice.normais))
+                for j, disciplina in enumerate(indice.disciplinas)]
+    return pedidos
+
+
+def pesado_na_sessao(indice, sessao, fila):
+    return [figura_json(construir, *args) for _, construir, args in pedidos_pesados(indice, sessao)]
+
+
+def pesado_na_fila(indice, sessao, fila):
+    futuros = [fila.enviar(chave, figura_json, construir, *args) for chave, construir, args in pedidos_pesados(indice, sessao)]
+    return [futuro.result() for futuro in futuros]
+
+
+def simular(indice, sessoes, mesma_turma, executar, fila=None):
+    latencias = []
+    parar = threading.Event()
+
+    def leve():
+        while not parar.is_set():
+            inicio = time.perf_counter()
+            indice.dados.tabela(fatia_pagina(indice.ordem("Final score"), 1, 50)[0])
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            time.sleep(0.01)
+
+    leves = [threading.Thread(target=leve) for _ in range(4)]
+    pesadas = [threading.Thread(target=executar, args=(indice, 0 if mesma_turma else sessao, fila))
+               for sessao in range(sessoes)]
+    for thread in leves:
+        thread.start()
+    inicio = time.perf_counter()
+    for thread in pesadas:
+        thread.start()
+    for thread in pesadas:
+        thread.join()
+    total = time.perf_counter() - inicio
+    parar.set()
+    for thread in leves:
+        thread.join()
+    latencias = np.array(latencias)
+    return total, float(np.median(latencias)), float(np.percentile(latencias, 95))
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mede a fila de trabalhos com várias sessões simultâneas.")
+    parser.add_argument("--estudantes", type=int, default=5_000)
+    parser.add_argument("--disciplinas", type=int, default=14)
+    parser.add_argument("--sessoes", type=int, default=16, help="Sessões abrindo a aba pesada ao mesmo tempo")
+    parser.add_argument("--trabalhadores", type=int, default=os.cpu_count())
+    parser.add_argument("--mesma-turma", action="store_true", help="Todas as sessões na mesma turma (coalescência)")
+    parser.add_argument("--processos", action="store_true", help="Trabalhadores em processos em vez de threads")
+    args = parser.parse_args(argumentos)
+
+    indice = IndiceEstatisticas(DadosTurma(normalizar_planilha(gerar_turma(args.estudantes, args.disciplinas, 0.05))))
+    fila = FilaTrabalhos(args.trabalhadores, processos=args.processos)
+    print(f"{args.sessoes} sessões, {args.estudantes} estudantes x {args.disciplinas} disciplinas, "
+          f"{'mesma turma' if args.mesma_turma else 'turmas diferentes'}")
+    print(f"{'Execução':<34}{'Total (s)':>10}{'Leve mediana (ms)':>19}{'Leve p95 (ms)':>15}")
+    for rotulo, executar, usar_fila in [("na thread de cada sessão", pesado_na_sessao, None),
+                                        (f"fila ({fila.trabalhadores} {'processos' if args.processos else 'threads'})",
+                                         pesado_na_fila, fila)]:
+        total, mediana, p95 = simular(indice, args.sessoes, args.mesma_turma, executar, usar_fila)
+        print(f"{rotulo:<34}{total:>10.2f}{mediana:>19.1f}{p95:>15.1f}")
+    metricas = fila.metricas()
+    print(f"Fila: {metricas['concluidos']} concluído(s), {metricas['coalescidos']} coalescido(s), "
+          f"espera p95 {metricas['espera_p95_ms']:.0f} ms, execução p95 {metricas['execucao_p95_ms']:.0f} ms")
+    fila.encerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# Benchmark dos gráficos de distribuição normal da aba "Estatísticas da Turma"
+# Compara o laço anterior (um trace por estudante + shapes por σ) com o construtor vetorizado.
+# Uso: python benchmarks/bench_graficos.py [--estudantes 45] [--disciplinas 14]
+# Requer as dependências de benchmarks/requirements.txt (scipy)
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+from scipy.stats import norm
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from graficos import figuras_normais_turma  # noqa: E402
+from bench_posicao_vertical import ajustar_posicao_vertical_laco  # noqa: E402
+
+
+# Reprodução do laço anterior, mantida aqui apenas como referência de comparação
+def figuras_laco_anterior(nomes, disciplinas, matriz):
+    figuras = []
+    for j, disciplina in enumerate(disciplinas):
+        notas_disciplina = matriz[:, j][~np.isnan(matriz[:, j])]
+        mean_disciplina = notas_disciplina.mean()
+        std_dev_disciplina = notas_disciplina.std(ddof=1)
+        x_disciplina = np.linspace(mean_disciplina - 4 * std_dev_disciplina,
+                                   mean_disciplina + 4 * std_dev_disciplina, 100)
+        y_disciplina = norm.pdf(x_disciplina, mean_disciplina, std_dev_disciplina)
+        fig_normal = go.Figure()
+        fig_normal.add_trace(go.Scatter(x=x_disciplina, y=y_disciplina, mode="lines", fill="tozeroy"))
+        notas_ajustadas_y = ajustar_posicao_vertical_laco(notas_disciplina, mean_disciplina, std_dev_disciplina)
+        for nome, nota, y_nota in zip(nomes, notas_disciplina, notas_ajustadas_y):
+            fig_normal.add_trace(go.Scatter(
+                x=[nota], y=[y_nota], mode="markers", name=f"{nome}: {nota:.1f}",
+                marker=dict(color="red", size=10), hoverinfo="text",
+                hovertext=f"Estudante: {nome}<br>Nota: {nota:.1f}<br>Diferença da Média: {nota - mean_disciplina:.1f}"
+            ))
+        for i in range(-3, 4):
+            x_line = mean_disciplina + i * std_dev_disciplina
+            y_line = norm.pdf(x_line, mean_disciplina, std_dev_disciplina)
+            fig_normal.add_shape(type="line", x0=x_line, y0=0, x1=x_line, y1=y_line,
+                                 line=dict(color="red", width=2, dash="dash"))
+            fig_normal.add_annotation(x=x_line, y=-0.02, text=f"{i}σ", showarrow=False, yshift=10)
+        figuras.append(fig_normal)
+    return figuras
+
+
+def medir(nome, construir):
+    inicio = time.perf_counter()
+    figuras = construir()
+    construcao = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    payload = sum(len(fig.to_json()) for fig in figuras)
+    serializacao = time.perf_counter() - inicio
+    traces = sum(len(fig.data) for fig in figuras)
+    shapes = sum(len(fig.layout.shapes) for fig in figuras)
+    print(f"{nome:<12} traces={traces:<6} shapes={shapes:<4} payload={payload / 1024:9.1f} KiB "
+          f"construção={construcao * 1000:8.1f} ms serialização={serializacao * 1000:8.1f} ms")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Compara a construção dos gráficos de distribuição normal da turma.")
+    parser.add_argument("--estudantes", type=int, default=45)
+    parser.add_argument("--disciplinas", type=int, default=14)
+    args = parser.parse_args(argumentos)
+
+    estudantes, n_disciplinas = args.estudantes, args.disciplinas
+    rng = np.random.default_rng(0)
+    nomes = np.array([f"Estudante {i}" for i in range(estudantes)], dtype=object)
+    disciplinas = [f"Disciplina {j}" for j in range(n_disciplinas)]
+    matriz = np.round(np.clip(rng.normal(6.5, 1.5, (estudantes, n_disciplinas)), 0, 10), 1)
+
+    print(f"{estudantes} estudantes x {n_disciplinas} disciplinas")
+    medir("anterior", lambda: figuras_laco_anterior(nomes, disciplinas, matriz))
+    medir("vetorizado", lambda: [fig for _, fig in figuras_normais_turma(nomes, disciplinas, matriz, "Bench")])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# Benchmark da leitura dos arquivos de notas em cada formato aceito
+# Grava a mesma turma sintética em CSV, Parquet e Arrow IPC (e .xlsx com --excel) e mede
+# ler_arquivo (validação + conversão para os tipos compactos) a partir do caminho em disco,
+# como faz o importar.py. O CSV também é medido lido de uma vez (pd.read_csv + validar +
+# normalizar), para comparar o pico de memória da leitura em blocos.
+#
+# Uso: python benchmarks/bench_ingestao.py [--tamanhos 5000 100000 500000] [--disciplinas 14]
+#                                          [--nan 0.05] [--excel]
+import argparse
+import os
+import sys
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bench_visoes import medir  # noqa: E402
+from gerar_planilha import gerar_turma  # noqa: E402
+from ingestao import ler_arquivo, normalizar_planilha, validar_planilha  # noqa: E402
+
+TAMANHOS = [5_000, 100_000, 500_000]
+
+
+def gravar_formatos(df, pasta, excel=False):
+    caminhos = {
+        "csv": os.path.join(pasta, "turma.csv"),
+        "parquet": os.path.join(pasta, "turma.parquet"),
+        "arrow": os.path.join(pasta, "turma.arrow"),
+    }
+    df.to_csv(caminhos["csv"], index=False)
+    df.to_parquet(caminhos["parquet"], index=False)
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), caminhos["arrow"])
+    if excel:
+        caminhos["xlsx"] = os.path.join(pasta, "turma.xlsx")
+        df.to_excel(caminhos["xlsx"], index=False)
+    return caminhos
+
+
+# Leitura do CSV inteiro de uma vez, para comparação
+def csv_de_uma_vez(caminho):
+    df = pd.read_csv(caminho)
+    return normalizar_planilha(df), validar_planilha(df)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mede a leitura dos arquivos de notas em cada formato.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS, help="Números de estudantes")
+    parser.add_argument("--disciplinas", type=int, default=14)
+    parser.add_argument("--nan", type=float, default=0.05, help="Proporção de notas em branco")
+    parser.add_argument("--excel", action="store_true", help="Mede também o .xlsx (lento)")
+    args = parser.parse_args(argumentos)
+
+    for estudantes in args.tamanhos:
+        df = gerar_turma(estudantes, args.disciplinas, args.nan)
+        with tempfile.TemporaryDirectory() as pasta:
+            caminhos = gravar_formatos(df, pasta, args.excel)
+            print(f"\n== {estudantes} estudantes x {args.disciplinas} disciplinas ==")
+            print(f"{'Formato':<22}{'Arquivo (MB)':>14}{'Tempo (ms)':>12}{'Pico (MB)':>11}")
+            medicoes = [("csv (de uma vez)", caminhos["csv"], lambda: csv_de_uma_vez(caminhos["csv"]))]
+            medicoes += [(formato, caminho, lambda caminho=caminho: ler_arquivo(caminho))
+                         for formato, caminho in caminhos.items()]
+            for rotulo, caminho, executar in medicoes:
+                _, medicao = medir("Ingestão", rotulo, executar)
+                print(f"{rotulo:<22}{os.path.getsize(caminho) / 1e6:>14.1f}{medicao['ms']:>12.0f}"
+                      f"{medicao['pico_bytes'] / 1e6:>11.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# Benchmark da partida a frio do dashboard
+# Cada medição roda num processo Python novo (nada importado ainda), como um servidor
+# recém-iniciado: tempo de importação dos módulos do app, primeira pintura da tela de
+# login e primeira pintura da aba "Estatísticas da Turma" com uma turma já carregada
+# (inclui importar tudo o que a aba usa). As telas são executadas pelo AppTest do
+# Streamlit, sem navegador. Também compara as curvas normais pela fórmula fechada com
+# o scipy.stats.norm.pdf, usado antes.
+#
+# Uso: python benchmarks/bench_inicio.py [--estudantes 500] [--repeticoes 5]
+# Requer as dependências de benchmarks/requirements.txt (scipy)
+import argparse
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+from dados import DadosTurma  # noqa: E402
+from estatisticas import IndiceEstatisticas  # noqa: E402
+from gerar_planilha import gerar_turma  # noqa: E402
+from ingestao import normalizar_planilha  # noqa: E402
+
+MODULOS_APP = ["analise", "graficos", "estatisticas", "busca", "historico", "ingestao", "cache_compartilhado",
+               "trabalhos", "alteracoes", "tabelas", "credenciais", "instrumentacao", "dados", "coortes"]
+
+IMPORTACAO = """
+import time
+import streamlit
+inicio = time.perf_counter()
+for modulo in {modulos!r}:
+    __import__(modulo)
+print((time.perf_counter() - inicio) * 1000)
+"""
+
+LOGIN = """
+import time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+assert not at.exception, at.exception
+print((time.perf_counter() - inicio) * 1000)
+"""
+
+ESTATISTICAS = """
+import time
+inicio = time.perf_counter()
+import pickle
+from streamlit.testing.v1 import AppTest
+with open({indice!r}, "rb") as arquivo:
+    indice = pickle.load(arquivo)
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.session_state.logged_in = True
+at.session_state.indice = indice
+at.session_state.bimestre = "1º Bimestre"
+at.session_state.turma = "T"
+at.run()
+at.sidebar.radio[0].set_value("Estatísticas da Turma").run()
+assert not at.exception, at.exception
+print((time.perf_counter() - inicio) * 1000)
+"""
+
+
+def processo_novo(codigo, repeticoes, pasta):
+    tempos = []
+    for _ in range(repeticoes):
+        # Executado na pasta do app (imagens e credenciais), com banco e cache temporários
+        saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True,
+                               env=dict(os.environ, PYTHONPATH=RAIZ, HUMANITAS_BANCO=os.path.join(pasta, "h.db"),
+                                        HUMANITAS_CACHE=os.path.join(pasta, "cache")))
+        if saida.returncode:
+            raise RuntimeError(saida.stderr)
+        tempos.append(float(saida.stdout.strip().splitlines()[-1]))
+    return float(np.median(tempos))
+
+
+def curvas_scipy(medias, desvios, passos):
+    from scipy.stats import norm
+    x = medias[:, None] + passos[None, :] * desvios[:, None]
+    return norm.pdf(x, medias[:, None], desvios[:, None])
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mede a partida a frio do dashboard.")
+    parser.add_argument("--estudantes", type=int, default=500)
+    parser.add_argument("--disciplinas", type=int, default=14)
+    parser.add_argument("--repeticoes", type=int, default=5, help="Processos novos por medição (mediana)")
+    args = parser.parse_args(argumentos)
+
+    app = os.path.abspath(os.path.join(RAIZ, "humanitasweb2.py"))
+    indice = IndiceEstatisticas(DadosTurma(normalizar_planilha(gerar_turma(args.estudantes, args.disciplinas, 0.05))))
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_indice = os.path.join(pasta, "indice.pkl")
+        with open(caminho_indice, "wb") as arquivo:
+            pickle.dump(indice, arquivo)
+        medicoes = [
+            ("importação dos módulos do app", IMPORTACAO.format(modulos=MODULOS_APP)),
+            ("primeira pintura: login", LOGIN.format(app=app)),
+            ("primeira pintura: Estatísticas", ESTATISTICAS.format(app=app, indice=caminho_indice)),
+        ]
+        print(f"{'Medição (processo novo)':<36}{'ms':>10}")
+        for rotulo, codigo in medicoes:
+            print(f"{rotulo:<36}{processo_novo(codigo, args.repeticoes, pasta):>10.0f}")
+
+    # Curvas normais de todas as disciplinas: tabela padronizada x scipy (já importado)
+    from analise import curvas_normais
+    passos = np.linspace(-4, 4, 100)
+    curvas_scipy(indice.medias, indice.desvios, passos)
+    inicio = time.perf_counter()
+    for _ in range(1_000):
+        normais = curvas_normais(indice.contagens, indice.medias, indice.normais["m2"])
+    tabela = (time.perf_counter() - inicio) * 1000
+    inicio = time.perf_counter()
+    for _ in range(1_000):
+        referencia = curvas_scipy(indice.medias, indice.desvios, passos)
+    scipy = (time.perf_counter() - inicio) * 1000
+    print(f"Curvas normais ({args.disciplinas} disciplinas): {tabela:.3f} µs com a tabela padronizada, "
+          f"{scipy:.3f} µs com scipy; diferença máxima {np.nanmax(np.abs(normais['y_curvas'] - referencia)):.1e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
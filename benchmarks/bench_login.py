@@ -0,0 +1,58 @@
+# Benchmark da verificação de login: latência do scrypt e efeito do limitador de tentativas
+# Uso: python benchmarks/bench_login.py [--tentativas 20]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from credenciais import LimitadorTentativas, VerificadorCredenciais, gravar_arquivo, hash_senha  # noqa: E402
+
+LATENCIA_ALVO_MS = 250
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mede a verificação de login e o limitador de tentativas.")
+    parser.add_argument("--tentativas", type=int, default=20, help="Verificações medidas por caso")
+    args = parser.parse_args(argumentos)
+
+    tentativas = args.tentativas
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "credenciais.json")
+        gravar_arquivo({"usuarios": [{"usuario": "professor", "hash": hash_senha("correta")}]}, caminho)
+        verificador = VerificadorCredenciais(caminho)
+
+        for descricao, usuario, senha in [
+            ("senha correta", "professor", "correta"),
+            ("senha incorreta", "professor", "errada"),
+            ("usuário inexistente", "ninguem", "errada"),
+        ]:
+            tempos = []
+            for _ in range(tentativas):
+                inicio = time.perf_counter()
+                verificador.verificar(usuario, senha)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            tempos.sort()
+            print(f"{descricao:<20} mediana={tempos[len(tempos) // 2]:6.1f} ms  máx={tempos[-1]:6.1f} ms  "
+                  f"alvo={LATENCIA_ALVO_MS} ms")
+
+    # Ataque de força bruta: quantas tentativas passam pelo limitador em sequência
+    limitador = LimitadorTentativas()
+    permitidas = 0
+    for _ in range(1000):
+        if limitador.espera("usuario:professor@10.0.0.1", "ip:10.0.0.1") == 0:
+            permitidas += 1
+            limitador.registrar_falha("usuario:professor@10.0.0.1", "ip:10.0.0.1")
+    print(f"força bruta: {permitidas} de 1000 tentativas permitidas; "
+          f"próxima em {limitador.espera('usuario:professor@10.0.0.1'):.0f} s")
+
+    # Memória limitada: muitas chaves distintas não fazem o limitador crescer sem controle
+    for i in range(50_000):
+        limitador.registrar_falha(f"ip:{i}")
+    print(f"chaves mantidas após 50000 IPs distintos: {len(limitador)} (máx. {limitador.max_chaves})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+# Micro-benchmark do ajuste vertical dos pontos (ajustar_posicao_vertical)
+# Compara o laço com dicionário usado anteriormente nas três abas com a versão vetorizada.
+# Uso: python benchmarks/bench_posicao_vertical.py [--tamanhos 45 1000 10000 50000]
+# Requer as dependências de benchmarks/requirements.txt (scipy)
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.stats import norm
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from graficos import ajustar_posicao_vertical  # noqa: E402
+
+TAMANHOS = [45, 1_000, 10_000, 50_000]
+
+
+# Versão anterior (laço com dicionário e norm.pdf escalar), mantida como referência
+def ajustar_posicao_vertical_laco(notas, mean, std_dev):
+    contagem_notas = {}
+    posicoes_y = []
+    for nota in notas:
+        if nota not in contagem_notas:
+            contagem_notas[nota] = 0
+        else:
+            contagem_notas[nota] += 0.5
+        posicoes_y.append(norm.pdf(nota, mean, std_dev) + 0.02 * contagem_notas[nota])
+    return posicoes_y
+
+
+def cronometrar(funcao, *args, repeticoes=3):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Compara o ajuste vertical dos pontos em laço e vetorizado.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS, help="Quantidades de notas")
+    args = parser.parse_args(argumentos)
+
+    rng = np.random.default_rng(0)
+    for tamanho in args.tamanhos:
+        # Notas com uma casa decimal, como nas planilhas, para que haja muitas repetições
+        notas = np.round(np.clip(rng.normal(6.5, 1.5, tamanho), 0, 10), 1)
+        mean, std_dev = notas.mean(), notas.std(ddof=1)
+        tempo_laco, esperado = cronometrar(ajustar_posicao_vertical_laco, notas, mean, std_dev, repeticoes=1)
+        tempo_vetor, obtido = cronometrar(ajustar_posicao_vertical, notas, mean, std_dev)
+        assert np.allclose(esperado, obtido)
+        print(f"{tamanho:>8} notas  laço={tempo_laco * 1000:10.2f} ms  vetorizado={tempo_vetor * 1000:8.3f} ms  "
+              f"ganho={tempo_laco / tempo_vetor:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+# Benchmark das seis visões do dashboard, sem o Streamlit
+# Executa, para cada tamanho de turma, as mesmas etapas de cálculo e de construção de
+# gráficos que cada aba executa (as funções de estatisticas, busca, tabelas e graficos),
+# medindo o tempo, o pico de memória (tracemalloc) e o tamanho do JSON dos gráficos.
+# Cada etapa roda uma vez sem tracemalloc (tempo) e outra com tracemalloc (memória).
+#
+# Uso: python benchmarks/bench_visoes.py [--tamanhos 50 5000 100000] [--disciplinas 14]
+#                                        [--nan 0.05] [--excel] [--json resultados.json]
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from alteracoes import comparar_planilhas  # noqa: E402
+from analise import linhas_por_nome, notas_validas, perfil_estudante  # noqa: E402
+from busca import IndiceEstudantes  # noqa: E402
+from dados import DadosTurma  # noqa: E402
+from estatisticas import IndiceEstatisticas  # noqa: E402
+from gerar_planilha import gerar_planilha, gerar_turma  # noqa: E402
+from graficos import (figura_barras_notas, figura_boxplot, figura_comparacao, figura_normal_disciplina,  # noqa: E402
+                      figura_normal_estudante, figura_radar_estudante, figura_radar_turma, figura_ranking,
+                      figuras_normais_turma)
+from ingestao import normalizar_planilha  # noqa: E402
+from tabelas import fatia_pagina, filtrar_ordem, resumo_ranking  # noqa: E402
+
+TAMANHOS = [50, 5_000, 100_000]
+BIMESTRE = "1º Bimestre"
+
+
+# Tamanho do JSON enviado ao navegador, para etapas que devolvem gráficos
+def _bytes_graficos(resultado):
+    if isinstance(resultado, go.Figure):
+        return len(resultado.to_json())
+    if isinstance(resultado, list) and resultado and isinstance(resultado[0], tuple) and isinstance(resultado[0][1], go.Figure):
+        return sum(len(figura.to_json()) for _, figura in resultado)
+    return None
+
+
+def medir(visao, etapa, executar):
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = executar()
+    ms = (time.perf_counter() - inicio) * 1000
+
+    gc.collect()
+    tracemalloc.start()
+    executar()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return resultado, {"visao": visao, "etapa": etapa, "ms": ms, "pico_bytes": pico, "bytes_json": _bytes_graficos(resultado)}
+
+
+def medir_visoes(df):
+    medicoes = []
+
+    def etapa(visao, nome, executar):
+        resultado, medicao = medir(visao, nome, executar)
+        medicoes.append(medicao)
+        return resultado
+
+    # Carregamento (sidebar "Carregar Dados"): índices compartilhados por todas as abas
+    dados = etapa("Carregamento", "DadosTurma", lambda: DadosTurma(df))
+    indice = etapa("Carregamento", "IndiceEstatisticas", lambda: IndiceEstatisticas(dados))
+    estudantes = etapa("Carregamento", "IndiceEstudantes",
+                       lambda: IndiceEstudantes(dados))
+
+    # Visão Geral: ordenação, filtro por nome, página da tabela e médias por disciplina
+    disciplina = indice.disciplinas[0]
+    etapa("Visão Geral", "ordem + filtro + página", lambda: dados.tabela(fatia_pagina(
+        filtrar_ordem(indice.ordem(disciplina, True), estudantes.filtrar("silva")), 1, 50)[0]))
+    etapa("Visão Geral", "médias por disciplina", indice.medias_disciplinas)
+
+    # Busca de Estudante: busca por nome, dados do estudante e os dois gráficos
+    nome_buscado = str(indice.nomes[len(indice.nomes) // 2])
+    numero = etapa("Busca de Estudante", "buscar", lambda: estudantes.buscar(nome_buscado))[0]
+    aluno = etapa("Busca de Estudante", "estudante", lambda: estudantes.estudante(numero))
+    perfil = etapa("Busca de Estudante", "perfil", lambda: perfil_estudante(
+        indice.matriz, aluno["linha"], indice.disciplinas, indice.medias, estudantes.percentis))
+    etapa("Busca de Estudante", "figura normal", lambda: figura_normal_estudante(perfil["disciplinas"], perfil["notas"], BIMESTRE))
+    etapa("Busca de Estudante", "figura radar", lambda: figura_radar_estudante(perfil["disciplinas"], perfil["notas"], aluno["nome"]))
+
+    # Estatísticas da Turma: tabela, boxplot, radar e uma normal por disciplina
+    etapa("Estatísticas da Turma", "tabela", indice.tabela_estatisticas)
+    matriz = etapa("Estatísticas da Turma", "matriz decodificada", lambda: indice.matriz)
+    etapa("Estatísticas da Turma", "figura boxplot", lambda: figura_boxplot(indice.disciplinas, matriz, BIMESTRE, indice.quantis))
+    etapa("Estatísticas da Turma", "figura radar", lambda: figura_radar_turma(indice.disciplinas, indice.medias, BIMESTRE))
+    etapa("Estatísticas da Turma", "figuras normais", lambda: figuras_normais_turma(
+        indice.nomes, indice.disciplinas, matriz, BIMESTRE, indice.normais))
+
+    # Ranking de Estudantes: tabela paginada e gráfico resumido (20 no topo e 20 na base)
+    ordem = indice.ordem("Final score")
+    validas = ordem[:int(indice.contagens[indice.posicao["Final score"]])]
+    etapa("Ranking de Estudantes", "página", lambda: indice.linhas_ranking("Final score", fatia_pagina(ordem, 1, 50)[0]))
+    rotulos, valores, cores = etapa("Ranking de Estudantes", "resumo", lambda: resumo_ranking(
+        indice.nomes[validas], indice.notas("Final score")[validas], 20))
+    etapa("Ranking de Estudantes", "figura ranking", lambda: figura_ranking(rotulos, valores, cores, "Final score", BIMESTRE))
+
+    # Comparação de Estudante: três estudantes selecionados pelo nome
+    selecionados = [str(nome) for nome in indice.nomes[:3]]
+    linhas = etapa("Comparação de Estudante", "seleção", lambda: linhas_por_nome(indice.nomes, selecionados))
+    notas_selecionados = etapa("Comparação de Estudante", "notas", lambda: dados.matriz(linhas=linhas))
+    etapa("Comparação de Estudante", "figura comparação", lambda: figura_comparacao(
+        indice.nomes[linhas], indice.disciplinas, notas_selecionados, BIMESTRE))
+
+    # Ranking por Disciplina: barras e normal da disciplina selecionada
+    nomes, notas = notas_validas(indice.nomes, indice.notas(disciplina))
+    etapa("Ranking por Disciplina", "figura barras", lambda: figura_barras_notas(nomes, notas, disciplina, BIMESTRE))
+    etapa("Ranking por Disciplina", "figura normal", lambda: figura_normal_disciplina(
+        nomes, notas, indice.medias[indice.posicao[disciplina]], indice.desvios[indice.posicao[disciplina]], f"Distribuição Normal das Notas em {disciplina}"))
+
+    # Recarregamento de uma versão corrigida: 1% dos estudantes com uma nota alterada
+    corrigida = df.copy()
+    linhas_corrigidas = np.arange(0, len(df), 100)
+    corrigida.loc[corrigida.index[linhas_corrigidas], disciplina] = 10.0
+    etapa("Recarregamento", "comparar planilhas", lambda: comparar_planilhas(df, corrigida))
+    etapa("Recarregamento", "índice completo", lambda: IndiceEstatisticas(corrigida))
+    etapa("Recarregamento", "índice incremental", lambda: indice.atualizado(corrigida))
+    return medicoes
+
+
+def medir_excel(estudantes, disciplinas, proporcao_nan):
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = gerar_planilha(os.path.join(diretorio, "turma.xlsx"), 1, estudantes, disciplinas, proporcao_nan)
+        _, medicao = medir("Carregamento", "leitura do Excel", lambda: normalizar_planilha(pd.read_excel(caminho)))
+    return medicao
+
+
+def imprimir(estudantes, medicoes):
+    print(f"\n{estudantes} estudantes")
+    print(f"{'visão':<24}{'etapa':<26}{'tempo (ms)':>12}{'pico (MiB)':>12}{'JSON (KiB)':>12}")
+    for m in medicoes:
+        json_kib = f"{m['bytes_json'] / 1024:.1f}" if m["bytes_json"] is not None else "-"
+        print(f"{m['visao']:<24}{m['etapa']:<26}{m['ms']:>12.1f}{m['pico_bytes'] / 2 ** 20:>12.2f}{json_kib:>12}")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Mede o cálculo e a construção dos gráficos de cada visão.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS, help="Números de estudantes")
+    parser.add_argument("--disciplinas", type=int, default=14)
+    parser.add_argument("--nan", type=float, default=0.05, help="Proporção de notas em branco")
+    parser.add_argument("--excel", action="store_true", help="Mede também a leitura da planilha .xlsx (lento)")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo JSON")
+    args = parser.parse_args(argumentos)
+
+    resultados = {}
+    for estudantes in args.tamanhos:
+        df = normalizar_planilha(gerar_turma(estudantes, args.disciplinas, args.nan))
+        medicoes = medir_visoes(df)
+        if args.excel:
+            medicoes.insert(0, medir_excel(estudantes, args.disciplinas, args.nan))
+        imprimir(estudantes, medicoes)
+        resultados[estudantes] = medicoes
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump({"disciplinas": args.disciplinas, "nan": args.nan, "resultados": resultados},
+                      arquivo, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# Gerador de planilhas sintéticas no formato do dashboard (Numero / Nome / disciplinas / Final score)
+# As notas seguem uma normal por disciplina, com uma proporção configurável de notas em branco.
+# A mesma semente gera sempre a mesma planilha, para que as medições sejam comparáveis.
+#
+# Uso: python benchmarks/gerar_planilha.py SAIDA.xlsx [--estudantes N] [--disciplinas N]
+#                                          [--planilhas N] [--nan 0.05] [--semente 0]
+import argparse
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+DISCIPLINAS = [
+    "Português", "Matemática", "História", "Geografia", "Ciências", "Inglês", "Artes",
+    "Educação Física", "Física", "Química", "Biologia", "Filosofia", "Sociologia", "Espanhol",
+]
+PRENOMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+            "Larissa", "Mateus", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago", "Valentina", "Yuri"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Rodrigues", "Almeida",
+              "Nascimento", "Araújo", "Ferreira", "Carvalho", "Gomes", "Martins", "Rocha", "Ribeiro", "Barbosa"]
+
+
+def nomes_disciplinas(quantidade):
+    if quantidade <= len(DISCIPLINAS):
+        return DISCIPLINAS[:quantidade]
+    return DISCIPLINAS + [f"Disciplina {j}" for j in range(len(DISCIPLINAS) + 1, quantidade + 1)]
+
+
+# Uma turma: "Numero", "Nome", uma coluna por disciplina e "Final score" (média das disciplinas)
+def gerar_turma(estudantes=45, disciplinas=14, proporcao_nan=0.05, semente=0, primeiro_numero=1):
+    rng = np.random.default_rng(semente)
+    colunas = nomes_disciplinas(disciplinas)
+    medias = rng.uniform(5.0, 8.0, len(colunas))
+    desvios = rng.uniform(1.0, 2.0, len(colunas))
+    notas = np.round(np.clip(rng.normal(medias, desvios, (estudantes, len(colunas))), 0, 10), 1)
+    notas[rng.random(notas.shape) < proporcao_nan] = np.nan
+
+    prenomes = rng.choice(PRENOMES, estudantes)
+    sobrenomes = rng.choice(SOBRENOMES, (estudantes, 2))
+    nomes = pd.Series([f"{p} {s1} {s2}" for p, (s1, s2) in zip(prenomes, sobrenomes)])
+    # Nomes repetidos recebem um número ("Ana Silva Lima 2"), como a comparação por nome exige
+    repeticao = nomes.groupby(nomes).cumcount()
+    nomes = nomes.where(repeticao == 0, nomes + " " + (repeticao + 1).astype(str))
+
+    df = pd.DataFrame(notas, columns=colunas)
+    df.insert(0, "Nome", nomes)
+    df.insert(0, "Numero", np.arange(primeiro_numero, primeiro_numero + estudantes))
+    with warnings.catch_warnings():  # Estudantes sem nenhuma nota ficam com Final score em branco
+        warnings.simplefilter("ignore", RuntimeWarning)
+        df["Final score"] = np.round(np.nanmean(notas, axis=1), 2) if colunas else np.nan
+    return df
+
+
+# Várias turmas (uma por planilha), com numeração contínua entre elas
+def gerar_turmas(planilhas=1, estudantes=45, disciplinas=14, proporcao_nan=0.05, semente=0):
+    return {
+        f"Turma {i + 1}": gerar_turma(estudantes, disciplinas, proporcao_nan, semente + i, i * estudantes + 1)
+        for i in range(planilhas)
+    }
+
+
+def gerar_planilha(caminho, planilhas=1, estudantes=45, disciplinas=14, proporcao_nan=0.05, semente=0):
+    with pd.ExcelWriter(caminho) as escritor:
+        for nome, df in gerar_turmas(planilhas, estudantes, disciplinas, proporcao_nan, semente).items():
+            df.to_excel(escritor, sheet_name=nome, index=False)
+    return caminho
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Gera uma planilha de notas sintética para testes de desempenho.")
+    parser.add_argument("saida", help="Arquivo .xlsx de saída")
+    parser.add_argument("--estudantes", type=int, default=45, help="Estudantes por planilha")
+    parser.add_argument("--disciplinas", type=int, default=14)
+    parser.add_argument("--planilhas", type=int, default=1, help="Número de planilhas (turmas)")
+    parser.add_argument("--nan", type=float, default=0.05, help="Proporção de notas em branco")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args(argumentos)
+
+    gerar_planilha(args.saida, args.planilhas, args.estudantes, args.disciplinas, args.nan, args.semente)
+    print(f"{args.saida}: {args.planilhas} planilha(s) com {args.estudantes} estudantes e {args.disciplinas} disciplinas.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# Índice de busca de estudantes
+# Construído no carregamento da planilha: localiza um estudante pelo "Numero" ou pelo
+# nome (prefixo de qualquer palavra, com busca aproximada como alternativa) em tempo
+# constante, com os percentis de cada disciplina já calculados. As notas de um estudante
+# são decodificadas dos dados compactos da planilha quando ele é consultado.
+import bisect
+import copy
+import difflib
+import unicodedata
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from analise import calcular_percentis
+
+
+# Remove acentos, maiúsculas e espaços repetidos ("  JOÃO da Silva" -> "joao da silva")
+def normalizar_nome(nome):
+    sem_acentos = unicodedata.normalize("NFKD", str(nome)).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sem_acentos.casefold().split())
+
+
+def _trigramas(texto):
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceEstudantes:
+    # "dados": dados compactos da planilha (DadosTurma); "matriz": as notas já decodificadas,
+    # se quem chama já as tiver (usadas só para os percentis, não ficam no índice)
+    def __init__(self, dados, matriz=None):
+        self.dados = dados
+        self.numeros = dados.numeros
+        self.nomes = dados.nomes
+        self.disciplinas = list(dados.disciplinas)
+        self.percentis = calcular_percentis(dados.matriz() if matriz is None else matriz)
+
+        # Numero -> linha da planilha
+        self.por_numero = {}
+        for linha, numero in enumerate(self.numeros):
+            if numero == numero:  # Ignora números em branco (NaN)
+                self.por_numero.setdefault(int(numero), linha)
+
+        # Lista ordenada com o nome normalizado a partir do início de cada palavra,
+        # para que "silva" encontre "Maria da Silva" por busca binária
+        self.nomes_normalizados = [normalizar_nome(nome) for nome in self.nomes]
+        self.sufixos = []
+        self.trigramas = defaultdict(list)
+        for linha, nome in enumerate(self.nomes_normalizados):
+            inicio = 0
+            for palavra in nome.split(" "):
+                self.sufixos.append((nome[inicio:], linha))
+                inicio += len(palavra) + 1
+            for trigrama in _trigramas(nome):
+                self.trigramas[trigrama].append(linha)
+        self.sufixos.sort()
+
+    def __len__(self):
+        return len(self.por_numero)
+
+    # Índice para uma versão corrigida da mesma planilha: só os percentis das disciplinas
+    # alteradas são recalculados; os nomes só são reindexados se mudaram
+    def atualizado(self, dados, colunas):
+        if not np.array_equal(self.nomes, dados.nomes):
+            return IndiceEstudantes(dados)
+        novo = copy.copy(self)
+        novo.dados = dados
+        novo.numeros = dados.numeros
+        novo.nomes = dados.nomes
+        novo.percentis = self.percentis.copy()
+        alteradas = [dados.notas(self.disciplinas[j]) for j in colunas]
+        if alteradas:
+            novo.percentis[:, colunas] = calcular_percentis(np.column_stack(alteradas))
+        return novo
+
+    def linha(self, numero):
+        return self.por_numero.get(int(numero))
+
+    # Dados completos de um estudante: nome, notas e percentis por disciplina
+    def estudante(self, numero):
+        linha = self.linha(numero)
+        if linha is None:
+            return None
+        return {
+            "linha": linha,
+            "numero": int(numero),
+            "nome": self.nomes[linha],
+            "notas": dict(zip(self.disciplinas, self.dados.matriz(linhas=[linha])[0])),
+            "percentis": dict(zip(self.disciplinas, self.percentis[linha])),
+        }
+
+    # Estudantes cujo nome tem alguma palavra começando pelo texto informado
+    def buscar_prefixo(self, texto, limite=20):
+        texto = normalizar_nome(texto)
+        linhas = []
+        posicao = bisect.bisect_left(self.sufixos, (texto, -1))
+        while posicao < len(self.sufixos) and len(linhas) < limite:
+            sufixo, linha = self.sufixos[posicao]
+            if not sufixo.startswith(texto):
+                break
+            if linha not in linhas:
+                linhas.append(linha)
+            posicao += 1
+        return linhas
+
+    # Busca aproximada (erros de digitação): pré-seleciona candidatos pelos trigramas
+    # em comum e ordena pela similaridade do difflib
+    def buscar_aproximado(self, texto, limite=20, candidatos=200, corte=0.5):
+        texto = normalizar_nome(texto)
+        contagem = Counter()
+        for trigrama in _trigramas(texto):
+            contagem.update(self.trigramas.get(trigrama, ()))
+        similares = []
+        for linha, _ in contagem.most_common(candidatos):
+            razao = difflib.SequenceMatcher(None, texto, self.nomes_normalizados[linha]).ratio()
+            if razao >= corte:
+                similares.append((-razao, linha))
+        return [linha for _, linha in sorted(similares)[:limite]]
+
+    # Máscara das linhas cujo nome contém o texto (sem acentos e sem diferenciar maiúsculas)
+    def filtrar(self, texto):
+        texto = normalizar_nome(texto)
+        return np.fromiter((texto in nome for nome in self.nomes_normalizados), dtype=bool, count=len(self.nomes))
+
+    # Busca por número (exato) ou por nome (prefixo e, se nada for encontrado, aproximada).
+    # Devolve os números dos estudantes encontrados
+    def buscar(self, consulta, limite=20):
+        consulta = str(consulta).strip()
+        if not consulta:
+            return []
+        if consulta.isdigit():
+            return [int(consulta)] if int(consulta) in self.por_numero else []
+        linhas = self.buscar_prefixo(consulta, limite) or self.buscar_aproximado(consulta, limite)
+        return [int(self.numeros[linha]) for linha in linhas if self.numeros[linha] == self.numeros[linha]]
@@ -0,0 +1,147 @@
+# Cache compartilhado entre sessões
+# Um único cache por processo, com chaves (hash do arquivo, planilha, visão, ...):
+# vários professores olhando a mesma turma reaproveitam os mesmos agregados e
+# gráficos já prontos. Os gráficos ficam serializados em JSON (Plotly) e o cache
+# respeita um limite total de bytes, removendo as entradas usadas há mais tempo.
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.io as pio
+
+LIMITE_MEMORIA_BYTES = int(os.environ.get("HUMANITAS_CACHE_MEMORIA", 256 * 1024 * 1024))
+
+
+# Tamanho aproximado de um objeto em memória: arrays NumPy, textos e os atributos
+# de objetos simples (como os índices de estatísticas e de busca)
+def tamanho_aproximado(objeto, _vistos=None):
+    vistos = set() if _vistos is None else _vistos
+    if id(objeto) in vistos:
+        return 0
+    vistos.add(id(objeto))
+    if isinstance(objeto, np.ndarray):
+        total = objeto.nbytes
+        if objeto.dtype == object:
+            total += sum(sys.getsizeof(item) for item in objeto.ravel())
+        return total
+    if isinstance(objeto, (str, bytes)):
+        return sys.getsizeof(objeto)
+    if isinstance(objeto, dict):
+        return sys.getsizeof(objeto) + sum(
+            tamanho_aproximado(chave, vistos) + tamanho_aproximado(valor, vistos) for chave, valor in objeto.items()
+        )
+    if isinstance(objeto, (list, tuple, set)):
+        return sys.getsizeof(objeto) + sum(tamanho_aproximado(item, vistos) for item in objeto)
+    if hasattr(objeto, "memory_usage"):  # DataFrame / Series
+        uso = objeto.memory_usage(deep=True)
+        return int(uso.sum()) if hasattr(uso, "sum") else int(uso)
+    if hasattr(objeto, "__dict__"):
+        return sys.getsizeof(objeto) + tamanho_aproximado(vars(objeto), vistos)
+    return sys.getsizeof(objeto)
+
+
+class CacheCompartilhado:
+    def __init__(self, limite_bytes=LIMITE_MEMORIA_BYTES):
+        self.limite_bytes = limite_bytes
+        self._entradas = OrderedDict()  # chave -> (valor, bytes)
+        self._calculando = {}  # chave -> evento, para não calcular duas vezes a mesma chave
+        self._trava = threading.Lock()
+        self.bytes = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.remocoes = 0
+        self.bytes_removidos = 0
+
+    def _guardar(self, chave, valor, tamanho):
+        if tamanho > self.limite_bytes:
+            return  # Maior que o cache inteiro: não é guardado
+        if chave in self._entradas:
+            self.bytes -= self._entradas.pop(chave)[1]
+        self._entradas[chave] = (valor, tamanho)
+        self.bytes += tamanho
+        while self.bytes > self.limite_bytes:
+            _, (_, removido) = self._entradas.popitem(last=False)
+            self.bytes -= removido
+            self.remocoes += 1
+            self.bytes_removidos += removido
+
+    # Devolve o valor da chave, calculando-o (uma única vez, mesmo com sessões
+    # concorrentes) quando não está no cache. Chave None desativa o cache.
+    def obter(self, chave, calcular, tamanho=tamanho_aproximado):
+        if chave is None:
+            return calcular()
+        while True:
+            with self._trava:
+                if chave in self._entradas:
+                    self._entradas.move_to_end(chave)
+                    self.acertos += 1
+                    return self._entradas[chave][0]
+                evento = self._calculando.get(chave)
+                if evento is None:
+                    self.faltas += 1
+                    evento = self._calculando[chave] = threading.Event()
+                    break
+            # Outra sessão já está calculando esta chave: espera o resultado
+            evento.wait()
+        try:
+            valor = calcular()
+            with self._trava:
+                self._guardar(chave, valor, tamanho(valor))
+            return valor
+        finally:
+            with self._trava:
+                self._calculando.pop(chave, None)
+            evento.set()
+
+    def contem(self, chave):
+        with self._trava:
+            return chave in self._entradas
+
+    # Gráfico Plotly guardado como JSON; cada sessão recebe uma cópia própria da figura
+    def figura(self, chave, construir):
+        texto = self.obter(chave, lambda: construir().to_json(), tamanho=len)
+        return pio.from_json(texto)
+
+    # Lista de gráficos (rótulo, figura), guardada como uma única entrada
+    def figuras(self, chave, construir):
+        textos = self.obter(
+            chave,
+            lambda: [(rotulo, figura.to_json()) for rotulo, figura in construir()],
+            tamanho=lambda valor: sum(len(texto) for _, texto in valor),
+        )
+        return [(rotulo, pio.from_json(texto)) for rotulo, texto in textos]
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+            self.bytes = 0
+
+    def estatisticas(self):
+        with self._trava:
+            consultas = self.acertos + self.faltas
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self.bytes,
+                "limite_bytes": self.limite_bytes,
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+                "remocoes": self.remocoes,
+                "bytes_removidos": self.bytes_removidos,
+            }
+
+
+_cache_do_processo = None
+_trava_processo = threading.Lock()
+
+
+# Cache único do processo: o dashboard e a API, quando rodam no mesmo processo, usam o
+# mesmo cache em memória (e, com as mesmas chaves, reaproveitam os índices um do outro)
+def cache_do_processo():
+    global _cache_do_processo
+    with _trava_processo:
+        if _cache_do_processo is None:
+            _cache_do_processo = CacheCompartilhado()
+        return _cache_do_processo
@@ -0,0 +1,95 @@
+# Filtros de estudantes (coortes) por mapas de bits
+# No carregamento são calculados, uma única vez, mapas de bits (1 bit por estudante, com
+# np.packbits) para aprovados e reprovados no Final score e, em cada disciplina, para quem
+# ficou abaixo da nota de aprovação. Condições como "nota > 8" são calculadas na primeira
+# vez que alguém as pede e guardadas. Um filtro combinado é a interseção (AND) dos mapas,
+# sem percorrer de novo as notas.
+import operator
+import os
+import threading
+
+import numpy as np
+
+from analise import COLUNA_FINAL
+from dados import somente_leitura
+
+NOTA_APROVACAO = float(os.environ.get("HUMANITAS_NOTA_APROVACAO", 6.0))
+OPERADORES = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+APROVADOS = "aprovados"
+REPROVADOS = "reprovados"
+
+
+# Chave do mapa de quem ficou abaixo da nota de aprovação numa disciplina
+def abaixo_da_aprovacao(disciplina):
+    return ("abaixo", disciplina)
+
+
+# Descrição de uma coorte para a interface
+def descrever(chave, nota_aprovacao=NOTA_APROVACAO):
+    if chave == APROVADOS:
+        return f"Aprovados ({COLUNA_FINAL} >= {nota_aprovacao:g})"
+    if chave == REPROVADOS:
+        return f"Reprovados ({COLUNA_FINAL} < {nota_aprovacao:g})"
+    if chave[0] == "abaixo":
+        return f"{chave[1]} < {nota_aprovacao:g}"
+    disciplina, simbolo, limiar = chave
+    return f"{disciplina} {simbolo} {limiar:g}"
+
+
+class IndiceCoortes:
+    # "dados": dados compactos da planilha (DadosTurma), dos quais as condições novas decodificam
+    # só a coluna da disciplina; "matriz": as notas já decodificadas, usadas só no carregamento
+    def __init__(self, dados, matriz=None, nota_aprovacao=NOTA_APROVACAO):
+        matriz = dados.matriz() if matriz is None else matriz
+        self.total = matriz.shape[0]
+        self.disciplinas = list(dados.disciplinas)
+        self.nota_aprovacao = nota_aprovacao
+        self._dados = dados
+        self._trava = threading.Lock()
+        self.mapas = {}
+        # Notas em branco não entram em nenhum mapa (as comparações com NaN são falsas)
+        with np.errstate(invalid="ignore"):
+            if COLUNA_FINAL in self.disciplinas:
+                final = matriz[:, self.disciplinas.index(COLUNA_FINAL)]
+                self.mapas[APROVADOS] = somente_leitura(np.packbits(final >= nota_aprovacao))
+                self.mapas[REPROVADOS] = somente_leitura(np.packbits(final < nota_aprovacao))
+            abaixo = matriz < nota_aprovacao
+        for j, disciplina in enumerate(self.disciplinas):
+            self.mapas[abaixo_da_aprovacao(disciplina)] = somente_leitura(np.packbits(abaixo[:, j]))
+
+    # Cópia para outro processo (fila de trabalhos): a trava não é serializável
+    def __getstate__(self):
+        estado = dict(self.__dict__)
+        del estado["_trava"]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._trava = threading.Lock()
+        for mapa in self.mapas.values():
+            somente_leitura(mapa)
+
+    # Mapa de uma condição "disciplina operador limiar" (ex.: "Matemática", ">", 8),
+    # calculado uma única vez; devolve a chave do mapa
+    def condicao(self, disciplina, simbolo, limiar):
+        chave = (disciplina, simbolo, float(limiar))
+        with self._trava:
+            if chave in self.mapas:
+                return chave
+        with np.errstate(invalid="ignore"):
+            mapa = somente_leitura(np.packbits(OPERADORES[simbolo](self._dados.notas(disciplina), float(limiar))))
+        with self._trava:
+            self.mapas.setdefault(chave, mapa)
+        return chave
+
+    # Interseção dos mapas como máscara booleana por estudante (sem chaves: todos)
+    def mascara(self, *chaves):
+        if not chaves:
+            return np.ones(self.total, dtype=bool)
+        mapa = self.mapas[chaves[0]]
+        for chave in chaves[1:]:
+            mapa = np.bitwise_and(mapa, self.mapas[chave])
+        return np.unpackbits(mapa, count=self.total).view(bool)
+
+    def contar(self, *chaves):
+        return int(np.count_nonzero(self.mascara(*chaves)))
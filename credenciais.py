@@ -0,0 +1,196 @@
+# Armazenamento e verificação das credenciais de acesso
+# As senhas ficam no credenciais.json apenas como hash scrypt com salt individual.
+# A verificação usa comparação em tempo constante e um limitador de tentativas
+# (token bucket por usuário em cada IP e por IP, com memória limitada): falhas vindas
+# de outro endereço não bloqueiam o usuário, e um login correto devolve as fichas dele.
+#
+# Uso: python credenciais.py adicionar USUARIO [--admin | --no-admin]
+#      python credenciais.py remover USUARIO
+#      python credenciais.py migrar        (converte senhas em texto puro para hash)
+import argparse
+import base64
+import getpass
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+ARQUIVO_CREDENCIAIS = "credenciais.json"
+
+# Parâmetros do scrypt: ~16 MiB de memória e dezenas de milissegundos por verificação
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+TAMANHO_SALT = 16
+TAMANHO_HASH = 32
+
+
+def _b64(dados):
+    return base64.b64encode(dados).decode("ascii")
+
+
+# Gera o hash de uma senha no formato "scrypt$n$r$p$salt$hash"
+def hash_senha(senha, salt=None, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    salt = salt or secrets.token_bytes(TAMANHO_SALT)
+    derivado = hashlib.scrypt(senha.encode("utf-8"), salt=salt, n=n, r=r, p=p, dklen=TAMANHO_HASH)
+    return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(derivado)}"
+
+
+# Confere uma senha contra um hash gerado por hash_senha (comparação em tempo constante)
+def conferir_hash(senha, hash_armazenado):
+    try:
+        algoritmo, n, r, p, salt, esperado = hash_armazenado.split("$")
+        if algoritmo != "scrypt":
+            return False
+        esperado = base64.b64decode(esperado)
+        derivado = hashlib.scrypt(senha.encode("utf-8"), salt=base64.b64decode(salt),
+                                  n=int(n), r=int(r), p=int(p), dklen=len(esperado))
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(derivado, esperado)
+
+
+def ler_arquivo(caminho=ARQUIVO_CREDENCIAIS):
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def gravar_arquivo(dados, caminho=ARQUIVO_CREDENCIAIS):
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo, indent=4, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+# Verificador mantido em memória: o arquivo só é relido quando muda no disco
+class VerificadorCredenciais:
+    def __init__(self, caminho=ARQUIVO_CREDENCIAIS):
+        self.caminho = caminho
+        self._modificado = None
+        self._usuarios = {}
+        self._trava = threading.Lock()
+        # Hash de referência para usuários inexistentes: o tempo de resposta
+        # não revela se o usuário existe
+        self._hash_falso = hash_senha(secrets.token_hex(16))
+
+    def _atualizar(self):
+        modificado = os.path.getmtime(self.caminho)
+        if modificado != self._modificado:
+            with self._trava:
+                usuarios = {}
+                for usuario in ler_arquivo(self.caminho)["usuarios"]:
+                    usuarios[usuario["usuario"]] = usuario
+                self._usuarios, self._modificado = usuarios, modificado
+
+    def usuario(self, nome):
+        self._atualizar()
+        return self._usuarios.get(nome)
+
+    def verificar(self, nome, senha):
+        registro = self.usuario(nome)
+        if registro is None:
+            conferir_hash(senha, self._hash_falso)
+            return False
+        if "hash" in registro:
+            return conferir_hash(senha, registro["hash"])
+        # Compatibilidade com arquivos ainda não migrados (senha em texto puro)
+        return hmac.compare_digest(str(registro.get("senha", "")).encode("utf-8"), senha.encode("utf-8"))
+
+
+# Limitador de tentativas de login: um "balde" de fichas por chave (ex.: usuário em um IP,
+# ou o IP). Cada falha consome uma ficha; as fichas voltam aos poucos, ou de uma vez com
+# registrar_sucesso. Guarda no máximo
+# "max_chaves" baldes, descartando os usados há mais tempo.
+class LimitadorTentativas:
+    def __init__(self, capacidade=5, fichas_por_segundo=1 / 60, max_chaves=10_000):
+        self.capacidade = capacidade
+        self.fichas_por_segundo = fichas_por_segundo
+        self.max_chaves = max_chaves
+        self._baldes = OrderedDict()
+        self._trava = threading.Lock()
+
+    def _fichas(self, chave, agora):
+        fichas, ultimo = self._baldes.get(chave, (self.capacidade, agora))
+        return min(self.capacidade, fichas + (agora - ultimo) * self.fichas_por_segundo)
+
+    # Segundos até a próxima tentativa ser permitida (0 se já pode tentar)
+    def espera(self, *chaves):
+        agora = time.monotonic()
+        with self._trava:
+            faltando = [1 - self._fichas(chave, agora) for chave in chaves if chave in self._baldes]
+        maior = max(faltando, default=0)
+        return maior / self.fichas_por_segundo if maior > 0 else 0.0
+
+    def registrar_falha(self, *chaves):
+        agora = time.monotonic()
+        with self._trava:
+            for chave in chaves:
+                self._baldes[chave] = (max(0.0, self._fichas(chave, agora) - 1), agora)
+                self._baldes.move_to_end(chave)
+            while len(self._baldes) > self.max_chaves:
+                self._baldes.popitem(last=False)
+
+    # Login correto: as chaves informadas voltam à capacidade total
+    def registrar_sucesso(self, *chaves):
+        with self._trava:
+            for chave in chaves:
+                self._baldes.pop(chave, None)
+
+    def __len__(self):
+        return len(self._baldes)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Gerencia os usuários do dashboard.")
+    parser.add_argument("--arquivo", default=ARQUIVO_CREDENCIAIS)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    adicionar = comandos.add_parser("adicionar", help="Adiciona um usuário ou troca a senha de um existente")
+    adicionar.add_argument("usuario")
+    adicionar.add_argument("--admin", action=argparse.BooleanOptionalAction, default=None,
+                           help="Dá (--admin) ou retira (--no-admin) o acesso ao painel de instrumentação; "
+                                "sem a opção, um usuário existente mantém o acesso que tinha")
+    remover = comandos.add_parser("remover", help="Remove um usuário")
+    remover.add_argument("usuario")
+    comandos.add_parser("migrar", help="Converte senhas em texto puro para hash")
+    args = parser.parse_args(argumentos)
+
+    dados = ler_arquivo(args.arquivo) if os.path.exists(args.arquivo) else {"usuarios": []}
+    usuarios = dados["usuarios"]
+
+    if args.comando == "adicionar":
+        senha = getpass.getpass("Senha: ")
+        if not senha or senha != getpass.getpass("Confirme a senha: "):
+            print("As senhas não conferem.")
+            return 1
+        registro = next((u for u in usuarios if u["usuario"] == args.usuario), None)
+        if registro is None:
+            registro = {"usuario": args.usuario}
+            usuarios.append(registro)
+        registro.pop("senha", None)
+        registro["hash"] = hash_senha(senha)
+        if args.admin:
+            registro["admin"] = True
+        elif args.admin is not None:
+            registro.pop("admin", None)
+    elif args.comando == "remover":
+        dados["usuarios"] = [u for u in usuarios if u["usuario"] != args.usuario]
+        if len(dados["usuarios"]) == len(usuarios):
+            print(f"Usuário '{args.usuario}' não encontrado.")
+            return 1
+    elif args.comando == "migrar":
+        for registro in usuarios:
+            if "senha" in registro:
+                registro["hash"] = hash_senha(registro.pop("senha"))
+
+    gravar_arquivo(dados, args.arquivo)
+    print("Credenciais atualizadas.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
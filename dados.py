@@ -0,0 +1,104 @@
+# Dados compactos e imutáveis de uma planilha carregada
+# Substituem o DataFrame guardado em cada sessão: um único objeto por planilha, guardado
+# no cache compartilhado, com as notas em inteiros escalados (uint8 com uma casa decimal,
+# uint16 com duas) quando cabem sem perda ou em float32, os nomes internados (um único
+# texto por nome repetido) e todos os arrays somente leitura, de modo que nenhuma aba
+# altera os dados das outras.
+import sys
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_FIXAS = ["Numero", "Nome"]
+# Codificações tentadas em ordem: (tipo inteiro, escala); o maior valor do tipo marca
+# a nota em branco
+CODIFICACOES = [(np.uint8, 10), (np.uint16, 100)]
+
+
+def somente_leitura(array):
+    array.flags.writeable = False
+    return array
+
+
+# Codifica a matriz de notas como nota x escala no menor tipo inteiro em que todas as
+# notas cabem sem perda (ex.: 0 a 10 com uma casa decimal -> uint8); caso contrário
+# mantém em float32. Devolve a matriz codificada e a escala (None para float32).
+def codificar_notas(notas):
+    notas = np.asarray(notas, dtype=np.float32)
+    validas = ~np.isnan(notas)
+    for tipo, escala in CODIFICACOES:
+        escaladas = np.round(notas[validas].astype(np.float64) * escala)
+        if ((escaladas >= 0) & (escaladas < np.iinfo(tipo).max)).all() and \
+                np.allclose(escaladas / escala, notas[validas], rtol=0, atol=1e-4):
+            codificadas = np.full(notas.shape, np.iinfo(tipo).max, dtype=tipo)
+            codificadas[validas] = escaladas
+            return codificadas, escala
+    return notas.copy(), None
+
+
+def decodificar_notas(codificadas, escala, dtype=np.float64):
+    notas = codificadas.astype(dtype)
+    if escala is not None:
+        notas[codificadas == np.iinfo(codificadas.dtype).max] = np.nan
+        notas /= escala
+    return notas
+
+
+class DadosTurma:
+    def __init__(self, df):
+        self.disciplinas = tuple(str(coluna) for coluna in df.columns if coluna not in COLUNAS_FIXAS)
+        self.posicao = {disciplina: j for j, disciplina in enumerate(self.disciplinas)}
+        self.numeros = somente_leitura(df["Numero"].to_numpy().copy())
+
+        # Nomes repetidos apontam para o mesmo texto (nome em branco vira "")
+        nomes = df["Nome"]
+        if not isinstance(nomes.dtype, pd.CategoricalDtype):
+            nomes = nomes.astype("string").astype("category")
+        categorias = [sys.intern(str(nome)) for nome in nomes.cat.categories.to_numpy(dtype=object).tolist()]
+        self.nomes = somente_leitura(np.array(categorias + [""], dtype=object)[nomes.cat.codes.to_numpy()])
+
+        codificadas, self.escala = codificar_notas(df[list(self.disciplinas)].to_numpy(dtype=np.float32))
+        self.codificadas = somente_leitura(codificadas)
+
+    # Cópia recebida de outro processo (fila de trabalhos): continua somente leitura
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        for array in (self.numeros, self.nomes, self.codificadas):
+            somente_leitura(array)
+
+    def __len__(self):
+        return len(self.numeros)
+
+    # Dados só das linhas informadas (ex.: uma coorte), na ordem original, também somente leitura
+    def subconjunto(self, linhas):
+        linhas = np.asarray(linhas, dtype=np.intp)
+        sub = object.__new__(DadosTurma)
+        sub.__dict__.update(self.__dict__)
+        for nome in ("numeros", "nomes", "codificadas"):
+            setattr(sub, nome, somente_leitura(getattr(self, nome)[linhas]))
+        return sub
+
+    # Bytes ocupados pelos arrays (os nomes contam uma vez cada texto distinto)
+    @property
+    def nbytes(self):
+        textos = {id(nome): sys.getsizeof(nome) for nome in self.nomes}
+        return self.numeros.nbytes + self.nomes.nbytes + sum(textos.values()) + self.codificadas.nbytes
+
+    # Matriz de notas decodificada (NaN = em branco), somente leitura; com "linhas", só as
+    # desses estudantes. É uma cópia nova a cada chamada: quem guarda os dados compactos
+    # não guarda a matriz decodificada
+    def matriz(self, dtype=np.float64, linhas=None):
+        codificadas = self.codificadas if linhas is None else self.codificadas[np.asarray(linhas, dtype=np.intp)]
+        return somente_leitura(decodificar_notas(codificadas, self.escala, dtype))
+
+    def notas(self, disciplina, dtype=np.float64):
+        return somente_leitura(decodificar_notas(self.codificadas[:, self.posicao[disciplina]], self.escala, dtype))
+
+    # Tabela das linhas informadas (na ordem dada), com os tipos compactos da planilha
+    def tabela(self, linhas=None):
+        linhas = np.arange(len(self.numeros)) if linhas is None else np.asarray(linhas, dtype=np.intp)
+        notas = decodificar_notas(self.codificadas[linhas], self.escala, np.float32)
+        tabela = pd.DataFrame(notas, index=linhas, columns=list(self.disciplinas))
+        tabela.insert(0, "Nome", pd.Categorical(self.nomes[linhas]))
+        tabela.insert(0, "Numero", self.numeros[linhas])
+        return tabela
@@ -0,0 +1,192 @@
+# Índice de estatísticas pré-calculadas de uma planilha
+# Construído uma única vez ao clicar em "Carregar Dados" e reutilizado pelas abas,
+# sem copiar nem filtrar os dados originais a cada interação. Todos os arrays são
+# somente leitura: o índice é compartilhado entre as sessões. Os filtros de estudantes
+# (coortes) usam mapas de bits calculados junto com o índice. As notas ficam só nos
+# dados compactos: a matriz em float64 é decodificada para os cálculos e descartada.
+import copy
+import hashlib
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from analise import (atualizar_momentos, curvas_normais, estatisticas_turma, histogramas, medias_estudantes,
+                     ordem_decrescente, rankings)
+from coortes import IndiceCoortes
+from dados import DadosTurma, somente_leitura
+
+# Ranking pela média do estudante nas disciplinas (sem o Final score)
+COLUNA_MEDIA = "Média Geral"
+
+
+# Aceita um DataFrame normalizado ou os dados compactos (DadosTurma) da planilha
+def _dados(df):
+    return df if isinstance(df, DadosTurma) else DadosTurma(df)
+
+
+def _congelar(indice):
+    for valor in vars(indice).values():
+        if isinstance(valor, np.ndarray):
+            somente_leitura(valor)
+        elif isinstance(valor, dict):
+            for item in valor.values():
+                if isinstance(item, np.ndarray):
+                    somente_leitura(item)
+
+
+class IndiceEstatisticas:
+    def __init__(self, df):
+        # Números e nomes são os mesmos arrays dos dados compactos (sem cópia)
+        self.dados = _dados(df)
+        self.disciplinas = list(self.dados.disciplinas)
+        self.posicao = self.dados.posicao
+        self.numeros = self.dados.numeros
+        self.nomes = self.dados.nomes
+        matriz = self.dados.matriz()
+
+        # Momentos, quantis e curvas normais por disciplina (calculados pelo motor de análise)
+        self.normais = estatisticas_turma(matriz)
+        self.contagens = self.normais["contagens"]
+        self.medias = self.normais["medias"]
+        self.desvios = self.normais["desvios"]
+        self.medianas = self.normais["medianas"]
+        self.quantis = self.normais["quantis"]
+        self.medias_estudantes = medias_estudantes(matriz, self.disciplinas)
+        self.histogramas = histogramas(matriz)
+
+        # Permutações de ranking pré-ordenadas para cada disciplina e para a média do estudante
+        self.rankings = rankings(matriz, self.disciplinas)
+        self.ranking_medias = ordem_decrescente(self.medias_estudantes)
+        self.coortes = IndiceCoortes(self.dados, matriz)
+        # Linhas da planilha completa quando o índice é de uma coorte (None: todos os estudantes)
+        self.linhas = None
+        self.assinaturas = {}
+        self._assinar(matriz, range(len(self.disciplinas)))
+        _congelar(self)
+
+    # Matriz de notas decodificada (float64, NaN = em branco): uma cópia nova a cada acesso,
+    # que não fica guardada no índice; quem a usa várias vezes guarda numa variável local
+    @property
+    def matriz(self):
+        return self.dados.matriz()
+
+    # Assinatura do conteúdo de cada disciplina (nome da disciplina + notas + nomes): gráficos
+    # de uma disciplina cujo conteúdo não mudou são reaproveitados do cache, mesmo vindos de
+    # outro arquivo; duas disciplinas com as mesmas notas (ex.: colunas em branco ou copiadas)
+    # têm assinaturas diferentes, pois os títulos dos gráficos trazem o nome da disciplina
+    def _assinar(self, matriz, colunas):
+        self._assinatura_nomes = hashlib.blake2b("\0".join(self.nomes).encode("utf-8"), digest_size=16).digest()
+        for j in colunas:
+            conteudo = hashlib.blake2b(self._assinatura_nomes, digest_size=16)
+            conteudo.update(self.disciplinas[j].encode("utf-8") + b"\0")
+            conteudo.update(np.ascontiguousarray(matriz[:, j]).tobytes())
+            self.assinaturas[self.disciplinas[j]] = conteudo.hexdigest()
+        self.assinatura = hashlib.blake2b(
+            "".join(self.assinaturas[d] for d in self.disciplinas).encode("ascii"), digest_size=16
+        ).hexdigest()
+
+    # Novo índice para uma versão corrigida da mesma planilha (mesmas colunas e mesma
+    # sequência de "Numero"), recalculando só as disciplinas e os estudantes alterados.
+    # O índice atual não é modificado (pode estar compartilhado com outras sessões).
+    def atualizado(self, df):
+        novo = copy.copy(self)
+        novo.dados = _dados(df)
+        novo.numeros = novo.dados.numeros
+        novo.nomes = novo.dados.nomes
+        matriz_antes, matriz = self.dados.matriz(), novo.dados.matriz()
+        alteradas = ~((matriz_antes == matriz) | (np.isnan(matriz_antes) & np.isnan(matriz)))
+        linhas = np.flatnonzero(alteradas.any(axis=1))
+        colunas = np.flatnonzero(alteradas.any(axis=0))
+        nomes_alterados = not np.array_equal(self.nomes, novo.nomes)
+
+        if colunas.size:
+            antes, depois, mascara = matriz_antes[linhas], matriz[linhas], alteradas[linhas]
+            contagens, medias, m2 = atualizar_momentos(
+                self.contagens, self.medias, self.normais["m2"],
+                np.where(mascara, antes, np.nan), np.where(mascara, depois, np.nan)
+            )
+            novo.normais = dict(curvas_normais(contagens, medias, m2), quantis=self.quantis.copy())
+            novo.contagens, novo.medias, novo.desvios = contagens, medias, novo.normais["desvios"]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # Disciplinas sem nenhuma nota
+                novo.quantis = novo.normais["quantis"]
+                novo.quantis[:, colunas] = np.nanpercentile(matriz[:, colunas], [0, 25, 50, 75, 100], axis=0)
+            novo.normais["medianas"] = novo.medianas = novo.quantis[2]
+            novo.histogramas = self.histogramas.copy()
+            novo.histogramas[colunas] = histogramas(matriz[:, colunas])
+            novo.rankings = dict(self.rankings)
+            novo.rankings.update(rankings(matriz[:, colunas], [self.disciplinas[j] for j in colunas]))
+            novo.medias_estudantes = self.medias_estudantes.copy()
+            novo.medias_estudantes[linhas] = medias_estudantes(matriz[linhas], self.disciplinas)
+            novo.ranking_medias = ordem_decrescente(novo.medias_estudantes)
+            novo.coortes = IndiceCoortes(novo.dados, matriz)
+
+        novo.assinaturas = dict(self.assinaturas)
+        novo._assinar(matriz, range(len(self.disciplinas)) if nomes_alterados else colunas)
+        _congelar(novo)
+        return novo, linhas, colunas
+
+    # Índice recebido de outro processo (fila de trabalhos): continua somente leitura
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        _congelar(self)
+
+    # Índice só com os estudantes da interseção das coortes informadas (chaves de
+    # self.coortes); as estatísticas, rankings e assinaturas são os da coorte
+    def coorte(self, *chaves):
+        if not chaves:
+            return self
+        linhas = np.flatnonzero(self.coortes.mascara(*chaves))
+        sub = IndiceEstatisticas(self.dados.subconjunto(linhas))
+        sub.linhas = somente_leitura(linhas if self.linhas is None else self.linhas[linhas])
+        return sub
+
+    def notas(self, coluna):
+        if coluna == COLUNA_MEDIA:
+            return self.medias_estudantes
+        return self.dados.notas(coluna)
+
+    # Quantidade de estudantes com nota na coluna (disciplina ou média geral)
+    def validas(self, coluna):
+        if coluna == COLUNA_MEDIA:
+            return int(np.count_nonzero(~np.isnan(self.medias_estudantes)))
+        return int(self.contagens[self.posicao[coluna]])
+
+    # Médias da turma por disciplina (equivalente a df.drop(columns=["Numero", "Nome"]).mean())
+    def medias_disciplinas(self):
+        return pd.Series(self.medias, index=self.disciplinas)
+
+    # Tabela de média, mediana e desvio padrão por disciplina
+    def tabela_estatisticas(self):
+        return pd.DataFrame(
+            [self.medias, self.medianas, self.desvios],
+            index=["mean", "median", "std"],
+            columns=self.disciplinas,
+        )
+
+    # Permutação das linhas ordenada por uma disciplina ou pela média geral (notas em branco
+    # sempre no final); "Numero" mantém a ordem original da planilha
+    def ordem(self, coluna="Numero", decrescente=True):
+        if coluna == "Numero":
+            ordem = np.arange(len(self.numeros))
+            return ordem[::-1] if decrescente else ordem
+        ordem = self.ranking_medias if coluna == COLUNA_MEDIA else self.rankings[coluna]
+        if decrescente:
+            return ordem
+        validas = self.validas(coluna)
+        return np.concatenate([ordem[:validas][::-1], ordem[validas:]])
+
+    # Linhas do ranking de uma disciplina para as posições informadas
+    def linhas_ranking(self, disciplina, linhas):
+        return pd.DataFrame(
+            {"Numero": self.numeros[linhas], "Nome": self.nomes[linhas], disciplina: self.notas(disciplina)[linhas]},
+            index=linhas,
+        )
+
+    # Ranking dos estudantes por uma disciplina, já ordenado (notas em branco no final)
+    def ranking(self, disciplina, incluir_em_branco=True):
+        ordem = self.rankings[disciplina]
+        if not incluir_em_branco:
+            ordem = ordem[:self.validas(disciplina)]
+        return self.linhas_ranking(disciplina, ordem)
@@ -0,0 +1,454 @@
+# Construção vetorizada dos gráficos de distribuição normal
+import numpy as np
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+from analise import (DENSIDADE_PASSOS, DENSIDADE_SIGMAS, FAIXAS_HISTOGRAMA, PASSOS_CURVA, SIGMAS, densidade_normal,
+                     densidade_tabelada, parametros_normais, resumo_boxplot)
+
+
+# Função para evitar sobreposição de pontos: cada repetição de uma mesma nota sobe
+# 0.01 acima da anterior. A contagem de repetições é feita por agrupamento (ordenação
+# estável + contagem acumulada), com uma única avaliação da densidade para todas as notas
+def ajustar_posicao_vertical(notas, mean, std_dev):
+    notas = np.asarray(notas, dtype=np.float64)
+    if notas.size == 0:
+        return np.empty(0)
+    ordem = np.argsort(notas, kind="stable")
+    ordenadas = notas[ordem]
+    posicoes = np.arange(notas.size)
+    inicio_grupo = np.empty(notas.size, dtype=bool)
+    inicio_grupo[0] = True
+    inicio_grupo[1:] = ordenadas[1:] != ordenadas[:-1]
+    inicio = np.maximum.accumulate(np.where(inicio_grupo, posicoes, 0))
+    repeticoes = np.empty(notas.size)
+    repeticoes[ordem] = posicoes - inicio
+    # Ajuste incremental para evitar sobreposição
+    return densidade_normal(notas, mean, std_dev) + 0.02 * 0.5 * repeticoes
+
+
+# Monta o gráfico de distribuição normal de uma disciplina com um número fixo de traces:
+# curva, linhas de desvio padrão, rótulos σ e um único trace com todos os estudantes
+def figura_normal(x_curva, y_curva, x_sigmas, y_sigmas, notas, posicoes_y, hovertexts, titulo, y_range_max):
+    fig = go.Figure()
+
+    # Adicionar a curva normal com área preenchida
+    fig.add_trace(go.Scatter(
+        x=x_curva,
+        y=y_curva,
+        mode="lines",
+        name="Distribuição Normal",
+        line=dict(color="rgba(135, 206, 250, 1)"),  # Mesma cor da área preenchida
+        fill="tozeroy",  # Preencher a área até y = 0
+        fillcolor="rgba(135, 206, 250, 0.5)",
+        hoverinfo="skip"
+    ))
+
+    # Linhas tracejadas dos desvios padrão em um único trace (segmentos separados por None)
+    x_linhas = np.column_stack([x_sigmas, x_sigmas, np.full(len(x_sigmas), np.nan)]).ravel()
+    y_linhas = np.column_stack([np.zeros(len(y_sigmas)), y_sigmas, np.full(len(y_sigmas), np.nan)]).ravel()
+    fig.add_trace(go.Scatter(
+        x=x_linhas,
+        y=y_linhas,
+        mode="lines",
+        line=dict(color="red", width=2, dash="dash"),
+        connectgaps=False,
+        hoverinfo="skip"
+    ))
+    fig.add_trace(go.Scatter(
+        x=x_sigmas,
+        y=np.full(len(x_sigmas), -0.02),
+        mode="text",
+        text=[f"{i}σ" for i in SIGMAS],
+        textfont=dict(color="red", size=10),
+        hoverinfo="skip"
+    ))
+
+    # Todos os pontos das notas em um único trace, com hover individual
+    fig.add_trace(go.Scatter(
+        x=notas,
+        y=posicoes_y,
+        mode="markers",
+        marker=dict(color="red", size=10),
+        hoverinfo="text",
+        hovertext=hovertexts
+    ))
+
+    # Configurações do gráfico
+    fig.update_layout(
+        title=titulo,
+        xaxis_title="Notas",
+        yaxis_title="Densidade",
+        showlegend=False,
+        hovermode="closest",
+        plot_bgcolor="white",  # Fundo branco
+        height=800,  # Altura do gráfico (em pixels)
+        xaxis=dict(
+            showgrid=True,  # Linhas de grade verticais
+            gridcolor="lightgray",  # Cor das linhas de grade
+            zeroline=True,  # Linha no eixo x = 0
+            zerolinecolor="gray",
+            tickformat=".1f"  # Formatar valores no eixo x
+        ),
+        yaxis=dict(
+            showgrid=True,  # Linhas de grade horizontais
+            gridcolor="lightgray",  # Cor das linhas de grade
+            zeroline=True,  # Linha no eixo y = 0
+            zerolinecolor="gray",
+            range=[-0.05, y_range_max],  # Ajuste automático do eixo y
+            tickformat=".2f"  # Formatar valores no eixo y
+        )
+    )
+    return fig
+
+
+# Gráfico de distribuição normal de uma disciplina a partir da média e do desvio informados
+def figura_normal_disciplina(nomes, notas, media, desvio, titulo):
+    notas = np.asarray(notas, dtype=np.float64)
+    x_curva = media + PASSOS_CURVA * desvio
+    y_curva = densidade_tabelada(DENSIDADE_PASSOS, desvio)
+    x_sigmas = media + SIGMAS * desvio
+    y_sigmas = densidade_tabelada(DENSIDADE_SIGMAS, desvio)
+    hovertexts = [
+        f"Estudante: {nome}<br>Nota: {nota:.1f}<br>Diferença da Média: {nota - media:.1f}"
+        for nome, nota in zip(nomes, notas)
+    ]
+    # Ajuste automático do eixo y: 20% de margem sobre o pico da curva (sem curva quando
+    # a disciplina tem menos de duas notas ou todas iguais: desvio nulo ou NaN)
+    y_range_max = np.nanmax(y_curva) * 1.2 if desvio > 0 else 0.5
+    return figura_normal(x_curva, y_curva, x_sigmas, y_sigmas, notas,
+                         ajustar_posicao_vertical(notas, media, desvio), hovertexts, titulo, y_range_max)
+
+
+# Gráfico da distribuição normal de referência (média 6, desvio 1) com as notas de um estudante
+def figura_normal_estudante(disciplinas, notas, bimestre):
+    mean = 6  # Média da distribuição normal
+    std_dev = 1  # Desvio padrão da distribuição normal
+    x = mean + PASSOS_CURVA * std_dev  # Valores no eixo x
+    y = densidade_tabelada(DENSIDADE_PASSOS, std_dev)  # Função de densidade de probabilidade
+
+    # Criar o gráfico de distribuição normal
+    fig = go.Figure()
+
+    # Adicionar a curva normal com área preenchida
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        mode="lines",
+        name="Distribuição Normal",
+        line=dict(color="rgba(135, 206, 250, 1)"),  # Mesma cor da área preenchida
+        fill="tozeroy",  # Preencher a área até y = 0
+        fillcolor="rgba(135, 206, 250, 0.5)"
+    ))
+
+    # Ajustar posições verticais para evitar sobreposição
+    notas_ajustadas_y = ajustar_posicao_vertical(notas, mean, std_dev)
+
+    # Adicionar os pontos das notas do aluno
+    for disciplina, nota, y_nota in zip(disciplinas, notas, notas_ajustadas_y):
+        fig.add_trace(go.Scatter(
+            x=[nota],
+            y=[y_nota],
+            mode="markers",
+            name=f"{disciplina}: {nota:.1f}",
+            marker=dict(color="red", size=10),
+            hoverinfo="text",
+            hovertext=f"Disciplina: {disciplina}<br>Nota: {nota:.1f}<br>Diferença da Média: {nota - mean:.1f}"
+        ))
+
+    # Adicionar linhas tracejadas para os desvios padrão
+    for i in range(-3, 4):  # De -3σ a +3σ
+        x_line = mean + i * std_dev
+        y_line = float(densidade_normal(x_line, mean, std_dev))
+        fig.add_shape(
+            type="line",
+            x0=x_line, y0=0, x1=x_line, y1=y_line,
+            line=dict(color="red", width=2, dash="dash"),
+            name=f"{i}σ"
+        )
+        fig.add_annotation(
+            x=x_line, y=-0.02,
+            text=f"{i}σ",
+            showarrow=False,
+            yshift=10,
+            font=dict(color="red", size=10)
+        )
+
+    # Configurações do gráfico
+    fig.update_layout(
+        title=f"Distribuição Normal e Notas do Estudante - {bimestre}",
+        xaxis_title="Notas",
+        yaxis_title="Densidade",
+        showlegend=False,
+        hovermode="closest",
+        plot_bgcolor="white",  # Fundo branco
+        height=800,  # Altura do gráfico (em pixels)
+        xaxis=dict(
+            showgrid=True,  # Linhas de grade verticais
+            gridcolor="lightgray",  # Cor das linhas de grade
+            zeroline=True,  # Linha no eixo x = 0
+            zerolinecolor="gray",
+            tickformat=".1f"  # Formatar valores no eixo x
+        ),
+        yaxis=dict(
+            showgrid=True,  # Linhas de grade horizontais
+            gridcolor="lightgray",  # Cor das linhas de grade
+            zeroline=True,  # Linha no eixo y = 0
+            zerolinecolor="gray",
+            range=[-0.05, 0.5],  # Fixar o eixo y entre 0 e 0.5 (ajuste para a PDF)
+            tickformat=".2f"  # Formatar valores no eixo y
+        )
+    )
+    return fig
+
+
+# Gráfico hexagonal (radar) das notas de um estudante, sem o Final score
+def figura_radar_estudante(disciplinas, notas, aluno_selecionado):
+    disciplinas = list(disciplinas)
+    notas = list(notas)
+    # Preparar dados Hexágono sem o Final score
+    disciplinas_filtradas = [disc for disc in disciplinas if disc != "Final score"]
+
+    # Filtrar as notas correspondentes às disciplinas filtradas
+    notas_filtradas = [nota for disc, nota in zip(disciplinas, notas) if disc != "Final score"]
+
+    # Fechar o hexágono (adicionar o primeiro elemento ao final)
+    disciplinas_hex = disciplinas_filtradas + [disciplinas_filtradas[0]]  # Fechar o hexágono
+    notas_hex = notas_filtradas + [notas_filtradas[0]]  # Fechar o hexágono com as notas correspondentes
+
+    # Criar o gráfico hexagonal
+    fig_hex = go.Figure()
+
+    fig_hex.add_trace(go.Scatterpolar(
+        r=notas_hex,
+        theta=disciplinas_hex,
+        fill='toself',
+        name='Desempenho do Estudante',
+        line=dict(color='blue', width=2),
+        marker=dict(color='red', size=8)
+    ))
+
+    # Configurações do gráfico
+    fig_hex.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 10],  # Ajuste conforme sua escala de notas
+                tickvals=[0, 2, 4, 6, 8, 10],
+                ticktext=["0", "2", "4", "6", "8", "10"],
+                tickfont=dict(color="black"),
+            ),
+            angularaxis=dict(
+                rotation=90,  # Começar no topo
+                direction='clockwise',
+                tickfont=dict(size=10)
+            )
+        ),
+        title=f'Distribuição de Habilidades - {aluno_selecionado}',
+        showlegend=True,
+        height=600,
+        margin=dict(l=50, r=50, t=50, b=50)
+    )
+    return fig_hex
+
+
+# Gráfico de barras agrupadas comparando as notas dos estudantes selecionados
+# (notas: uma linha por estudante, uma coluna por disciplina)
+def figura_comparacao(nomes, disciplinas, notas, bimestre):
+    fig_comparacao = go.Figure()
+    for aluno, notas_aluno in zip(nomes, notas):
+        fig_comparacao.add_trace(go.Bar(
+            x=list(disciplinas),
+            y=notas_aluno,
+            name=aluno
+        ))
+    fig_comparacao.update_layout(
+        title=f"Comparação de Notas dos Estudantes - {bimestre}",
+        xaxis_title="Disciplinas",
+        yaxis_title="Notas",
+        barmode="group",
+        height=600
+    )
+    return fig_comparacao
+
+
+# Boxplot montado a partir dos quartis e das cercas já calculados, com os outliers agrupados
+# por valor: o navegador recebe alguns números por disciplina, e não todas as notas
+def figura_boxplot(disciplinas, matriz, bimestre, quantis=None):
+    resumo = resumo_boxplot(matriz, quantis)
+    fig_boxplot = go.Figure()
+    for j, col in enumerate(disciplinas):
+        if np.isnan(resumo["medianas"][j]):
+            continue  # Disciplina sem nenhuma nota
+        cor = qualitative.Plotly[j % len(qualitative.Plotly)]
+        fig_boxplot.add_trace(go.Box(
+            name=col,
+            x=[col],
+            q1=[resumo["q1"][j]],
+            median=[resumo["medianas"][j]],
+            q3=[resumo["q3"][j]],
+            lowerfence=[resumo["cercas_inferiores"][j]],
+            upperfence=[resumo["cercas_superiores"][j]],
+            marker_color=cor,
+            legendgroup=col,
+        ))
+        valores, quantidades = resumo["outliers"][j]
+        if valores.size:
+            fig_boxplot.add_trace(go.Scatter(
+                x=[col] * valores.size,
+                y=valores,
+                mode="markers",
+                marker=dict(color=cor, size=np.clip(4 + 2 * np.log2(quantidades), 4, 14)),
+                hovertext=[f"{col}: {valor:.1f} ({quantidade} estudante(s))" for valor, quantidade in zip(valores, quantidades)],
+                hoverinfo="text",
+                legendgroup=col,
+                showlegend=False,
+            ))
+    fig_boxplot.update_layout(title=f"Boxplot das Notas - {bimestre}", height=600)
+    return fig_boxplot
+
+
+# Histograma de uma disciplina a partir das contagens por faixa já calculadas, com a
+# densidade suavizada (KDE) na mesma escala (estudantes por faixa)
+def figura_histograma(disciplina, contagens, x_densidade, y_densidade, bimestre, faixas=FAIXAS_HISTOGRAMA):
+    largura = faixas[1] - faixas[0]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=(faixas[:-1] + faixas[1:]) / 2,
+        y=contagens,
+        width=largura,
+        name="Estudantes por faixa",
+        marker_color="rgba(135, 206, 250, 0.8)",
+    ))
+    fig.add_trace(go.Scatter(
+        x=x_densidade,
+        y=np.asarray(y_densidade) * np.sum(contagens) * largura,
+        mode="lines",
+        name="Densidade (KDE)",
+        line=dict(color="red", width=2),
+    ))
+    fig.update_layout(
+        title=f"Distribuição das Notas em {disciplina} - {bimestre}",
+        xaxis_title="Notas",
+        yaxis_title="Estudantes",
+        bargap=0.05,
+        height=500,
+    )
+    return fig
+
+
+# Gráfico hexagonal (radar) das médias da turma, sem o Final score
+def figura_radar_turma(disciplinas, medias, bimestre):
+    pares = [(disc, med) for disc, med in zip(disciplinas, medias) if disc not in ["Numero", "Final score"]]
+    disciplinas_filtradas = [disc for disc, _ in pares]
+    medias = [float(med) for _, med in pares]
+    fig_radar = go.Figure()
+    fig_radar.add_trace(go.Scatterpolar(
+        r=medias + [medias[0]],
+        theta=disciplinas_filtradas + [disciplinas_filtradas[0]],  # Fechar o hexágono
+        fill='toself',
+        name='Média da Turma',
+        line=dict(color='blue', width=2),
+        marker=dict(color='red', size=8)
+    ))
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 10],
+                tickvals=[0, 2, 4, 6, 8, 10],
+                tickfont=dict(color="black"),
+            ),
+        ),
+        title=f'Distribuição das Médias da Turma - {bimestre}',
+        height=600
+    )
+    return fig_radar
+
+
+# Gráfico de barras com a nota de cada estudante em uma disciplina
+def figura_barras_notas(nomes, notas, disciplina, bimestre):
+    fig_barras = go.Figure()
+    fig_barras.add_trace(go.Bar(
+        x=nomes,
+        y=notas,
+        marker_color="blue"
+    ))
+    fig_barras.update_layout(
+        title=f"Notas dos Estudantes em {disciplina} - {bimestre}",
+        xaxis_title="Estudantes",
+        yaxis_title="Notas",
+        height=600
+    )
+    return fig_barras
+
+
+# Ranking por média geral: rótulos, valores e cores vêm de tabelas.resumo_ranking
+def figura_ranking(rotulos, valores, cores, coluna, bimestre):
+    fig_ranking = go.Figure()
+    fig_ranking.add_trace(go.Bar(
+        x=rotulos,
+        y=valores,
+        marker_color=cores
+    ))
+    fig_ranking.update_layout(
+        title=f"Ranking de Estudantes por {coluna} - {bimestre}",
+        xaxis_title="Estudantes",
+        yaxis_title=coluna,
+        height=600
+    )
+    return fig_ranking
+
+
+# Mapa de calor das distâncias entre estudantes (um único trace)
+def figura_mapa_distancias(rotulos, distancias, titulo):
+    fig_mapa = go.Figure(go.Heatmap(
+        z=distancias,
+        x=list(rotulos),
+        y=list(rotulos),
+        colorscale="Viridis",
+        reversescale=True,  # Mais escuro = mais semelhante
+        colorbar=dict(title="Distância"),
+        hovertemplate="%{y}<br>%{x}<br>Distância: %{z:.2f}<extra></extra>"
+    ))
+    fig_mapa.update_layout(
+        title=titulo,
+        yaxis=dict(autorange="reversed"),
+        height=600
+    )
+    return fig_mapa
+
+
+# Gráfico de distribuição normal de uma disciplina (coluna "j" da matriz) da turma
+def figura_normal_turma(nomes, matriz, j, disciplina, bimestre, parametros):
+    validas = ~np.isnan(matriz[:, j])
+    notas = matriz[validas, j]
+    nomes_validos = np.asarray(nomes, dtype=object)[validas]
+    media = parametros["medias"][j]
+    desvio = parametros["desvios"][j]
+    posicoes_y = ajustar_posicao_vertical(notas, media, desvio)
+    hovertexts = [
+        f"Estudante: {nome}<br>Nota: {nota:.1f}<br>Diferença da Média: {nota - media:.1f}"
+        for nome, nota in zip(nomes_validos, notas)
+    ]
+    # Ajuste automático do eixo y: 20% de margem sobre o pico da curva
+    y_range_max = np.nanmax(parametros["y_curvas"][j]) * 1.2 if np.isfinite(desvio) else 0.5
+    return figura_normal(
+        parametros["x_curvas"][j], parametros["y_curvas"][j],
+        parametros["x_sigmas"][j], parametros["y_sigmas"][j],
+        notas, posicoes_y, hovertexts,
+        f"Distribuição Normal das Notas em {disciplina} - {bimestre}",
+        y_range_max,
+    )
+
+
+# Gera os gráficos de distribuição normal de todas as disciplinas da turma
+def figuras_normais_turma(nomes, disciplinas, matriz, bimestre, parametros=None):
+    matriz = np.asarray(matriz, dtype=np.float64)
+    if parametros is None:
+        parametros = parametros_normais(matriz)
+    return [
+        (disciplina, figura_normal_turma(nomes, matriz, j, disciplina, bimestre, parametros))
+        for j, disciplina in enumerate(disciplinas)
+        if parametros["contagens"][j] > 0
+    ]
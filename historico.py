@@ -0,0 +1,230 @@
+# Histórico de notas por bimestre (SQLite local)
+# Cada planilha carregada é gravada como um bimestre da turma, identificando os
+# estudantes pelo "Numero". As gravações são incrementais: apenas notas novas ou
+# alteradas são escritas, e as consultas (evolução, ranking e notas acima de um
+# limiar) são filtradas, ordenadas e paginadas pelo próprio banco, usando os índices.
+# As conexões são reaproveitadas entre as consultas (um pool por arquivo de banco).
+# No dashboard, o banco atende as consultas que atravessam bimestres (Evolução por
+# Bimestre) e a tabela de nota mínima do Ranking por Disciplina. As demais abas do
+# bimestre carregado usam o índice em memória (estatisticas.py): rankings e contagens
+# já calculados no carregamento e compartilhados entre as sessões, sobre os quais os
+# filtros de estudantes (coortes) são aplicados.
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from ingestao import numeros_repetidos
+
+CAMINHO_BANCO = os.environ.get("HUMANITAS_BANCO", "humanitas.db")
+TAMANHO_POOL = int(os.environ.get("HUMANITAS_CONEXOES", 8))
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS bimestres (
+    bimestre TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS alunos (
+    turma TEXT NOT NULL,
+    numero INTEGER NOT NULL,
+    nome TEXT,
+    PRIMARY KEY (turma, numero)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS notas (
+    turma TEXT NOT NULL,
+    numero INTEGER NOT NULL,
+    bimestre TEXT NOT NULL,
+    disciplina TEXT NOT NULL,
+    valor REAL NOT NULL,
+    PRIMARY KEY (turma, numero, bimestre, disciplina)
+) WITHOUT ROWID;
+-- Ranking e limiares de uma disciplina no bimestre, e médias da turma por bimestre.
+-- As notas de um estudante por bimestre usam a própria chave primária (turma, numero, bimestre).
+CREATE INDEX IF NOT EXISTS notas_disciplina_valor ON notas (turma, bimestre, disciplina, valor);
+"""
+
+
+def conectar(caminho=None):
+    conexao = sqlite3.connect(caminho or CAMINHO_BANCO, check_same_thread=False)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.executescript(ESQUEMA)
+    return conexao
+
+
+# Conexões abertas reaproveitadas pelas consultas (cada uma usada por uma thread de cada vez);
+# no máximo "tamanho" ficam em uso ao mesmo tempo
+class PoolConexoes:
+    def __init__(self, caminho, tamanho=TAMANHO_POOL):
+        self.caminho = caminho
+        self._livres = queue.LifoQueue()
+        self._vagas = threading.BoundedSemaphore(tamanho)
+        self._pid = os.getpid()
+
+    @contextmanager
+    def conexao(self):
+        self._vagas.acquire()
+        try:
+            try:
+                conexao = self._livres.get_nowait()
+            except queue.Empty:
+                conexao = conectar(self.caminho)
+            try:
+                yield conexao
+            except BaseException:
+                conexao.close()  # Não devolve ao pool uma conexão em estado desconhecido
+                raise
+            self._livres.put(conexao)
+        finally:
+            self._vagas.release()
+
+
+_pools = {}
+_trava_pools = threading.Lock()
+
+
+# Pool do arquivo de banco; processos filhos (importar.py) abrem as próprias conexões
+def pool(caminho=None):
+    caminho = caminho or CAMINHO_BANCO
+    with _trava_pools:
+        atual = _pools.get(caminho)
+        if atual is None or atual._pid != os.getpid():
+            atual = _pools[caminho] = PoolConexoes(caminho)
+        return atual
+
+
+# Grava (ou atualiza) uma planilha como bimestre de uma turma e devolve
+# quantas linhas do banco foram de fato alteradas
+def gravar_bimestre(turma, bimestre, df, caminho=None):
+    disciplinas = [coluna for coluna in df.columns if coluna not in ("Numero", "Nome")]
+    df = df[df["Numero"].notna()]
+    # O "Numero" identifica o estudante: planilhas com números repetidos são recusadas,
+    # como na validação da ingestão (ingestao.validar_planilha)
+    repetidos = numeros_repetidos(df["Numero"])
+    if repetidos:
+        raise ValueError(repetidos)
+    numeros = df["Numero"].to_numpy(dtype=np.int64)
+    matriz = df[disciplinas].to_numpy(dtype=np.float64, copy=True)
+    # Notas em float32 (planilhas normalizadas) voltam ao valor digitado (6,7 e não 6,69999981),
+    # para que os filtros por nota mínima no banco incluam a própria nota do limiar
+    float32 = (df[disciplinas].dtypes == np.float32).to_numpy()
+    matriz[:, float32] = np.round(matriz[:, float32], 4)
+    linhas, colunas = np.nonzero(~np.isnan(matriz))
+    notas = [
+        (turma, int(numeros[i]), bimestre, disciplinas[j], float(matriz[i, j]))
+        for i, j in zip(linhas, colunas)
+    ]
+    alunos = [(turma, int(numero), str(nome)) for numero, nome in zip(numeros, df["Nome"])]
+
+    with pool(caminho).conexao() as conexao, conexao:
+        conexao.execute("INSERT OR IGNORE INTO bimestres (bimestre) VALUES (?)", (bimestre,))
+        alteracoes = conexao.executemany(
+            "INSERT INTO alunos (turma, numero, nome) VALUES (?, ?, ?) "
+            "ON CONFLICT (turma, numero) DO UPDATE SET nome = excluded.nome "
+            "WHERE nome IS NOT excluded.nome",
+            alunos,
+        ).rowcount
+        # Upsert: só escreve quando a nota é nova ou mudou
+        alteracoes += conexao.executemany(
+            "INSERT INTO notas (turma, numero, bimestre, disciplina, valor) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (turma, numero, bimestre, disciplina) DO UPDATE SET valor = excluded.valor "
+            "WHERE valor != excluded.valor",
+            notas,
+        ).rowcount
+        # Notas que ficaram em branco na nova versão da planilha são removidas
+        conexao.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS notas_atuais ("
+            "numero INTEGER, disciplina TEXT, PRIMARY KEY (numero, disciplina)) WITHOUT ROWID"
+        )
+        conexao.execute("DELETE FROM notas_atuais")
+        conexao.executemany(
+            "INSERT INTO notas_atuais (numero, disciplina) VALUES (?, ?)",
+            [(numero, disciplina) for _, numero, _, disciplina, _ in notas],
+        )
+        alteracoes += conexao.execute(
+            "DELETE FROM notas WHERE turma = ? AND bimestre = ? AND NOT EXISTS ("
+            "SELECT 1 FROM notas_atuais a WHERE a.numero = notas.numero AND a.disciplina = notas.disciplina)",
+            (turma, bimestre),
+        ).rowcount
+        return alteracoes
+
+
+def turmas(caminho=None):
+    with pool(caminho).conexao() as conexao:
+        return [linha[0] for linha in conexao.execute("SELECT DISTINCT turma FROM alunos ORDER BY turma")]
+
+
+# Bimestres de uma turma, na ordem em que foram carregados pela primeira vez
+def bimestres(turma, caminho=None):
+    with pool(caminho).conexao() as conexao:
+        return [linha[0] for linha in conexao.execute(
+            "SELECT b.bimestre FROM bimestres b WHERE EXISTS ("
+            "SELECT 1 FROM notas n WHERE n.turma = ? AND n.bimestre = b.bimestre) ORDER BY b.rowid",
+            (turma,),
+        )]
+
+
+# Evolução das notas por bimestre (linhas) e disciplina (colunas): média da turma
+# ou, se "numero" for informado, as notas de um único estudante
+def evolucao(turma, numero=None, caminho=None):
+    consulta = (
+        "SELECT n.bimestre, n.disciplina, AVG(n.valor) FROM notas n "
+        "JOIN bimestres b ON b.bimestre = n.bimestre WHERE n.turma = ?"
+    )
+    parametros = [turma]
+    if numero is not None:
+        consulta += " AND n.numero = ?"
+        parametros.append(int(numero))
+    consulta += " GROUP BY n.bimestre, n.disciplina ORDER BY b.rowid"
+    with pool(caminho).conexao() as conexao:
+        linhas = conexao.execute(consulta, parametros).fetchall()
+    if not linhas:
+        return pd.DataFrame()
+    tabela = pd.DataFrame(linhas, columns=["Bimestre", "Disciplina", "Nota"])
+    ordem = list(dict.fromkeys(tabela["Bimestre"]))
+    return tabela.pivot(index="Bimestre", columns="Disciplina", values="Nota").reindex(ordem)
+
+
+def alunos(turma, caminho=None):
+    with pool(caminho).conexao() as conexao:
+        return pd.DataFrame(
+            conexao.execute("SELECT numero, nome FROM alunos WHERE turma = ? ORDER BY numero", (turma,)).fetchall(),
+            columns=["Numero", "Nome"],
+        )
+
+
+def _filtro_disciplina(turma, bimestre, disciplina, minimo):
+    condicao = "n.turma = ? AND n.bimestre = ? AND n.disciplina = ?"
+    parametros = [turma, bimestre, disciplina]
+    if minimo is not None:
+        condicao += " AND n.valor >= ?"
+        parametros.append(float(minimo))
+    return condicao, parametros
+
+
+# Quantidade de notas de uma disciplina no bimestre (acima de "minimo", se informado)
+def contar(turma, bimestre, disciplina, minimo=None, caminho=None):
+    condicao, parametros = _filtro_disciplina(turma, bimestre, disciplina, minimo)
+    with pool(caminho).conexao() as conexao:
+        return conexao.execute(f"SELECT COUNT(*) FROM notas n WHERE {condicao}", parametros).fetchone()[0]
+
+
+# Ranking de uma disciplina no bimestre, lido na ordem do índice (turma, bimestre,
+# disciplina, valor): só as linhas da página pedida ("limite" a partir de "deslocamento")
+# são lidas, e "minimo" descarta as notas abaixo do limiar
+def ranking(turma, bimestre, disciplina, minimo=None, limite=None, deslocamento=0, decrescente=True, caminho=None):
+    condicao, parametros = _filtro_disciplina(turma, bimestre, disciplina, minimo)
+    sentido = "DESC" if decrescente else "ASC"
+    consulta = (
+        "SELECT n.numero, a.nome, n.valor FROM notas n "
+        "JOIN alunos a ON a.turma = n.turma AND a.numero = n.numero "
+        f"WHERE {condicao} ORDER BY n.valor {sentido}, n.numero {sentido}"
+    )
+    if limite is not None:
+        consulta += " LIMIT ? OFFSET ?"
+        parametros += [int(limite), int(deslocamento)]
+    with pool(caminho).conexao() as conexao:
+        linhas = conexao.execute(consulta, parametros).fetchall()
+    return pd.DataFrame(linhas, columns=["Numero", "Nome", disciplina])
@@ -1,29 +1,83 @@
 # streamlit run Media_TP_Sem_WEB_v03.py
-from scipy.stats import norm
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import numpy as np
-import json
+from credenciais import LimitadorTentativas, VerificadorCredenciais
+from instrumentacao import VERSAO, HistoricoMedicoes, Instrumentacao
+
+# Partida rápida: pandas, NumPy, Plotly e os módulos do painel são importados dentro das
+# funções que os usam, e só quando o painel é exibido (depois do login); a tela de login não
+# espera por eles, e nos reruns seguintes cada importação é só uma consulta ao sys.modules
+
+NOMES_METRICAS = {"euclidiana": "Euclidiana", "cosseno": "Cosseno", "correlacao": "Correlação"}
 
 # Configuração inicial do Streamlit
 st.set_page_config(page_title="FAPEA", layout="wide")
 
-# Função para carregar as credenciais do arquivo JSON
+# Função para carregar as credenciais do arquivo JSON (uma vez por processo; o arquivo
+# só é relido quando muda no disco)
+@st.cache_resource
 def load_credentials(file_path="credenciais.json"):
-    with open(file_path, "r") as file:
-        data = json.load(file)
-    return {user["usuario"]: user["senha"] for user in data["usuarios"]}
+    return VerificadorCredenciais(file_path)
+
+# Limitador de tentativas de login compartilhado por todas as sessões
+@st.cache_resource
+def limitador_login():
+    return LimitadorTentativas()
 
 CREDENCIAIS = load_credentials()
 
+# Cache de agregados e gráficos compartilhado por todas as sessões do processo
+@st.cache_resource
+def cache_compartilhado():
+    from cache_compartilhado import cache_do_processo
+    return cache_do_processo()
+
+# Relatórios de instrumentação dos últimos reruns (painel do administrador)
+@st.cache_resource
+def historico_medicoes():
+    return HistoricoMedicoes()
+
+# Fila limitada de trabalhos pesados compartilhada por todas as sessões do processo
+@st.cache_resource
+def fila_trabalhos():
+    from trabalhos import FilaTrabalhos
+    return FilaTrabalhos()
+
+# Imagens lidas do disco uma única vez por processo
+@st.cache_resource
+def carregar_imagem(caminho):
+    with open(caminho, "rb") as arquivo:
+        return arquivo.read()
+
+# Bimestres da turma já gravados no histórico (consultados a cada rerun da barra lateral):
+# guardados por um minuto e descartados quando a turma ganha um bimestre novo
+@st.cache_data(ttl=60, show_spinner=False)
+def bimestres_historico(turma):
+    import historico
+    return historico.bimestres(turma)
+
 # Inicializa as variáveis do session state
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
-if "df" not in st.session_state:
-    st.session_state.df = None
 if "bimestre" not in st.session_state:
     st.session_state.bimestre = ""
+if "indice" not in st.session_state:
+    st.session_state.indice = None
+if "estudantes" not in st.session_state:
+    st.session_state.estudantes = None
+if "chave_dados" not in st.session_state:
+    st.session_state.chave_dados = None
+if "turma" not in st.session_state:
+    st.session_state.turma = ""
+if "comparacao" not in st.session_state:
+    st.session_state.comparacao = None
+
+# Instrumentação deste rerun (ativada pelo administrador no painel lateral)
+medidor = Instrumentacao(ativo=st.session_state.get("instrumentacao", False))
+
+# Função para conferir usuário e senha (medida pela instrumentação)
+def verificar_login(usuario, senha):
+    with medidor.medir("login", "login"):
+        return CREDENCIAIS.verificar(usuario, senha)
 
 # Função para realizar o login
 def login():
@@ -31,48 +85,613 @@ def login():
     usuario = st.text_input("Usuário")
     senha = st.text_input("Senha", type="password")
     if st.button("Entrar"):
-        if usuario in CREDENCIAIS and CREDENCIAIS[usuario] == senha:
+        # Tentativas limitadas pelo usuário neste IP e pelo IP: falhas de outro endereço
+        # não bloqueiam o usuário
+        limitador = limitador_login()
+        ip = getattr(st.context, "ip_address", None) or "desconhecido"
+        chave_usuario = f"usuario:{usuario}@{ip}"
+        chaves = [chave_usuario, f"ip:{ip}"]
+        espera = limitador.espera(*chaves)
+        if espera > 0:
+            st.error(f"Muitas tentativas incorretas. Tente novamente em {int(espera) + 1} segundos.")
+        elif verificar_login(usuario, senha):
+            limitador.registrar_sucesso(chave_usuario)
             st.session_state.logged_in = True
+            st.session_state.usuario = usuario
+            st.session_state.admin = bool(CREDENCIAIS.usuario(usuario).get("admin", False))
             st.success("Login realizado com sucesso!")
             st.rerun()  # Recarrega a página após o login
         else:
+            limitador.registrar_falha(*chaves)
             st.error("Usuário ou senha incorretos.")
 
+# Exibe um gráfico Plotly medindo o tempo de serialização e o tamanho do JSON enviado
+def exibir_grafico(figura, nome, **kwargs):
+    with medidor.medir(f"plotly_chart:{nome}", "serializacao"):
+        st.plotly_chart(figura, **kwargs)
+    medidor.registrar_grafico(nome, figura)
+
+# Exibe uma tabela paginada: só as linhas da página atual são montadas e enviadas ao navegador
+def exibir_tabela_paginada(ordem, montar_tabela, chave):
+    from tabelas import TAMANHOS_PAGINA, fatia_pagina, total_paginas
+    col_tamanho, col_pagina = st.columns(2)
+    tamanho = col_tamanho.selectbox("Linhas por página", TAMANHOS_PAGINA, index=1, key=f"{chave}_tamanho")
+    paginas = total_paginas(len(ordem), tamanho)
+    pagina = col_pagina.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key=f"{chave}_pagina_{paginas}")
+    linhas, inicio = fatia_pagina(ordem, pagina, tamanho)
+    st.dataframe(montar_tabela(linhas))
+    if len(ordem):
+        st.caption(f"Mostrando {inicio + 1}–{inicio + len(linhas)} de {len(ordem)} estudantes")
+    else:
+        st.caption("Nenhum estudante encontrado.")
+
+# Chave do cache compartilhado para um gráfico da planilha (ou coorte) e bimestre carregados
+# As chaves usam a assinatura do conteúdo das notas: uma planilha corrigida reaproveita
+# os gráficos das disciplinas que não mudaram
+def chave_visao(indice, *partes):
+    return (indice.assinatura, st.session_state.bimestre, *partes)
+
+# Chave de um gráfico que depende de uma única disciplina
+def chave_disciplina(indice, disciplina, *partes):
+    return (indice.assinaturas[disciplina], st.session_state.bimestre, *partes)
+
+# Filtro de estudantes da barra lateral: devolve as chaves das coortes escolhidas
+# (mapas de bits do índice, combinados por interseção)
+def filtro_coortes(indice):
+    from coortes import APROVADOS, OPERADORES, REPROVADOS, abaixo_da_aprovacao
+    chaves = []
+    with st.expander("🔎 Filtro de estudantes", expanded=False):
+        if APROVADOS in indice.coortes.mapas:
+            situacao = st.radio("Situação", ["Todos", "Aprovados", "Reprovados"], horizontal=True, key="coorte_situacao")
+            chaves += {"Aprovados": [APROVADOS], "Reprovados": [REPROVADOS]}.get(situacao, [])
+        abaixo = st.multiselect(f"Abaixo de {indice.coortes.nota_aprovacao:g} em", indice.disciplinas, key="coorte_abaixo")
+        chaves += [abaixo_da_aprovacao(disciplina) for disciplina in abaixo]
+        if st.checkbox("Condição de nota", key="coorte_condicao"):
+            disciplina = st.selectbox("Disciplina", indice.disciplinas, key="coorte_disciplina")
+            col_operador, col_limiar = st.columns(2)
+            simbolo = col_operador.selectbox("Operador", list(OPERADORES), key="coorte_operador")
+            limiar = col_limiar.number_input("Nota", min_value=0.0, max_value=10.0, value=8.0, step=0.5, key="coorte_limiar")
+            chaves.append(indice.coortes.condicao(disciplina, simbolo, limiar))
+    return chaves
+
+# Índice da coorte filtrada: a máscara é a interseção dos mapas de bits, e as estatísticas
+# da coorte são calculadas uma vez na fila de trabalhos e compartilhadas entre as sessões
+def indice_coorte(indice, chaves):
+    if not chaves:
+        return indice
+    chave = (indice.assinatura, "coorte", *chaves)
+    with medidor.medir("indice_coorte", "agregacao"):
+        return cache_compartilhado().obter(chave, lambda: fila_trabalhos().executar(chave, indice.coorte, *chaves))
+
+# Índice de busca criado só quando uma aba precisa dele (Visão Geral com filtro, Busca)
+def indice_estudantes():
+    from busca import IndiceEstudantes
+    if st.session_state.estudantes is None:
+        indice = st.session_state.indice
+        chave_dados = st.session_state.chave_dados
+        with medidor.medir("indice_estudantes", "agregacao"):
+            st.session_state.estudantes = cache_compartilhado().obter(
+                None if chave_dados is None else chave_dados + ("estudantes",),
+                lambda: fila_trabalhos().executar(
+                    None if chave_dados is None else chave_dados + ("estudantes",),
+                    IndiceEstudantes, indice.dados
+                )
+            )
+    return st.session_state.estudantes
+
+# Gráficos pesados: os que ainda não estão no cache compartilhado são construídos ao mesmo
+# tempo na fila de trabalhos (limitada, e pedidos iguais de sessões diferentes calculados
+# uma só vez) e guardados no cache. "pedidos" é uma lista de (chave, função, argumentos);
+# as figuras são devolvidas na mesma ordem.
+def figuras_em_paralelo(pedidos):
+    import plotly.io as pio
+    from trabalhos import figura_json
+    cache, fila = cache_compartilhado(), fila_trabalhos()
+    futuros = {chave: fila.enviar(chave, figura_json, construir, *args)
+               for chave, construir, args in pedidos if not cache.contem(chave)}
+    figuras = []
+    for chave, construir, args in pedidos:
+        futuro = futuros.get(chave)
+        calcular = futuro.result if futuro is not None else lambda: fila.executar(chave, figura_json, construir, *args)
+        figuras.append(pio.from_json(cache.obter(chave, calcular, tamanho=len)))
+    return figuras
+
+# Cada aba é uma função; as partes com widgets próprios são fragmentos (st.fragment):
+# mexer em um deles reexecuta só aquele trecho, e não o script inteiro
+
+# Aba 1: Visão Geral
+@st.fragment
+def tabela_visao_geral(indice):
+    from tabelas import filtrar_ordem
+    col_ordem, col_sentido, col_filtro = st.columns(3)
+    ordenar_por = col_ordem.selectbox("Ordenar por", ["Numero"] + indice.disciplinas)
+    decrescente = col_sentido.checkbox("Ordem decrescente", value=ordenar_por != "Numero")
+    filtro_nome = col_filtro.text_input("Filtrar por nome")
+    mascara_nome = None
+    if filtro_nome.strip():
+        # O índice de busca é da turma completa: numa coorte, só as linhas dela
+        mascara_nome = indice_estudantes().filtrar(filtro_nome)
+        mascara_nome = mascara_nome if indice.linhas is None else mascara_nome[indice.linhas]
+    ordem = filtrar_ordem(indice.ordem(ordenar_por, decrescente), mascara_nome)
+    exibir_tabela_paginada(ordem, indice.dados.tabela, "visao_geral")
+
+def visao_geral(indice, bimestre):
+    st.title("Visão Geral")
+    # Conteúdo da visão geral
+    st.write(f"Esta aba mostra a tabela completa de notas e um gráfico de barras geral para o {bimestre}.")
+
+    # Exibe a tabela completa, paginada no servidor
+    st.subheader("Tabela Completa de Notas")
+    tabela_visao_geral(indice)
+
+    # Gráfico de barras geral para todas as disciplinas
+    st.subheader(f"Gráfico de Notas por Disciplina (Média da Turma) - {bimestre}")
+    mean_scores = indice.medias_disciplinas()
+    #mean_scores = df.drop(columns=["Numero", "Nome", "Total1 Final", "Total2 Final", "Total3 Final", "Total4 Final"]).mean()
+    #numeric_columns = df.select_dtypes(include=[np.number]).columns
+    #mean_scores = df[numeric_columns].mean()
+    st.bar_chart(mean_scores)
+
+# Aba 2: Busca de Aluno
+@st.fragment
+def busca_estudante(indice, bimestre):
+    import pandas as pd
+    from analise import perfil_estudante
+    from graficos import figura_normal_estudante, figura_radar_estudante
+    st.title(f"Busca de Estudante - {bimestre}")
+    # Campo de busca e checkboxes
+    #nome_estudante = st.sidebar.text_input("Digite o nome do estudante:")
+    #mostrar_detalhes = st.sidebar.checkbox("Mostrar detalhes completos")
+    st.write(f"Esta aba permite buscar um estudante específico e visualizar seus gráficos para o {bimestre}.")
+    estudantes = indice_estudantes()
+
+    # Busca pelo número ou pelo nome (início de qualquer palavra, ou aproximada)
+    consulta = st.text_input("Insira o número ou o nome do Estudante")
+    encontrados = estudantes.buscar(consulta)
+    numero_aluno = None
+    if encontrados:
+        numero_aluno = st.selectbox(
+            "Estudantes encontrados",
+            encontrados,
+            format_func=lambda numero: f"{numero} - {estudantes.nomes[estudantes.linha(numero)]}"
+        )
+
+    # Botão para buscar o aluno pelo número
+    if st.button("Buscar Estudante"):
+        # Localizar o aluno pelo índice de busca (sem percorrer a planilha)
+        aluno = estudantes.estudante(numero_aluno) if numero_aluno is not None else None
+
+        if aluno is not None:
+            aluno_df = indice.dados.tabela([aluno["linha"]])
+            aluno_selecionado = aluno["nome"]
+
+            # Exibir informações do aluno selecionado
+            st.subheader(f"Notas do Estudante: {aluno_selecionado}")
+            st.dataframe(aluno_df)
+            # Perfil do estudante (notas preenchidas, posição e percentil por disciplina)
+            perfil = perfil_estudante(indice.matriz, aluno["linha"], indice.disciplinas, indice.medias, estudantes.percentis)
+            disciplinas = perfil["disciplinas"]
+            notas = perfil["notas"]
+            st.caption("Percentil na turma (% de estudantes com nota menor ou igual) e posição no ranking da disciplina")
+            st.dataframe(pd.DataFrame(
+                [perfil["percentis"], perfil["posicoes"], perfil["diferencas"]],
+                index=["Percentil", "Posição", "Diferença da Média"],
+                columns=disciplinas
+            ).round(1))
+
+            # Gráfico de barras para as notas do aluno por disciplina
+            st.subheader(f"Gráfico de Notas por Disciplina - {bimestre}")
+            st.bar_chart(pd.DataFrame({"Notas": list(aluno["notas"].values())}, index=indice.disciplinas))
+
+            # Criar gráfico da distribuição normal com Plotly
+            st.subheader(f"Distribuição Normal e Notas do Estudante - {bimestre}")
+            fig = figura_normal_estudante(disciplinas, notas, bimestre)
+
+            # Exibir o gráfico no Streamlit
+            exibir_grafico(fig, "normal_estudante")
+            fig_hex = figura_radar_estudante(disciplinas, notas, aluno_selecionado)
+
+            # Exibir o gráfico
+            exibir_grafico(fig_hex, "radar_estudante", use_container_width=True)
+        else:
+            st.error("Estudante não encontrado. Verifique o número inserido.")
+
+# Aba 3: Estatísticas da Turma
+def estatisticas_da_turma(indice, bimestre):
+    from graficos import figura_boxplot, figura_normal_turma, figura_radar_turma
+    st.title(f"Estatísticas da Turma - {bimestre}")
+    st.write(f"Esta aba mostra estatísticas gerais da turma para o {bimestre}.")
+
+    # Exibir média, mediana e desvio padrão por disciplina
+    stats = indice.tabela_estatisticas()
+    st.dataframe(stats)
+
+    # Boxplot e curvas normais de todas as disciplinas construídos ao mesmo tempo na fila de trabalhos
+    # (um único trace de pontos por gráfico)
+    disciplinas_normais = [(j, disciplina) for j, disciplina in enumerate(indice.disciplinas) if indice.contagens[j] > 0]
+    matriz = indice.matriz  # Decodificada uma vez para todos os gráficos deste rerun
+    with medidor.medir("figura:boxplot+normais_turma", "figuras"):
+        fig_boxplot, *normais = figuras_em_paralelo(
+            [(chave_visao(indice, "boxplot"), figura_boxplot, (indice.disciplinas, matriz, bimestre, indice.quantis))]
+            + [(chave_disciplina(indice, disciplina, "normal_turma"), figura_normal_turma,
+                (indice.nomes, matriz, j, disciplina, bimestre, indice.normais))
+               for j, disciplina in disciplinas_normais]
+        )
+
+    # Gráfico de boxplot (quartis e cercas calculados no servidor)
+    st.subheader(f"Boxplot das Notas da Turma - {bimestre}")
+    exibir_grafico(fig_boxplot, "boxplot")
+
+    # Histograma de uma disciplina, a partir das faixas já contadas no índice
+    st.subheader(f"Histograma das Notas por Disciplina - {bimestre}")
+    histograma_disciplina(indice, bimestre)
+
+    # Gráfico Hexagonal (Radar Chart)
+    st.subheader(f"Visão Geral das Médias da Turma - {bimestre}")
+    with medidor.medir("figura:radar_turma", "figuras"):
+        fig_radar = cache_compartilhado().figura(
+            chave_visao(indice, "radar"), lambda: figura_radar_turma(indice.disciplinas, indice.medias, bimestre)
+        )
+    # Adicionamos a key única para o radar chart
+    exibir_grafico(fig_radar, "radar_turma", use_container_width=True, key="radar_chart")
+
+    # Gráfico de distribuição normal para cada disciplina
+    st.subheader(f"Distribuição Normal das Notas da Turma - {bimestre}")
+    for (_, disciplina), fig_normal in zip(disciplinas_normais, normais):
+        exibir_grafico(fig_normal, f"normal_{disciplina}", key=f"normal_{disciplina}")
+
+@st.fragment
+def histograma_disciplina(indice, bimestre):
+    from analise import densidade_histograma
+    from graficos import figura_histograma
+    disciplinas = [disciplina for j, disciplina in enumerate(indice.disciplinas) if indice.contagens[j] > 0]
+    if not disciplinas:
+        return
+    disciplina = st.selectbox("Disciplina do histograma", disciplinas)
+    contagens = indice.histogramas[indice.posicao[disciplina]]
+    with medidor.medir("figura:histograma", "figuras"):
+        fig_histograma = cache_compartilhado().figura(
+            chave_disciplina(indice, disciplina, "histograma"),
+            lambda: figura_histograma(disciplina, contagens, *densidade_histograma(contagens), bimestre)
+        )
+    exibir_grafico(fig_histograma, "histograma")
+
+# Aba 4: Ranking de Alunos
+@st.fragment
+def tabela_ranking(indice, ordem, coluna):
+    exibir_tabela_paginada(ordem, lambda linhas: indice.linhas_ranking(coluna, linhas), "ranking")
+
+@st.fragment
+def grafico_ranking(indice, ordem, coluna, bimestre):
+    from graficos import figura_ranking
+    from tabelas import resumo_ranking
+    n_extremos = st.slider("Estudantes exibidos no topo e na base do gráfico", 5, 50, 20)
+    validas = ordem[:indice.validas(coluna)]
+    rotulos, valores, cores = resumo_ranking(indice.nomes[validas], indice.notas(coluna)[validas], n_extremos)
+    exibir_grafico(figura_ranking(rotulos, valores, cores, coluna, bimestre), "ranking")
+
+def ranking_estudantes(indice, bimestre, ranking_por_media):
+    from analise import COLUNA_FINAL
+    from estatisticas import COLUNA_MEDIA
+    # Final score de cada aluno ou, com "Ranking pela média das disciplinas", a média geral
+    # sem a coluna Final score (pré-calculada no índice)
+    #df["Media_Geral"] = df.drop(columns=["Numero", "Nome"]).mean(axis=1) //calcula a média inclusive da coluna Final score
+    #df["Media_Geral"] = df.drop(columns=["Numero", "Nome", "Final score"]).mean(axis=1)//calcula a média removendo a coluna Final score
+    coluna = COLUNA_MEDIA if ranking_por_media else COLUNA_FINAL
+    st.title(f"Ranking de Estudantes - {bimestre}")
+    st.write(f"Esta aba classifica os estudantes com base em {coluna} para o {bimestre}.")
+    ordem = indice.ordem(coluna)  # Ranking pré-ordenado no carregamento
+
+    # Exibir o ranking (paginado no servidor)
+    st.subheader(f"Ranking de Estudantes por {coluna} - {bimestre}")
+    tabela_ranking(indice, ordem, coluna)
+
+    # Gráfico de barras do ranking: primeiros e últimos colocados, demais agregados em "Outros"
+    st.subheader(f"Gráfico de Barras do Ranking - {bimestre}")
+    grafico_ranking(indice, ordem, coluna, bimestre)
+
+# Aba 5: Comparação de Alunos
+@st.fragment
+def comparacao_estudantes(indice, bimestre):
+    import numpy as np
+    import pandas as pd
+    from analise import (LIMITE_MATRIZ_DISTANCIAS, METRICAS, distancias, linhas_por_nome, mais_semelhantes,
+                         matriz_distancias, sem_final)
+    from graficos import figura_comparacao, figura_mapa_distancias
+    st.title(f"Comparação de Estudantes - {bimestre}")
+    st.write(f"Esta aba permite comparar as notas de dois ou mais estudantes para o {bimestre}.")
+
+    # Selecionar alunos para comparação
+    alunos_selecionados = st.multiselect("Selecione os estudantes para comparação", indice.nomes)
+
+    if len(alunos_selecionados) >= 2:
+        # Filtrar os dados dos alunos selecionados
+        linhas = linhas_por_nome(indice.nomes, alunos_selecionados)
+        notas_selecionados = indice.dados.matriz(linhas=linhas)
+        nomes_selecionados = indice.nomes[linhas]
+
+        # Exibir as notas dos alunos selecionados
+        st.subheader(f"Notas dos Estudantes Selecionados - {bimestre}")
+        st.dataframe(pd.DataFrame(notas_selecionados.T, index=indice.disciplinas, columns=nomes_selecionados))
+
+        # Gráfico de barras empilhadas
+        st.subheader(f"Gráfico de Barras Empilhadas - {bimestre}")
+        fig_comparacao = figura_comparacao(nomes_selecionados, indice.disciplinas, notas_selecionados, bimestre)
+        exibir_grafico(fig_comparacao, "comparacao")
+
+    else:
+        st.info("Selecione pelo menos dois estudantes para comparação.")
+
+    # Semelhança entre estudantes (distâncias sobre as notas das disciplinas, sem o Final score)
+    st.subheader(f"Semelhança entre Estudantes - {bimestre}")
+    col_metrica, col_referencia, col_quantidade = st.columns(3)
+    metrica = col_metrica.selectbox("Métrica", METRICAS, format_func=NOMES_METRICAS.get)
+    referencia = col_referencia.selectbox("Estudantes mais semelhantes a", indice.nomes)
+    quantidade = col_quantidade.slider("Quantidade", 1, 20, 5)
+    notas_disciplinas = sem_final(indice.matriz, indice.disciplinas)
+    rotulos = np.array([f"{numero} - {nome}" for numero, nome in zip(indice.numeros, indice.nomes)], dtype=object)
+
+    # Turmas de até LIMITE_MATRIZ_DISTANCIAS estudantes: matriz completa calculada uma vez e compartilhada
+    distancias_turma = None
+    if len(indice.nomes) <= LIMITE_MATRIZ_DISTANCIAS:
+        with medidor.medir("distancias", "agregacao"):
+            distancias_turma = cache_compartilhado().obter(
+                chave_visao(indice, "distancias", metrica), lambda: matriz_distancias(notas_disciplinas, metrica)
+            )
+    linha = linhas_por_nome(indice.nomes, [referencia])[0]
+    semelhantes, valores = mais_semelhantes(notas_disciplinas, linha, quantidade, metrica, distancias_turma)
+    st.dataframe(pd.DataFrame({
+        "Numero": indice.numeros[semelhantes],
+        "Nome": indice.nomes[semelhantes],
+        "Distância": valores,
+    }).round(2), hide_index=True)
+
+    # Mapa de calor: os estudantes selecionados acima ou, sem seleção, a referência e os mais semelhantes
+    linhas_mapa = linhas if len(alunos_selecionados) >= 2 else np.concatenate([[linha], semelhantes])
+    if distancias_turma is not None:
+        mapa = distancias_turma[np.ix_(linhas_mapa, linhas_mapa)]
+    else:
+        mapa = distancias(notas_disciplinas[linhas_mapa], metrica=metrica)
+    exibir_grafico(figura_mapa_distancias(
+        rotulos[linhas_mapa], mapa, f"Distância entre Estudantes ({NOMES_METRICAS[metrica]}) - {bimestre}"
+    ), "mapa_distancias")
+
+# Aba 6: Ranking por Disciplina
+def ranking_disciplina(indice, bimestre, disciplina_selecionada):
+    from analise import notas_validas
+    from graficos import figura_barras_notas, figura_normal_disciplina
+    cache = cache_compartilhado()
+    st.title(f"Ranking por Disciplina - {bimestre}")
+    st.write(f"Esta aba permite selecionar uma disciplina e visualizar as notas de todos os estudantes para o {bimestre}.")
+
+    # Filtrar as notas da disciplina selecionada
+    nomes_disciplina, notas_disciplina = notas_validas(indice.nomes, indice.notas(disciplina_selecionada))
+
+    # Exibir o gráfico de barras
+    st.subheader(f"Notas dos Estudantes em {disciplina_selecionada} - {bimestre}")
+    with medidor.medir("figura:barras_disciplina", "figuras"):
+        fig_barras = cache.figura(
+            chave_disciplina(indice, disciplina_selecionada, "barras_disciplina"),
+            lambda: figura_barras_notas(nomes_disciplina, notas_disciplina, disciplina_selecionada, bimestre)
+        )
+    exibir_grafico(fig_barras, "barras_disciplina")
+
+    # Gráfico de distribuição normal para a disciplina selecionada
+    st.subheader(f"Distribuição Normal das Notas em {disciplina_selecionada} - {bimestre}")
+    mean_disciplina = indice.medias[indice.posicao[disciplina_selecionada]]  # Média das notas da disciplina
+    std_dev_disciplina = indice.desvios[indice.posicao[disciplina_selecionada]]  # Desvio padrão das notas da disciplina
+    with medidor.medir("figura:normal_disciplina", "figuras"):
+        fig_normal = cache.figura(
+            chave_disciplina(indice, disciplina_selecionada, "normal_disciplina"),
+            lambda: figura_normal_disciplina(
+                nomes_disciplina, notas_disciplina, mean_disciplina, std_dev_disciplina,
+                f"Distribuição Normal das Notas em {disciplina_selecionada}"
+            )
+        )
+
+    # Exibir o gráfico no Streamlit
+    exibir_grafico(fig_normal, "normal_disciplina")
+
+    # Estudantes com nota a partir de um limiar, consultados no histórico
+    st.subheader(f"Estudantes com Nota Mínima em {disciplina_selecionada} - {bimestre}")
+    notas_minimas_disciplina(st.session_state.turma, bimestre.strip(), disciplina_selecionada)
+
+# Ranking da disciplina filtrado por nota mínima: filtro, ordenação e página são feitos pelo
+# banco (índice por turma, bimestre, disciplina e nota), e só a página visível é lida. É a
+# turma completa gravada no histórico: os filtros de estudantes (coortes) valem só para o índice
+@st.fragment
+def notas_minimas_disciplina(turma, bimestre, disciplina):
+    import historico
+    from tabelas import TAMANHOS_PAGINA, total_paginas
+    col_minimo, col_tamanho, col_pagina = st.columns(3)
+    minimo = col_minimo.number_input("Nota mínima", min_value=0.0, value=8.0, step=0.5)
+    tamanho = col_tamanho.selectbox("Linhas por página", TAMANHOS_PAGINA, index=1, key="notas_minimas_tamanho")
+    with medidor.medir("consulta:contar", "leitura"):
+        total = historico.contar(turma, bimestre, disciplina, minimo)
+    paginas = total_paginas(total, tamanho)
+    pagina = col_pagina.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1,
+                                     key=f"notas_minimas_pagina_{paginas}")
+    with medidor.medir("consulta:ranking", "leitura"):
+        tabela = historico.ranking(turma, bimestre, disciplina, minimo, limite=tamanho, deslocamento=(pagina - 1) * tamanho)
+    st.dataframe(tabela, hide_index=True)
+    if total:
+        inicio = (pagina - 1) * tamanho
+        st.caption(f"Mostrando {inicio + 1}–{inicio + len(tabela)} de {total} estudantes com nota a partir de {minimo:g}")
+    else:
+        st.caption("Nenhum estudante encontrado.")
+
+# Aba 7: Evolução por Bimestre
+@st.fragment
+def evolucao_bimestres(turma):
+    import plotly.graph_objects as go
+    import historico
+    st.title(f"Evolução por Bimestre - {turma}")
+    st.write("Esta aba mostra a evolução das notas ao longo dos bimestres já carregados para a turma.")
+
+    # Estudante opcional: sem seleção, mostra a média da turma
+    alunos_turma = historico.alunos(turma)
+    opcoes_alunos = ["Média da Turma"] + [f"{numero} - {nome}" for numero, nome in alunos_turma.itertuples(index=False)]
+    aluno_escolhido = st.selectbox("Selecione o estudante", opcoes_alunos)
+    numero = None if aluno_escolhido == "Média da Turma" else alunos_turma["Numero"].iloc[opcoes_alunos.index(aluno_escolhido) - 1]
+
+    evolucao = historico.evolucao(turma, numero)
+    if evolucao.empty:
+        st.info("Nenhum bimestre registrado para esta turma.")
+    else:
+        st.dataframe(evolucao)
+        fig_evolucao = go.Figure()
+        for disciplina in evolucao.columns:
+            fig_evolucao.add_trace(go.Scatter(
+                x=evolucao.index,
+                y=evolucao[disciplina],
+                mode="lines+markers",
+                name=disciplina
+            ))
+        fig_evolucao.update_layout(
+            title=f"Evolução das Notas - {aluno_escolhido}",
+            xaxis_title="Bimestre",
+            yaxis_title="Notas",
+            yaxis=dict(range=[0, 10]),
+            height=600
+        )
+        exibir_grafico(fig_evolucao, "evolucao")
+
 # Página principal do dashboard
 def main():
+    import pandas as pd
+    import historico
+    from alteracoes import comparar_planilhas, resumo_alteracoes
+    from coortes import APROVADOS, descrever
+    from dados import DadosTurma
+    from estatisticas import IndiceEstatisticas
+    from ingestao import FORMATOS, arquivos_em_cache, carregar_planilhas, ler_planilha
     # Layout inicial
     col1, col2 = st.columns([3, 1])
     with col1:
         st.title("Ferramenta de Análise do Processo de Ensino e Aprendizagem")
     with col2:
-        st.image("campusHumanitas2.PNG", width=300)
-
-
-
+        st.image(carregar_imagem("campusHumanitas2.PNG"), width=300)
 
-    # Sidebar com configuração expansível
     # Sidebar com configuração expansível
     with st.sidebar:
         with st.expander("⚙️ Configuração", expanded=False):
-            uploaded_file = st.file_uploader("Carregue o arquivo Excel", type=["xlsx"])
+            uploaded_file = st.file_uploader("Carregue o arquivo de notas (Excel, CSV, Parquet ou Arrow)", type=[extensao.lstrip(".") for extensao in FORMATOS])
+            hash_arquivo, sheet_names = None, []
             if uploaded_file:
-                # Listar as planilhas disponíveis no arquivo Excel
-                excel_file = pd.ExcelFile(uploaded_file)
-                sheet_names = excel_file.sheet_names
+                # Listar as planilhas disponíveis (o arquivo é lido uma única vez e fica no cache)
+                with medidor.medir("carregar_planilhas", "leitura"):
+                    hash_arquivo, sheet_names, problemas = carregar_planilhas(uploaded_file.getvalue(), nome_arquivo=uploaded_file.name)
+            else:
+                # Arquivos já importados (importar.py ou envios anteriores)
+                arquivos = arquivos_em_cache()
+                if arquivos:
+                    arquivo = st.selectbox("Ou selecione um arquivo já importado:", arquivos, format_func=lambda a: a["arquivo"])
+                    hash_arquivo, sheet_names, problemas = arquivo["hash"], arquivo["planilhas"], arquivo["problemas"]
+            if hash_arquivo:
+                # Planilhas fora do formato Numero / Nome / Final score não podem ser carregadas
+                for planilha, lista in problemas.items():
+                    st.warning(f"Planilha '{planilha}' ignorada: " + "; ".join(lista))
+                if not sheet_names:
+                    st.error("Nenhuma planilha válida no arquivo.")
+            if sheet_names:
                 selected_sheet = st.selectbox("Selecione a planilha:", sheet_names)
+                # Nome da turma no histórico (padrão: o da planilha); arquivos diferentes com planilhas
+                # de mesmo nome (ex.: "Planilha1") só somam seus bimestres se receberem o mesmo nome
+                turma = st.text_input("Turma:", value=selected_sheet).strip() or selected_sheet
+                bimestres_turma = bimestres_historico(turma)
+                if bimestres_turma:
+                    st.caption(f"A turma '{turma}' já tem no histórico: {', '.join(bimestres_turma)}.")
 
                 bimestre = st.text_input("Bimestre:", placeholder="Ex: 1º Bimestre")
-                if uploaded_file and bimestre.strip():
+                if bimestre.strip():
                     if st.button("Carregar Dados"):
                         # Carregar a planilha selecionada
-                        df = pd.read_excel(uploaded_file, sheet_name=selected_sheet)
-                        st.session_state.df = df
+                        with medidor.medir("ler_planilha", "leitura"):
+                            df = ler_planilha(hash_arquivo, selected_sheet)
+                            dados = DadosTurma(df)
+                        chave_dados = (hash_arquivo, selected_sheet)
+
+                        # Nova versão da planilha já carregada: compara as linhas pelo "Numero"
+                        # e, se possível, atualiza os índices só onde houve alteração
+                        indice_anterior, estudantes_anterior = st.session_state.indice, st.session_state.estudantes
+                        comparacao = None
+                        if (indice_anterior is not None and st.session_state.turma == turma
+                                and chave_dados != st.session_state.chave_dados):
+                            with medidor.medir("comparar_planilhas", "agregacao"):
+                                comparacao = comparar_planilhas(indice_anterior.dados.tabela(), dados.tabela())
+                        incremental = comparacao is not None and comparacao["incremental"]
+
+                        # Estatísticas calculadas uma única vez e reutilizadas por todas as abas
+                        # (compartilhadas com outras sessões que carregarem a mesma planilha);
+                        # a sessão guarda só a referência ao índice, e não uma cópia da planilha
+                        with medidor.medir("indices", "agregacao"):
+                            indice = cache_compartilhado().obter(
+                                chave_dados + ("indice",),
+                                lambda: indice_anterior.atualizado(dados)[0] if incremental
+                                else fila_trabalhos().executar(chave_dados + ("indice",), IndiceEstatisticas, dados)
+                            )
+                        # O índice de busca só é montado quando uma aba precisar dele, exceto
+                        # quando o anterior pode ser atualizado
+                        estudantes = None
+                        if incremental and estudantes_anterior is not None:
+                            colunas = [j for j, disciplina in enumerate(indice.disciplinas)
+                                       if indice.assinaturas[disciplina] != indice_anterior.assinaturas[disciplina]]
+                            with medidor.medir("indice_estudantes", "agregacao"):
+                                estudantes = cache_compartilhado().obter(
+                                    chave_dados + ("estudantes",),
+                                    lambda: estudantes_anterior.atualizado(indice.dados, colunas)
+                                )
+                        st.session_state.indice = indice
+                        st.session_state.estudantes = estudantes
+                        st.session_state.comparacao = comparacao
+                        st.session_state.chave_dados = chave_dados
                         st.session_state.bimestre = bimestre
-                        st.success(f"Dados carregados com sucesso da planilha '{selected_sheet}'!")
-
+                        st.session_state.turma = turma
+                        # Guardar a planilha como um bimestre da turma no histórico (apenas o que mudou)
+                        with medidor.medir("gravar_historico", "leitura"):
+                            alteracoes = historico.gravar_bimestre(turma, bimestre.strip(), df)
+                        bimestres_historico.clear(turma)
+                        st.success(f"Dados carregados com sucesso da planilha '{selected_sheet}' (turma '{turma}')!")
+                        st.caption(f"Histórico atualizado: {alteracoes} registro(s) alterado(s).")
+
+
+        # Painel do administrador: instrumentação e uso do cache compartilhado
+        if st.session_state.get("admin"):
+            with st.expander("🛠️ Instrumentação", expanded=False):
+                st.checkbox("Medir tempos, payload e memória", key="instrumentacao")
+                relatorios = historico_medicoes().relatorios()
+                if relatorios:
+                    ultimo = relatorios[-1]
+                    st.caption(
+                        f"Último rerun ({ultimo['rotulo'] or '-'}): {ultimo['total_ms']:.0f} ms · "
+                        f"gráficos {ultimo['bytes_graficos'] / 1024:.0f} KiB · "
+                        f"pico de memória {(ultimo['pico_memoria_bytes'] or 0) / 2**20:.1f} MiB"
+                    )
+                    st.dataframe(pd.DataFrame(ultimo["etapas"]))
+                    st.download_button(
+                        "Exportar JSON",
+                        historico_medicoes().exportar_json(),
+                        file_name=f"instrumentacao-{VERSAO}.json",
+                        mime="application/json"
+                    )
+                uso_cache = cache_compartilhado().estatisticas()
+                st.caption(
+                    f"Cache compartilhado: {uso_cache['entradas']} entradas · "
+                    f"{uso_cache['bytes'] / 2**20:.1f} de {uso_cache['limite_bytes'] / 2**20:.0f} MiB · "
+                    f"acertos {uso_cache['taxa_acerto']:.0%} ({uso_cache['acertos']}/{uso_cache['acertos'] + uso_cache['faltas']}) · "
+                    f"remoções {uso_cache['remocoes']}"
+                )
+                fila = fila_trabalhos().metricas()
+                st.caption(
+                    f"Fila de trabalhos ({fila['trabalhadores']} {fila['tipo']}): {fila['na_fila']} na fila · "
+                    f"{fila['pendentes']} pendente(s) de {fila['limite_fila']} · {fila['concluidos']} concluído(s) · "
+                    f"{fila['coalescidos']} coalescido(s) · espera média {fila['espera_media_ms']:.0f} ms "
+                    f"(p95 {fila['espera_p95_ms']:.0f}) · execução média {fila['execucao_media_ms']:.0f} ms "
+                    f"(p95 {fila['execucao_p95_ms']:.0f})"
+                )
 
         # Opções de navegação (aparecem após configuração)
-        if st.session_state.df is not None and st.session_state.bimestre:
+        if st.session_state.indice is not None and st.session_state.bimestre:
             st.write("---")
             opcao = st.radio(
                 "Selecione uma função:",
@@ -83,592 +702,78 @@ def main():
                     "Ranking de Estudante",
                     "Comparação de Estudante",
                     "Ranking por Disciplina",
+                    "Evolução por Bimestre",
                 ],
             )
+            chaves_coorte = filtro_coortes(st.session_state.indice)
 
-    # Conteúdo principal
-    if st.session_state.df is not None and st.session_state.bimestre:
-        df = st.session_state.df
+    # Conteúdo principal: só a aba selecionada é calculada
+    if st.session_state.indice is not None and st.session_state.bimestre:
         bimestre = st.session_state.bimestre
-
-        if opcao == "Visão Geral":
-            st.title("Visão Geral")
-            # Conteúdo da visão geral
-            st.write(f"Esta aba mostra a tabela completa de notas e um gráfico de barras geral para o {bimestre}.")
-
-            # Exibe a tabela completa
-            st.subheader("Tabela Completa de Notas")
-            st.dataframe(df)
-
-            # Gráfico de barras geral para todas as disciplinas
-            st.subheader(f"Gráfico de Notas por Disciplina (Média da Turma) - {bimestre}")
-            mean_scores = df.drop(columns=["Numero", "Nome"]).mean() # MAIS ANTIGO
-            #mean_scores = df.drop(columns=["Numero", "Nome", "Total1 Final", "Total2 Final", "Total3 Final", "Total4 Final"]).mean()
-            #numeric_columns = df.select_dtypes(include=[np.number]).columns
-            #mean_scores = df[numeric_columns].mean()
-            st.bar_chart(mean_scores)
-
-            # Aba 2: Busca de Aluno
-        elif opcao == "Busca de Estudante":
-            st.title(f"Busca de Estudante - {bimestre}")
-            # Campo de busca e checkboxes
-            #nome_estudante = st.sidebar.text_input("Digite o nome do estudante:")
-            #mostrar_detalhes = st.sidebar.checkbox("Mostrar detalhes completos")
-            st.write(f"Esta aba permite buscar um estudante específico e visualizar seus gráficos para o {bimestre}.")
-
-            # Input para o número do aluno
-            numero_aluno = st.number_input("Insira o número do Estudante", min_value=1, max_value=len(df), step=1)
-
-            # Botão para buscar o aluno pelo número
-            if st.button("Buscar Estudante"):
-                # Filtrar os dados para o aluno selecionado pelo número
-                aluno_df = df[df["Numero"] == numero_aluno]
-
-                if not aluno_df.empty:
-                    aluno_selecionado = aluno_df.iloc[0]["Nome"]
-
-                    # Exibir informações do aluno selecionado
-                    st.subheader(f"Notas do Estudante: {aluno_selecionado}")
-                    st.dataframe(aluno_df)
-
-                    # Gráfico de barras para as notas do aluno por disciplina
-                    st.subheader(f"Gráfico de Notas por Disciplina - {bimestre}")
-                    notas_aluno = aluno_df.drop(columns=["Numero", "Nome"]).T
-                    notas_aluno.columns = ["Notas"]
-                    st.bar_chart(notas_aluno)
-
-                    # Extrair as notas do aluno (excluindo NaN)
-                    notas_aluno = notas_aluno.dropna()
-                    disciplinas = notas_aluno.index
-                    notas = notas_aluno.values.flatten()
-
-                    # Criar gráfico da distribuição normal com Plotly
-                    st.subheader(f"Distribuição Normal e Notas do Estudante - {bimestre}")
-                    mean = 6  # Média da distribuição normal
-                    std_dev = 1  # Desvio padrão da distribuição normal
-                    x = np.linspace(mean - 4 * std_dev, mean + 4 * std_dev, 100)  # Valores no eixo x
-                    y = norm.pdf(x, mean, std_dev)  # Função de densidade de probabilidade
-
-                    # Criar o gráfico de distribuição normal
-                    fig = go.Figure()
-
-                    # Adicionar a curva normal com área preenchida
-                    fig.add_trace(go.Scatter(
-                        x=x,
-                        y=y,
-                        mode="lines",
-                        name="Distribuição Normal",
-                        line=dict(color="rgba(135, 206, 250, 1)"),  # Mesma cor da área preenchida
-                        fill="tozeroy",  # Preencher a área até y = 0
-                        fillcolor="rgba(135, 206, 250, 0.5)"
-                    ))
-
-                    # Função para evitar sobreposição de pontos
-                    def ajustar_posicao_vertical(notas):
-                        # Dicionário para contar quantas vezes cada nota aparece
-                        contagem_notas = {}
-                        posicoes_y = []
-                        for nota in notas:
-                            if nota not in contagem_notas:
-                                contagem_notas[nota] = 0
-                            else:
-                                contagem_notas[nota] += 0.5
-                            # Ajuste incremental para evitar sobreposição
-                            posicoes_y.append(norm.pdf(nota, mean, std_dev) + 0.02 * contagem_notas[nota])
-                        return posicoes_y
-
-                    # Ajustar posições verticais para evitar sobreposição
-                    notas_ajustadas_y = ajustar_posicao_vertical(notas)
-
-                    # Adicionar os pontos das notas do aluno
-                    for disciplina, nota, y_nota in zip(disciplinas, notas, notas_ajustadas_y):
-                        fig.add_trace(go.Scatter(
-                            x=[nota],
-                            y=[y_nota],
-                            mode="markers",
-                            name=f"{disciplina}: {nota:.1f}",
-                            marker=dict(color="red", size=10),
-                            hoverinfo="text",
-                            hovertext=f"Disciplina: {disciplina}<br>Nota: {nota:.1f}<br>Diferença da Média: {nota - mean:.1f}"
-                        ))
-
-                    # Adicionar linhas tracejadas para os desvios padrão
-                    for i in range(-3, 4):  # De -3σ a +3σ
-                        x_line = mean + i * std_dev
-                        y_line = norm.pdf(x_line, mean, std_dev)
-                        fig.add_shape(
-                            type="line",
-                            x0=x_line, y0=0, x1=x_line, y1=y_line,
-                            line=dict(color="red", width=2, dash="dash"),
-                            name=f"{i}σ"
-                        )
-                        fig.add_annotation(
-                            x=x_line, y=-0.02,
-                            text=f"{i}σ",
-                            showarrow=False,
-                            yshift=10,
-                            font=dict(color="red", size=10)
-                        )
-
-                    # Configurações do gráfico
-                    fig.update_layout(
-                        title=f"Distribuição Normal e Notas do Estudante - {bimestre}",
-                        xaxis_title="Notas",
-                        yaxis_title="Densidade",
-                        showlegend=False,
-                        hovermode="closest",
-                        plot_bgcolor="white",  # Fundo branco
-                        height=800,  # Altura do gráfico (em pixels)
-                        xaxis=dict(
-                            showgrid=True,  # Linhas de grade verticais
-                            gridcolor="lightgray",  # Cor das linhas de grade
-                            zeroline=True,  # Linha no eixo x = 0
-                            zerolinecolor="gray",
-                            tickformat=".1f"  # Formatar valores no eixo x
-                        ),
-                        yaxis=dict(
-                            showgrid=True,  # Linhas de grade horizontais
-                            gridcolor="lightgray",  # Cor das linhas de grade
-                            zeroline=True,  # Linha no eixo y = 0
-                            zerolinecolor="gray",
-                            range=[-0.05, 0.5],  # Fixar o eixo y entre 0 e 0.5 (ajuste para a PDF)
-                            tickformat=".2f"  # Formatar valores no eixo y
-                        )
-                    )
-
-                    # Exibir o gráfico no Streamlit
-                    st.plotly_chart(fig)
-                    # Preparar dados Hexágono sem o Final score
-                    disciplinas_filtradas = [disc for disc in disciplinas if disc != "Final score"]
-
-                    # Filtrar as notas correspondentes às disciplinas filtradas
-                    notas_filtradas = [nota for disc, nota in zip(disciplinas, notas) if disc != "Final score"]
-
-                    # Fechar o hexágono (adicionar o primeiro elemento ao final)
-                    disciplinas_hex = disciplinas_filtradas + [disciplinas_filtradas[0]]  # Fechar o hexágono
-                    notas_hex = notas_filtradas + [notas_filtradas[0]]  # Fechar o hexágono com as notas correspondentes
-
-                    # Criar o gráfico hexagonal
-                    fig_hex = go.Figure()
-
-                    fig_hex.add_trace(go.Scatterpolar(
-                        r=notas_hex,
-                        theta=disciplinas_hex,
-                        fill='toself',
-                        name='Desempenho do Estudante',
-                        line=dict(color='blue', width=2),
-                        marker=dict(color='red', size=8)
-                    ))
-
-                    # Configurações do gráfico
-                    fig_hex.update_layout(
-                        polar=dict(
-                            radialaxis=dict(
-                                visible=True,
-                                range=[0, 10],  # Ajuste conforme sua escala de notas
-                                tickvals=[0, 2, 4, 6, 8, 10],
-                                ticktext=["0", "2", "4", "6", "8", "10"],
-                                tickfont=dict(color="black"),
-                            ),
-                            angularaxis=dict(
-                                rotation=90,  # Começar no topo
-                                direction='clockwise',
-                                tickfont=dict(size=10)
-                            )
-                        ),
-                        title=f'Distribuição de Habilidades - {aluno_selecionado}',
-                        showlegend=True,
-                        height=600,
-                        margin=dict(l=50, r=50, t=50, b=50)
-                    )
-
-                    # Exibir o gráfico
-                    st.plotly_chart(fig_hex, use_container_width=True)
+        medidor.rotulo = opcao
+        indice = st.session_state.indice
+
+        # Registro de alterações em relação à versão anterior da planilha
+        comparacao = st.session_state.comparacao
+        if comparacao is not None:
+            with st.expander(f"📝 Alterações em relação ao carregamento anterior: {resumo_alteracoes(comparacao)}"):
+                st.dataframe(comparacao["registro"], hide_index=True)
+                if comparacao["adicionados"]:
+                    st.caption(f"Estudantes incluídos: {', '.join(map(str, comparacao['adicionados']))}")
+                if comparacao["removidos"]:
+                    st.caption(f"Estudantes removidos: {', '.join(map(str, comparacao['removidos']))}")
+                if comparacao["incremental"]:
+                    st.caption("Estatísticas, rankings e gráficos recalculados apenas para as disciplinas alteradas.")
                 else:
-                    st.error("Estudante não encontrado. Verifique o número inserido.")
-            # Aba 3: Estatísticas da Turma
-        elif opcao == "Estatísticas da Turma":
-            st.title(f"Estatísticas da Turma - {bimestre}")
-            # Checkbox para filtrar dados
-            incluir_aprovados = st.sidebar.checkbox("Incluir apenas aprovados")
-            st.write(f"Esta aba mostra estatísticas gerais da turma para o {bimestre}.")
-
-            # Exibir média, mediana e desvio padrão por disciplina
-            stats = df.drop(columns=["Numero", "Nome"]).agg(["mean", "median", "std"])
-            st.dataframe(stats)
-
-            # Gráfico de boxplot
-            st.subheader(f"Boxplot das Notas da Turma - {bimestre}")
-            fig_boxplot = go.Figure()
-            for col in df.drop(columns=["Numero", "Nome"]).columns:
-                fig_boxplot.add_trace(go.Box(y=df[col], name=col))
-            fig_boxplot.update_layout(title=f"Boxplot das Notas - {bimestre}", height=600)
-            st.plotly_chart(fig_boxplot)
-            numeric_columns = df.select_dtypes(include=[np.number]).columns
-            mean_scores = df[numeric_columns].mean()
-            #mean_scores = df.drop(columns=["Numero", "Nome", "Total1 Final", "Total2 Final", "Total3 Final", "Total4 Final"]).mean()
-            #mean_scores = df.drop(columns=["Numero", "Nome"]).mean()
-            disciplinas = mean_scores.index.tolist()
-            medias = mean_scores.values.tolist()
-
-            # Gráfico Hexagonal (Radar Chart)
-
-            disciplinas_filtradas = [disc for disc in disciplinas if disc not in ["Numero", "Final score"]]
-            medias = [med for disc, med in zip(disciplinas, medias) if disc not in ["Numero", "Final score"]]
-            st.subheader(f"Visão Geral das Médias da Turma - {bimestre}")
-            fig_radar = go.Figure()
-            fig_radar.add_trace(go.Scatterpolar(
-                r=medias + [medias[0]],
-                theta=disciplinas_filtradas + [disciplinas_filtradas[0]],  # Fechar o hexágono
-                fill='toself',
-                name='Média da Turma',
-                line=dict(color='blue', width=2),
-                marker=dict(color='red', size=8)
-            ))
-            fig_radar.update_layout(
-                polar=dict(
-                    radialaxis=dict(
-                        visible=True,
-                        range=[0, 10],
-                        tickvals=[0, 2, 4, 6, 8, 10],
-                        tickfont=dict(color="black"),  # Adicione esta linha
-                    ),
-                ),
-                title=f'Distribuição das Médias da Turma - {bimestre}',
-                height=600
-            )
-            # Adicionamos a key única para o radar chart
-            st.plotly_chart(fig_radar, use_container_width=True, key="radar_chart")
-
-            # Gráfico de distribuição normal para cada disciplina
-            st.subheader(f"Distribuição Normal das Notas da Turma - {bimestre}")
-            disciplinas = df.drop(columns=["Numero", "Nome"]).columns
-
-            for disciplina in disciplinas:
-                # Filtrar as notas da disciplina selecionada
-                notas_disciplina = df[disciplina].dropna()
-
-                if not notas_disciplina.empty:
-                    mean_disciplina = notas_disciplina.mean()  # Média das notas da disciplina
-                    #mean_disciplina = 6
-                    std_dev_disciplina = notas_disciplina.std()  # Desvio padrão das notas da disciplina
-                    x_disciplina = np.linspace(mean_disciplina - 4 * std_dev_disciplina,
-                                               mean_disciplina + 4 * std_dev_disciplina, 100)
-                    y_disciplina = norm.pdf(x_disciplina, mean_disciplina, std_dev_disciplina)
-
-                    # Criar o gráfico de distribuição normal
-                    fig_normal = go.Figure()
-
-                    # Adicionar a curva normal com área preenchida
-                    fig_normal.add_trace(go.Scatter(
-                        x=x_disciplina,
-                        y=y_disciplina,
-                        mode="lines",
-                        name="Distribuição Normal",
-                        line=dict(color="rgba(135, 206, 250, 1)"),  # Mesma cor da área preenchida
-                        fill="tozeroy",  # Preencher a área até y = 0
-                        fillcolor="rgba(135, 206, 250, 0.5)"
-                    ))
-
-
-                    # Função para evitar sobreposição de pontos
-                    def ajustar_posicao_vertical(notas):
-                        # Dicionário para contar quantas vezes cada nota aparece
-                        contagem_notas = {}
-                        posicoes_y = []
-                        for nota in notas:
-                            if nota not in contagem_notas:
-                                contagem_notas[nota] = 0
-                            else:
-                                contagem_notas[nota] += 0.5
-                            # Ajuste incremental para evitar sobreposição
-                            posicoes_y.append(
-                                norm.pdf(nota, mean_disciplina, std_dev_disciplina) + 0.02 * contagem_notas[nota])
-                        return posicoes_y
-
-
-                    # Ajustar posições verticais para evitar sobreposição
-                    notas_ajustadas_y = ajustar_posicao_vertical(notas_disciplina)
-
-                    # Adicionar os pontos das notas dos alunos
-                    for nome, nota, y_nota in zip(df["Nome"], notas_disciplina, notas_ajustadas_y):
-                        fig_normal.add_trace(go.Scatter(
-                            x=[nota],
-                            y=[y_nota],
-                            mode="markers",
-                            name=f"{nome}: {nota:.1f}",
-                            marker=dict(color="red", size=10),
-                            hoverinfo="text",
-                            hovertext=f"Estudante: {nome}<br>Nota: {nota:.1f}<br>Diferença da Média: {nota - mean_disciplina:.1f}"
-                        ))
-
-                    # Adicionar linhas tracejadas para os desvios padrão
-                    for i in range(-3, 4):  # De -3σ a +3σ
-                        x_line = mean_disciplina + i * std_dev_disciplina
-                        y_line = norm.pdf(x_line, mean_disciplina, std_dev_disciplina)
-                        fig_normal.add_shape(
-                            type="line",
-                            x0=x_line, y0=0, x1=x_line, y1=y_line,
-                            line=dict(color="red", width=2, dash="dash"),
-                            name=f"{i}σ"
-                        )
-                        fig_normal.add_annotation(
-                            x=x_line, y=-0.02,
-                            text=f"{i}σ",
-                            showarrow=False,
-                            yshift=10,
-                            font=dict(color="red", size=10)
-                        )
-
-                    # Ajuste automático do eixo y
-                    max_density = max(y_disciplina)  # Valor máximo da densidade da curva normal
-                    y_range_max = max_density * 1.2  # Adicionar 20% de margem para evitar achatamento
-                    #y_range_max =0.5
-
-                    # Configurações do gráfico
-                    fig_normal.update_layout(
-                        title=f"Distribuição Normal das Notas em {disciplina} - {bimestre}",
-                        xaxis_title="Notas",
-                        yaxis_title="Densidade",
-                        showlegend=False,
-                        hovermode="closest",
-                        plot_bgcolor="white",  # Fundo branco
-                        height=800,  # Altura do gráfico (em pixels)
-                        xaxis=dict(
-                            showgrid=True,  # Linhas de grade verticais
-                            gridcolor="lightgray",  # Cor das linhas de grade
-                            zeroline=True,  # Linha no eixo x = 0
-                            zerolinecolor="gray",
-                            tickformat=".1f"  # Formatar valores no eixo x
-                        ),
-                        yaxis=dict(
-                            showgrid=True,  # Linhas de grade horizontais
-                            gridcolor="lightgray",  # Cor das linhas de grade
-                            zeroline=True,  # Linha no eixo y = 0
-                            zerolinecolor="gray",
-                            range=[-0.05, y_range_max],  # Ajuste automático do eixo y
-                            tickformat=".2f"  # Formatar valores no eixo y
-                        )
-                    )
-
-                    # Exibir o gráfico no Streamlit
-                    st.plotly_chart(fig_normal)
-                    # Calcular médias das disciplinas
+                    st.caption("Estudantes ou colunas diferentes: estatísticas recalculadas por completo.")
 
-
-            # Aba 4: Ranking de Alunos
+        # Os controles da barra lateral ficam fora dos fragmentos (um fragmento só escreve no próprio corpo)
+        if opcao == "Estatísticas da Turma":
+            # Checkbox para filtrar dados
+            incluir_aprovados = st.sidebar.checkbox("Incluir apenas aprovados", disabled=APROVADOS not in indice.coortes.mapas)
+            if incluir_aprovados and APROVADOS not in chaves_coorte:
+                chaves_coorte.append(APROVADOS)
         elif opcao == "Ranking de Estudante":
-            st.title(f"Ranking de Estudantes - {bimestre}")
             # Checkbox para tipo de ranking
-            ranking_por_nota = st.sidebar.checkbox("Ranking por média final")
-
-            st.write(f"Esta aba classifica os estudantes com base na média geral para o {bimestre}.")
-
-            # Calcular a média geral de cada aluno
-            #df["Media_Geral"] = df.drop(columns=["Numero", "Nome"]).mean(axis=1) //calcula a média inclusive da coluna Final score
-            #df["Media_Geral"] = df.drop(columns=["Numero", "Nome", "Final score"]).mean(axis=1)//calcula a média removendo a coluna Final score
-            df["Media_Geral"] = df["Final score"]
-            ranking = df[["Numero", "Nome","Final score"]].sort_values(by="Final score", ascending=False)# troquei Final score por Media_Geral
-
-            # Exibir o ranking
-            st.subheader(f"Ranking de Estudantes por Média Geral - {bimestre}")
-            st.dataframe(ranking)
-
-            # Gráfico de barras do ranking
-            st.subheader(f"Gráfico de Barras do Ranking - {bimestre}")
-            fig_ranking = go.Figure()
-            fig_ranking.add_trace(go.Bar(
-                x=ranking["Nome"],
-                y=ranking["Final score"],# troquei Final score por Media_Geral
-                marker_color="green"
-            ))
-            fig_ranking.update_layout(
-                title=f"Ranking de Estudantes por Média Geral - {bimestre}",
-                xaxis_title="Estudantes",
-                yaxis_title="Final score",# troquei Final score por Media_Gera
-                height=600
-            )
-            st.plotly_chart(fig_ranking)
-
-            # Aba 5: Comparação de Alunos
-        elif opcao == "Comparação de Estudante":
-            st.title(f"Comparação de Estudantes - {bimestre}")
-            # Multi-select para comparar alunos
-            alunos_selecionados = st.sidebar.multiselect("Selecione alunos para comparar", ["Aluno 1", "Aluno 2"])
-            st.write(f"Esta aba permite comparar as notas de dois ou mais estudantes para o {bimestre}.")
-
-            # Selecionar alunos para comparação
-            alunos_selecionados = st.multiselect("Selecione os estudantes para comparação", df["Nome"])
-
-            if len(alunos_selecionados) >= 2:
-                # Filtrar os dados dos alunos selecionados
-                alunos_df = df[df["Nome"].isin(alunos_selecionados)].set_index("Nome").drop(columns=["Numero"])
-
-                # Exibir as notas dos alunos selecionados
-                st.subheader(f"Notas dos Estudantes Selecionados - {bimestre}")
-                st.dataframe(alunos_df.T)
-
-                # Gráfico de barras empilhadas
-                st.subheader(f"Gráfico de Barras Empilhadas - {bimestre}")
-                fig_comparacao = go.Figure()
-                for aluno in alunos_selecionados:
-                    fig_comparacao.add_trace(go.Bar(
-                        x=alunos_df.columns,
-                        y=alunos_df.loc[aluno],
-                        name=aluno
-                    ))
-                fig_comparacao.update_layout(
-                    title=f"Comparação de Notas dos Estudantes - {bimestre}",
-                    xaxis_title="Disciplinas",
-                    yaxis_title="Notas",
-                    barmode="group",
-                    height=600
-                )
-                st.plotly_chart(fig_comparacao)
-
-            else:
-                st.info("Selecione pelo menos dois estudantes para comparação.")
-
-            # Aba 6: Ranking por Disciplina
+            ranking_por_media = st.sidebar.checkbox("Ranking pela média das disciplinas")
         elif opcao == "Ranking por Disciplina":
-            st.title(f"Ranking por Disciplina - {bimestre}")
             # Checkbox para disciplina específica
-            disciplinas = df.drop(columns=["Numero", "Nome"]).columns
-            disciplina_selecionada = st.sidebar.selectbox("Selecione a disciplina",disciplinas)
-            #st.header(f"Ranking por Disciplina - {bimestre}")4
-            st.write(f"Esta aba permite selecionar uma disciplina e visualizar as notas de todos os estudantes para o {bimestre}.")
-
-            # Selecionar a disciplina
-            #disciplinas = df.drop(columns=["Numero", "Nome"]).columns
-            #disciplina_selecionada = st.selectbox("Selecione a disciplina", disciplinas)
-
-            # Filtrar as notas da disciplina selecionada
-            notas_disciplina = df[["Nome", disciplina_selecionada]].dropna()
-
-            # Exibir o gráfico de barras
-            st.subheader(f"Notas dos Estudantes em {disciplina_selecionada} - {bimestre}")
-            fig_barras = go.Figure()
-            fig_barras.add_trace(go.Bar(
-                x=notas_disciplina["Nome"],
-                y=notas_disciplina[disciplina_selecionada],
-                marker_color="blue"
-            ))
-            fig_barras.update_layout(
-                title=f"Notas dos Estudantes em {disciplina_selecionada} - {bimestre}",
-                xaxis_title="Estudantes",
-                yaxis_title="Notas",
-                height=600
-            )
-            st.plotly_chart(fig_barras)
-
-            # Gráfico de distribuição normal para a disciplina selecionada
-            st.subheader(f"Distribuição Normal das Notas em {disciplina_selecionada} - {bimestre}")
-            #mean_disciplina = notas_disciplina[disciplina_selecionada].mean()  # Média das notas da disciplina
-            mean_disciplina = 5.82
-            #std_dev_disciplina = 1
-            std_dev_disciplina = notas_disciplina[disciplina_selecionada].std()  # Desvio padrão das notas da disciplina
-            x_disciplina = np.linspace(mean_disciplina - 4 * std_dev_disciplina, mean_disciplina + 4 * std_dev_disciplina, 100)
-            #x_disciplina = np.linspace(0,10, 100)
-            #y_disciplina = norm.pdf(x_disciplina, mean_disciplina, std_dev_disciplina)
-            y_disciplina = norm.pdf(x_disciplina, mean_disciplina, std_dev_disciplina)
-
-            # Criar o gráfico de distribuição normal
-            fig_normal = go.Figure()
-
-            # Adicionar a curva normal com área preenchida
-            fig_normal.add_trace(go.Scatter(
-                x=x_disciplina,
-                y=y_disciplina,
-                mode="lines",
-                name="Distribuição Normal",
-                line=dict(color="rgba(135, 206, 250, 1)"),  # Mesma cor da área pre # Mesma cor da área preenchida
-                fill="tozeroy",  # Preencher a área até y = 0
-                fillcolor="rgba(135, 206, 250, 0.5)"
-            ))
-            # Função para evitar sobreposição de pontos
-            def ajustar_posicao_vertical(notas):
-                # Dicionário para contar quantas vezes cada nota aparece
-                contagem_notas = {}
-                posicoes_y = []
-                for nota in notas:
-                    if nota not in contagem_notas:
-                        contagem_notas[nota] = 0
-                    else:
-                        contagem_notas[nota] += 0.5
-                    # Ajuste incremental para evitar sobreposição
-                    posicoes_y.append(norm.pdf(nota, mean_disciplina, std_dev_disciplina) + 0.02 * contagem_notas[nota])
-                return posicoes_y
-
-            # Ajustar posições verticais para evitar sobreposição
-            notas_ajustadas_y = ajustar_posicao_vertical(notas_disciplina[disciplina_selecionada])
-
-            # Adicionar os pontos das notas dos alunos
-            for nome, nota, y_nota in zip(notas_disciplina["Nome"], notas_disciplina[disciplina_selecionada], notas_ajustadas_y):
-                fig_normal.add_trace(go.Scatter(
-                    x=[nota],
-                    y=[y_nota],
-                    mode="markers",
-                    name=f"{nome}: {nota:.1f}",
-                    marker=dict(color="red", size=10),
-                    hoverinfo="text",
-                    hovertext=f"Estudante: {nome}<br>Nota: {nota:.1f}<br>Diferença da Média: {nota - mean_disciplina:.1f}"
-                ))
-
-            # Adicionar linhas tracejadas para os desvios padrão
-            for i in range(-3, 4):  # De -3σ a +3σ
-                x_line = mean_disciplina + i * std_dev_disciplina
-                y_line = norm.pdf(x_line, mean_disciplina, std_dev_disciplina)
-                fig_normal.add_shape(
-                    type="line",
-                    x0=x_line, y0=0, x1=x_line, y1=y_line,
-                    line=dict(color="red", width=2, dash="dash"),
-                    name=f"{i}σ"
-                )
-                fig_normal.add_annotation(
-                    x=x_line, y=-0.02,
-                    text=f"{i}σ",
-                    showarrow=False,
-                    yshift=10,
-                    font=dict(color="red", size=10)
-                )
-
-            # Ajuste automático do eixo y
-            max_density = max(y_disciplina)  # Valor máximo da densidade da curva normal
-            y_range_max = max_density * 1.2  # Adicionar 20% de margem para evitar achatamento
-            #y_range_max = 0.5
-
-            # Configurações do gráfico
-            fig_normal.update_layout(
-                title=f"Distribuição Normal das Notas em {disciplina_selecionada}",
-                xaxis_title="Notas",
-                yaxis_title="Densidade",
-                showlegend=False,
-                hovermode="closest",
-                plot_bgcolor="white",  # Fundo branco
-                height=800,  # Altura do gráfico (em pixels)
-                xaxis=dict(
-                    showgrid=True,  # Linhas de grade verticais
-                    gridcolor="lightgray",  # Cor das linhas de grade
-                    zeroline=True,  # Linha no eixo x = 0
-                    zerolinecolor="gray",
-                    tickformat=".1f"  # Formatar valores no eixo x
-                ),
-                yaxis=dict(
-                    showgrid=True,  # Linhas de grade horizontais
-                    gridcolor="lightgray",  # Cor das linhas de grade
-                    zeroline=True,  # Linha no eixo y = 0
-                    zerolinecolor="gray",
-                    range=[-0.05, y_range_max],  # Ajuste automático do eixo y
-                    tickformat=".2f"  # Formatar valores no eixo y
-                )
-            )
+            disciplina_selecionada = st.sidebar.selectbox("Selecione a disciplina", indice.disciplinas)
+
+        # As abas de estatísticas são calculadas só sobre os estudantes do filtro; a busca e a
+        # evolução usam sempre a turma completa (número na planilha e histórico do banco)
+        if chaves_coorte and opcao not in ("Busca de Estudante", "Evolução por Bimestre"):
+            total_coorte = indice.coortes.contar(*chaves_coorte)
+            st.caption(f"Filtro: {' e '.join(descrever(chave, indice.coortes.nota_aprovacao) for chave in chaves_coorte)} "
+                       f"· {total_coorte} de {len(indice.numeros)} estudantes")
+            if total_coorte == 0:
+                st.warning("Nenhum estudante atende ao filtro selecionado.")
+                opcao = None
+            else:
+                indice = indice_coorte(indice, chaves_coorte)
 
-            # Exibir o gráfico no Streamlit
-            st.plotly_chart(fig_normal)
+        if opcao == "Visão Geral":
+            visao_geral(indice, bimestre)
+        elif opcao == "Busca de Estudante":
+            busca_estudante(indice, bimestre)
+        elif opcao == "Estatísticas da Turma":
+            estatisticas_da_turma(indice, bimestre)
+        elif opcao == "Ranking de Estudante":
+            ranking_estudantes(indice, bimestre, ranking_por_media)
+        elif opcao == "Comparação de Estudante":
+            comparacao_estudantes(indice, bimestre)
+        elif opcao == "Ranking por Disciplina":
+            ranking_disciplina(indice, bimestre, disciplina_selecionada)
+        elif opcao == "Evolução por Bimestre":
+            evolucao_bimestres(st.session_state.turma)
     else:
-        st.info("Por favor, faça o upload de um arquivo Excel para visualizar os dados.")
+        st.info("Por favor, faça o upload de um arquivo de notas para visualizar os dados.")
 # Verifica se o usuário está logado
 if not st.session_state.logged_in:
     login()
 else:
     main()
+
+# Guarda o relatório deste rerun para o painel de instrumentação
+if medidor.ativo:
+    historico_medicoes().adicionar(medidor.finalizar())
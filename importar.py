@@ -0,0 +1,88 @@
+# Importação em lote das planilhas de uma escola inteira
+# Lê todos os arquivos de notas de um diretório (.xlsx, .csv, .parquet, .arrow/.feather)
+# em paralelo (um processo por núcleo), valida o formato Numero / Nome / Final score e
+# grava no mesmo cache usado pelo dashboard, que passa a abrir com os arquivos já disponíveis.
+#
+# Uso: python importar.py DIRETORIO [--bimestre "1º Bimestre"] [--processos N] [--recursivo]
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import historico
+from ingestao import FORMATOS, gravar_planilhas, hash_arquivo_em_disco, ler_arquivo, ler_planilha, separar_planilhas
+
+
+# Executado em cada processo: lê, valida e grava um arquivo no cache
+def importar_arquivo(caminho, diretorio_cache=None):
+    inicio = time.perf_counter()
+    hash_arquivo = hash_arquivo_em_disco(caminho)
+    # CSV, Parquet e Arrow são lidos do disco em blocos (Arrow e Parquet mapeados na memória)
+    validas, erros = separar_planilhas(*ler_arquivo(caminho))
+    if validas:
+        gravar_planilhas(hash_arquivo, validas, diretorio_cache, os.path.basename(caminho), erros)
+    return {
+        "arquivo": caminho,
+        "hash": hash_arquivo,
+        "planilhas": [str(nome) for nome in validas],
+        "erros": erros,
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def listar_arquivos(diretorio, recursivo=False):
+    padrao = os.path.join(diretorio, "**", "*") if recursivo else os.path.join(diretorio, "*")
+    # Arquivos temporários do Excel ("~$arquivo.xlsx") são ignorados
+    return sorted(caminho for caminho in glob.glob(padrao, recursive=recursivo)
+                  if os.path.splitext(caminho)[1].lower() in FORMATOS and os.path.isfile(caminho)
+                  and not os.path.basename(caminho).startswith("~$"))
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Importa em lote planilhas de notas para o cache do dashboard.")
+    parser.add_argument("diretorio", help="Diretório com os arquivos de notas")
+    parser.add_argument("--bimestre", help="Também grava as planilhas válidas no histórico como este bimestre")
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="Número de processos (padrão: um por núcleo)")
+    parser.add_argument("--recursivo", action="store_true", help="Procura arquivos também nos subdiretórios")
+    parser.add_argument("--cache", help="Diretório do cache (padrão: o mesmo do dashboard)")
+    args = parser.parse_args(argumentos)
+
+    arquivos = listar_arquivos(args.diretorio, args.recursivo)
+    if not arquivos:
+        print(f"Nenhum arquivo de notas ({', '.join(FORMATOS)}) encontrado em '{args.diretorio}'.")
+        return 1
+
+    inicio = time.perf_counter()
+    resultados = []
+    with ProcessPoolExecutor(max_workers=args.processos) as executor:
+        futuros = {executor.submit(importar_arquivo, caminho, args.cache): caminho for caminho in arquivos}
+        for futuro in as_completed(futuros):
+            caminho = futuros[futuro]
+            try:
+                resultado = futuro.result()
+            except Exception as erro:  # Arquivo corrompido ou ilegível
+                resultado = {"arquivo": caminho, "planilhas": [], "erros": {"*": [str(erro)]}, "segundos": 0.0}
+            resultados.append(resultado)
+            print(f"{os.path.basename(caminho)}: {len(resultado['planilhas'])} planilha(s) importada(s) "
+                  f"em {resultado['segundos']:.2f}s")
+            for planilha, problemas in resultado["erros"].items():
+                for problema in problemas:
+                    print(f"  [ignorada] {planilha}: {problema}")
+
+    # O histórico (SQLite) aceita um único escritor: gravado no processo principal
+    if args.bimestre:
+        for resultado in resultados:
+            for planilha in resultado["planilhas"]:
+                historico.gravar_bimestre(planilha, args.bimestre, ler_planilha(resultado["hash"], planilha, args.cache))
+
+    total_planilhas = sum(len(resultado["planilhas"]) for resultado in resultados)
+    com_erro = sum(1 for resultado in resultados if resultado["erros"])
+    print(f"{len(arquivos)} arquivo(s), {total_planilhas} planilha(s) importada(s) "
+          f"em {time.perf_counter() - inicio:.2f}s; {com_erro} arquivo(s) com problemas.")
+    return 1 if com_erro else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
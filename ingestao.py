@@ -0,0 +1,338 @@
+# Camada de ingestão das planilhas de notas
+# Cada arquivo enviado é lido uma única vez (identificado pelo hash do conteúdo),
+# convertido para um formato colunar tipado (Parquet) e servido do disco nas
+# próximas trocas de planilha e nos reruns do Streamlit.
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+DIRETORIO_CACHE = os.environ.get("HUMANITAS_CACHE", ".cache_humanitas")
+LIMITE_CACHE_BYTES = int(os.environ.get("HUMANITAS_CACHE_BYTES", 512 * 1024 * 1024))
+ARQUIVO_MANIFESTO = "manifesto.json"
+COLUNAS_FIXAS = ["Numero", "Nome"]
+COLUNAS_OBRIGATORIAS = ["Numero", "Nome", "Final score"]
+LINHAS_POR_BLOCO = 65_536
+# Extensões aceitas e o formato de cada uma
+FORMATOS = {
+    ".xlsx": "xlsx",
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+
+# Função para calcular o identificador (hash) do conteúdo de um arquivo
+def hash_conteudo(dados):
+    return hashlib.sha256(dados).hexdigest()
+
+
+# Mesmo hash, lendo o arquivo do disco em pedaços (sem carregá-lo inteiro na memória)
+def hash_arquivo_em_disco(caminho, tamanho_bloco=1024 * 1024):
+    resumo = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+# Função para converter uma planilha crua do Excel para os tipos compactos
+def normalizar_planilha(df):
+    df = df.copy()
+    df.columns = [str(coluna) for coluna in df.columns]
+    for coluna in df.columns:
+        if coluna == "Nome":
+            df[coluna] = df[coluna].astype("string").astype("category")
+        elif coluna == "Numero":
+            numeros = pd.to_numeric(df[coluna], errors="coerce")
+            # Números inteiros sem lacunas viram int32; caso contrário ficam como float32
+            if numeros.notna().all() and (numeros % 1 == 0).all():
+                df[coluna] = numeros.astype("int32")
+            else:
+                df[coluna] = numeros.astype("float32")
+        else:
+            df[coluna] = pd.to_numeric(df[coluna], errors="coerce").astype("float32")
+    return df
+
+
+# Conta os problemas de um bloco de linhas, acumulando em "contagens"
+# (planilhas lidas em blocos são validadas bloco a bloco)
+def _contar_problemas(df, contagens):
+    numeros = pd.to_numeric(df["Numero"], errors="coerce")
+    contagens["numero_vazio"] = contagens.get("numero_vazio", 0) + int(numeros.isna().sum())
+    nao_numericos = contagens.setdefault("nao_numericos", {})
+    for coluna in df.columns:
+        if coluna in COLUNAS_FIXAS:
+            continue
+        valores = df[coluna]
+        invalidos = int((valores.notna() & pd.to_numeric(valores, errors="coerce").isna()).sum())
+        if invalidos:
+            nao_numericos[coluna] = nao_numericos.get(coluna, 0) + invalidos
+    return numeros
+
+
+def _colunas_ausentes(colunas):
+    return [f"coluna obrigatória ausente: '{coluna}'" for coluna in COLUNAS_OBRIGATORIAS if coluna not in colunas]
+
+
+# Mensagem para uma coluna "Numero" com valores repetidos (None se não houver)
+def numeros_repetidos(numeros):
+    numeros = pd.Series(numeros)
+    repetidos = numeros[numeros.duplicated()]
+    if repetidos.empty:
+        return None
+    return f"'Numero' repetido: {sorted(repetidos.astype(int).unique().tolist())}"
+
+
+def _mensagens(contagens, numeros):
+    problemas = []
+    if contagens.get("numero_vazio"):
+        problemas.append(f"{contagens['numero_vazio']} linha(s) com 'Numero' vazio ou não numérico")
+    else:
+        repetidos = numeros_repetidos(numeros)
+        if repetidos:
+            problemas.append(repetidos)
+    for coluna, invalidos in contagens.get("nao_numericos", {}).items():
+        problemas.append(f"coluna '{coluna}' tem {invalidos} valor(es) não numérico(s)")
+    return problemas
+
+
+# Função para validar o formato de uma planilha (Numero / Nome / Final score)
+# Devolve a lista de problemas encontrados; lista vazia significa planilha válida
+def validar_planilha(df):
+    colunas = [str(coluna) for coluna in df.columns]
+    problemas = _colunas_ausentes(colunas)
+    if problemas:
+        return problemas
+    contagens = {}
+    numeros = _contar_problemas(df.set_axis(colunas, axis=1), contagens)
+    return _mensagens(contagens, numeros)
+
+
+# Monta uma planilha a partir de blocos de linhas (CSV em pedaços, lotes do Parquet ou do
+# Arrow): cada bloco é validado e convertido para os tipos compactos antes do próximo,
+# de modo que o texto/float64 de um arquivo grande nunca fica inteiro na memória.
+# Devolve a planilha normalizada e a lista de problemas.
+def montar_planilha(blocos):
+    partes = []
+    contagens = {}
+    problemas = None
+    for bloco in blocos:
+        bloco = bloco.set_axis([str(coluna) for coluna in bloco.columns], axis=1)
+        if problemas is None:
+            problemas = _colunas_ausentes(bloco.columns)
+        if not problemas:
+            _contar_problemas(bloco, contagens)
+        if "Nome" in bloco.columns:
+            bloco["Nome"] = bloco["Nome"].astype("string")  # Categorias só no final, com todos os nomes
+        if "Numero" in bloco.columns:
+            bloco["Numero"] = pd.to_numeric(bloco["Numero"], errors="coerce")
+        for coluna in bloco.columns:
+            if coluna not in COLUNAS_FIXAS:
+                bloco[coluna] = pd.to_numeric(bloco[coluna], errors="coerce").astype("float32")
+        partes.append(bloco)
+    df = normalizar_planilha(pd.concat(partes, ignore_index=True)) if partes else pd.DataFrame(columns=COLUNAS_OBRIGATORIAS)
+    if problemas is None:
+        problemas = _colunas_ausentes(df.columns)
+    if not problemas:
+        problemas = _mensagens(contagens, pd.to_numeric(df["Numero"], errors="coerce"))
+    return df, problemas
+
+
+def _blocos_csv(origem):
+    if isinstance(origem, bytes):
+        primeira_linha = origem.split(b"\n", 1)[0].decode("utf-8-sig", errors="replace")
+        origem = io.BytesIO(origem)
+    else:
+        with open(origem, "r", encoding="utf-8-sig", errors="replace") as arquivo:
+            primeira_linha = arquivo.readline()
+    # Exportações em português costumam usar ";" como separador e "," como decimal
+    separador = ";" if primeira_linha.count(";") > primeira_linha.count(",") else ","
+    yield from pd.read_csv(origem, sep=separador, decimal="," if separador == ";" else ".",
+                           encoding="utf-8-sig", chunksize=LINHAS_POR_BLOCO)
+
+
+def _blocos_parquet(origem):
+    import pyarrow.parquet as pq
+
+    fonte = pq.ParquetFile(io.BytesIO(origem) if isinstance(origem, bytes) else origem, memory_map=not isinstance(origem, bytes))
+    for lote in fonte.iter_batches(batch_size=LINHAS_POR_BLOCO):
+        yield lote.to_pandas()
+
+
+def _blocos_arrow(origem):
+    import pyarrow as pa
+
+    # Arquivo em disco: mapeado na memória (as páginas são lidas sob demanda pelo sistema)
+    fonte = pa.BufferReader(origem) if isinstance(origem, bytes) else pa.memory_map(origem, "r")
+    try:
+        leitor = pa.ipc.open_file(fonte)
+        lotes = (leitor.get_batch(i) for i in range(leitor.num_record_batches))
+    except pa.ArrowInvalid:  # Formato de fluxo (stream) em vez de arquivo
+        fonte.seek(0)
+        lotes = pa.ipc.open_stream(fonte)
+    for lote in lotes:
+        yield lote.to_pandas()
+
+
+# Formato de um arquivo pela extensão ("xlsx" quando desconhecida)
+def formato_arquivo(nome_arquivo):
+    return FORMATOS.get(os.path.splitext(str(nome_arquivo or ""))[1].lower(), "xlsx")
+
+
+# Lê um arquivo de notas (Excel, CSV, Parquet ou Arrow IPC, em bytes ou caminho) e devolve
+# as planilhas e os problemas de cada uma. Formatos de tabela única geram uma planilha
+# com o nome do arquivo.
+def ler_arquivo(origem, nome_arquivo=None):
+    rotulo = nome_arquivo or (origem if isinstance(origem, str) else None)
+    formato = formato_arquivo(rotulo)
+    if formato == "xlsx":
+        planilhas = pd.read_excel(io.BytesIO(origem) if isinstance(origem, bytes) else origem, sheet_name=None)
+        return planilhas, {str(nome): validar_planilha(df) for nome, df in planilhas.items()}
+    blocos = {"csv": _blocos_csv, "parquet": _blocos_parquet, "arrow": _blocos_arrow}[formato](origem)
+    df, problemas = montar_planilha(blocos)
+    nome = os.path.splitext(os.path.basename(rotulo))[0] if rotulo else formato
+    return {nome: df}, {nome: problemas}
+
+
+# Separa as planilhas válidas das que têm problemas (estas não vão para o cache)
+def separar_planilhas(planilhas, problemas):
+    validas = {}
+    erros = {}
+    for nome, df in planilhas.items():
+        if problemas[str(nome)]:
+            erros[str(nome)] = problemas[str(nome)]
+        else:
+            validas[nome] = df
+    return validas, erros
+
+
+def _diretorio(hash_arquivo, diretorio_cache=None):
+    return os.path.join(diretorio_cache or DIRETORIO_CACHE, hash_arquivo)
+
+
+def _ler_manifesto(pasta):
+    with open(os.path.join(pasta, ARQUIVO_MANIFESTO), "r", encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+# Marca o arquivo como usado recentemente (base da política LRU)
+def _tocar(pasta):
+    os.utime(os.path.join(pasta, ARQUIVO_MANIFESTO), None)
+
+
+def _tamanho(pasta):
+    total = 0
+    for nome in os.listdir(pasta):
+        total += os.path.getsize(os.path.join(pasta, nome))
+    return total
+
+
+# Função para gravar todas as planilhas já normalizadas no cache; os problemas das
+# planilhas ignoradas ficam no manifesto, para serem mostrados nos próximos envios
+def gravar_planilhas(hash_arquivo, planilhas, diretorio_cache=None, nome_arquivo=None, problemas=None):
+    pasta = _diretorio(hash_arquivo, diretorio_cache)
+    os.makedirs(os.path.dirname(pasta), exist_ok=True)
+    # Grava em uma pasta temporária e só então publica, para que reruns
+    # concorrentes nunca leiam um cache pela metade
+    temporaria = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(pasta))
+    try:
+        nomes = []
+        for indice, (nome, df) in enumerate(planilhas.items()):
+            normalizar_planilha(df).to_parquet(
+                os.path.join(temporaria, f"{indice}.parquet"), index=False
+            )
+            nomes.append(str(nome))
+        with open(os.path.join(temporaria, ARQUIVO_MANIFESTO), "w", encoding="utf-8") as arquivo:
+            json.dump({"planilhas": nomes, "arquivo": nome_arquivo or hash_arquivo[:12], "problemas": problemas or {}},
+                      arquivo, ensure_ascii=False)
+        try:
+            os.replace(temporaria, pasta)
+        except OSError:
+            # Outro processo já publicou o mesmo arquivo
+            if not os.path.isdir(pasta):
+                raise
+            shutil.rmtree(temporaria)
+    except BaseException:
+        shutil.rmtree(temporaria, ignore_errors=True)
+        raise
+    liberar_espaco(manter=hash_arquivo, diretorio_cache=diretorio_cache)
+    return nomes
+
+
+# Função para carregar um arquivo de notas (Excel, CSV, Parquet ou Arrow): lê todas as
+# planilhas uma única vez e devolve o hash do conteúdo, a lista de planilhas válidas
+# disponíveis e os problemas das planilhas ignoradas (como no importar.py)
+def carregar_planilhas(dados, diretorio_cache=None, nome_arquivo=None):
+    hash_arquivo = hash_conteudo(dados)
+    pasta = _diretorio(hash_arquivo, diretorio_cache)
+    if os.path.isfile(os.path.join(pasta, ARQUIVO_MANIFESTO)):
+        _tocar(pasta)
+        manifesto = _ler_manifesto(pasta)
+        return hash_arquivo, manifesto["planilhas"], manifesto.get("problemas", {})
+    validas, erros = separar_planilhas(*ler_arquivo(dados, nome_arquivo))
+    if not validas:
+        return hash_arquivo, [], erros
+    return hash_arquivo, gravar_planilhas(hash_arquivo, validas, diretorio_cache, nome_arquivo, erros), erros
+
+
+# Lista os arquivos já disponíveis no cache (enviados pela interface ou importados
+# pelo importar.py), do usado mais recentemente para o mais antigo
+def arquivos_em_cache(diretorio_cache=None):
+    raiz = diretorio_cache or DIRETORIO_CACHE
+    if not os.path.isdir(raiz):
+        return []
+    arquivos = []
+    for nome in os.listdir(raiz):
+        manifesto = os.path.join(raiz, nome, ARQUIVO_MANIFESTO)
+        if os.path.isfile(manifesto):
+            dados = _ler_manifesto(os.path.join(raiz, nome))
+            arquivos.append((os.path.getmtime(manifesto), {
+                "hash": nome,
+                "arquivo": dados.get("arquivo", nome[:12]),
+                "planilhas": dados["planilhas"],
+                "problemas": dados.get("problemas", {}),
+            }))
+    return [arquivo for _, arquivo in sorted(arquivos, key=lambda item: item[0], reverse=True)]
+
+
+# Função para ler uma planilha do cache colunar
+def ler_planilha(hash_arquivo, nome_planilha, diretorio_cache=None):
+    pasta = _diretorio(hash_arquivo, diretorio_cache)
+    nomes = _ler_manifesto(pasta)["planilhas"]
+    if nome_planilha not in nomes:
+        raise KeyError(f"Planilha '{nome_planilha}' não encontrada no cache.")
+    _tocar(pasta)
+    return pd.read_parquet(os.path.join(pasta, f"{nomes.index(nome_planilha)}.parquet"))
+
+
+# Função para remover os arquivos usados há mais tempo quando o cache
+# ultrapassa o limite total de bytes
+def liberar_espaco(limite_bytes=None, manter=None, diretorio_cache=None):
+    raiz = diretorio_cache or DIRETORIO_CACHE
+    limite = LIMITE_CACHE_BYTES if limite_bytes is None else limite_bytes
+    if not os.path.isdir(raiz):
+        return []
+    entradas = []
+    for nome in os.listdir(raiz):
+        pasta = os.path.join(raiz, nome)
+        manifesto = os.path.join(pasta, ARQUIVO_MANIFESTO)
+        if os.path.isfile(manifesto):
+            entradas.append((os.path.getmtime(manifesto), nome, _tamanho(pasta)))
+    total = sum(tamanho for _, _, tamanho in entradas)
+    removidos = []
+    for _, nome, tamanho in sorted(entradas):
+        if total <= limite:
+            break
+        if nome == manter:
+            continue
+        shutil.rmtree(os.path.join(raiz, nome), ignore_errors=True)
+        total -= tamanho
+        removidos.append(nome)
+    return removidos
@@ -0,0 +1,120 @@
+# Instrumentação do dashboard
+# Mede o tempo de cada etapa de um rerun (leitura das planilhas, agregação, construção
+# dos gráficos e serialização no st.plotly_chart), o tamanho do JSON enviado por gráfico
+# e o pico de memória do rerun. Os relatórios ficam num histórico limitado por processo
+# e podem ser exportados em JSON para comparar versões.
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+VERSAO = os.environ.get("HUMANITAS_VERSAO", "dev")
+
+# Reruns medidos em andamento no processo: o tracemalloc (que deixa as alocações mais
+# lentas) fica ligado só enquanto houver algum, e só é desligado se foi ligado aqui
+_medicoes_ativas = 0
+_trava_medicoes = threading.Lock()
+_tracemalloc_proprio = False
+
+
+def _iniciar_memoria():
+    global _medicoes_ativas, _tracemalloc_proprio
+    with _trava_medicoes:
+        _medicoes_ativas += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_proprio = True
+        tracemalloc.reset_peak()
+
+
+def _encerrar_memoria():
+    global _medicoes_ativas, _tracemalloc_proprio
+    with _trava_medicoes:
+        _medicoes_ativas -= 1
+        if _medicoes_ativas == 0 and _tracemalloc_proprio:
+            tracemalloc.stop()
+            _tracemalloc_proprio = False
+
+
+class Instrumentacao:
+    def __init__(self, ativo=False, rotulo=""):
+        self.ativo = ativo
+        self.rotulo = rotulo
+        self.etapas = []
+        self.graficos = []
+        self.pico_memoria = None
+        self._inicio = time.perf_counter()
+        self._memoria = None
+        if ativo:
+            # O tracemalloc é global ao processo: com várias sessões simultâneas o pico
+            # inclui o que as outras alocarem durante este rerun. Um rerun interrompido
+            # (st.rerun, exceção) libera a medição quando o objeto é descartado.
+            _iniciar_memoria()
+            self._memoria = weakref.finalize(self, _encerrar_memoria)
+
+    @contextmanager
+    def medir(self, nome, categoria):
+        if not self.ativo:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas.append({
+                "nome": nome,
+                "categoria": categoria,
+                "ms": (time.perf_counter() - inicio) * 1000,
+            })
+
+    # Tamanho do JSON de um gráfico Plotly (o que o navegador recebe)
+    def registrar_grafico(self, nome, figura):
+        if self.ativo:
+            self.graficos.append({"nome": nome, "bytes": len(figura.to_json())})
+
+    def finalizar(self):
+        self.total_ms = (time.perf_counter() - self._inicio) * 1000
+        if self._memoria is not None and self._memoria.alive:
+            self.pico_memoria = tracemalloc.get_traced_memory()[1]
+            self._memoria()
+        return self.relatorio()
+
+    def relatorio(self):
+        por_categoria = {}
+        for etapa in self.etapas:
+            por_categoria[etapa["categoria"]] = por_categoria.get(etapa["categoria"], 0.0) + etapa["ms"]
+        return {
+            "versao": VERSAO,
+            "momento": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "rotulo": self.rotulo,
+            "total_ms": getattr(self, "total_ms", None),
+            "por_categoria_ms": por_categoria,
+            # Cópias: reruns de fragmentos continuam medindo no objeto do último rerun completo
+            "etapas": list(self.etapas),
+            "graficos": list(self.graficos),
+            "bytes_graficos": sum(grafico["bytes"] for grafico in self.graficos),
+            "pico_memoria_bytes": self.pico_memoria,
+        }
+
+
+# Últimos relatórios do processo (memória limitada)
+class HistoricoMedicoes:
+    def __init__(self, limite=200):
+        self._relatorios = deque(maxlen=limite)
+        self._trava = threading.Lock()
+
+    def adicionar(self, relatorio):
+        with self._trava:
+            self._relatorios.append(relatorio)
+
+    def relatorios(self):
+        with self._trava:
+            return list(self._relatorios)
+
+    def exportar_json(self):
+        return json.dumps({"versao": VERSAO, "relatorios": self.relatorios()}, ensure_ascii=False, indent=2)
@@ -0,0 +1,159 @@
+# Relatórios individuais em lote
+# Gera, para todos os estudantes de uma planilha, a ficha mostrada na aba "Busca de
+# Estudante" (tabela de notas, posição na curva normal e gráfico hexagonal) em arquivos
+# estáticos, para as reuniões de pais. As estatísticas da turma são calculadas uma única
+# vez e enviadas a cada processo na inicialização; cada tarefa gera um lote de estudantes.
+#
+# HTML não depende de nada além do plotly (o plotly.min.js é gravado uma vez na pasta de
+# saída). PNG e PDF usam o pacote opcional "kaleido" (pip install kaleido) e geram um
+# arquivo por gráfico.
+#
+# Uso: python relatorios.py ARQUIVO.xlsx [--planilha NOME] [--saida DIR] [--bimestre "1º Bimestre"]
+#                           [--formatos html png pdf] [--processos N] [--lote 50]
+import argparse
+import html
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from analise import calcular_percentis, perfil_estudante
+from busca import normalizar_nome
+from estatisticas import IndiceEstatisticas
+from graficos import figura_normal_estudante, figura_radar_estudante
+from ingestao import normalizar_planilha, validar_planilha
+
+FORMATOS = ["html", "png", "pdf"]
+MODELO_HTML = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{titulo}</title>
+<script src="plotly.min.js"></script>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 1em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+th:first-child, td:first-child {{ text-align: left; }}
+</style>
+</head>
+<body>
+<h1>{titulo}</h1>
+<p>Percentil na turma (% de estudantes com nota menor ou igual) e posição no ranking da disciplina.</p>
+{tabela}
+{graficos}
+</body>
+</html>
+"""
+
+# Estatísticas da turma, recebidas uma vez por processo
+_turma = {}
+
+
+def _iniciar_processo(turma):
+    _turma.update(turma)
+
+
+def nome_arquivo(numero, nome):
+    return f"{int(numero):05d}-{normalizar_nome(nome).replace(' ', '_')}"
+
+
+def tabela_perfil(perfil):
+    return pd.DataFrame(
+        [perfil["notas"], perfil["percentis"], perfil["posicoes"], perfil["diferencas"]],
+        index=["Nota", "Percentil", "Posição", "Diferença da Média"],
+        columns=perfil["disciplinas"],
+    ).round(1)
+
+
+# Executado em cada processo: gera os relatórios das linhas informadas
+def gerar_lote(linhas):
+    turma = _turma
+    gerados = 0
+    for linha in linhas:
+        nome = str(turma["nomes"][linha])
+        perfil = perfil_estudante(turma["matriz"], linha, turma["disciplinas"], turma["medias"], turma["percentis"])
+        if not perfil["disciplinas"]:
+            continue  # Estudante sem nenhuma nota
+        figuras = {
+            "normal": figura_normal_estudante(perfil["disciplinas"], perfil["notas"], turma["bimestre"]),
+            "radar": figura_radar_estudante(perfil["disciplinas"], perfil["notas"], nome),
+        }
+        base = os.path.join(turma["saida"], nome_arquivo(turma["numeros"][linha], nome))
+        if "html" in turma["formatos"]:
+            titulo = html.escape(f"{nome} - {turma['turma']} - {turma['bimestre']}")
+            graficos = "\n".join(figura.to_html(full_html=False, include_plotlyjs=False) for figura in figuras.values())
+            with open(f"{base}.html", "w", encoding="utf-8") as arquivo:
+                arquivo.write(MODELO_HTML.format(titulo=titulo, tabela=tabela_perfil(perfil).to_html(), graficos=graficos))
+        for formato in ("png", "pdf"):
+            if formato in turma["formatos"]:
+                for rotulo, figura in figuras.items():
+                    figura.write_image(f"{base}-{rotulo}.{formato}")
+        gerados += 1
+    return gerados
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Gera os relatórios individuais de todos os estudantes de uma planilha.")
+    parser.add_argument("arquivo", help="Arquivo .xlsx com as notas")
+    parser.add_argument("--planilha", help="Planilha (turma) a usar (padrão: a primeira)")
+    parser.add_argument("--saida", default="relatorios", help="Diretório de saída")
+    parser.add_argument("--bimestre", default="", help="Bimestre mostrado nos títulos")
+    parser.add_argument("--formatos", nargs="+", choices=FORMATOS, default=["html"])
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="Número de processos (padrão: um por núcleo)")
+    parser.add_argument("--lote", type=int, default=50, help="Estudantes por tarefa")
+    args = parser.parse_args(argumentos)
+
+    if {"png", "pdf"} & set(args.formatos) and importlib.util.find_spec("kaleido") is None:
+        print("PNG e PDF precisam do pacote 'kaleido' (pip install kaleido).")
+        return 1
+
+    planilhas = pd.ExcelFile(args.arquivo).sheet_names
+    planilha = args.planilha if args.planilha is not None else planilhas[0]
+    if planilha not in planilhas:
+        print(f"Planilha '{planilha}' não encontrada. Disponíveis: {', '.join(planilhas)}")
+        return 1
+    df = pd.read_excel(args.arquivo, sheet_name=planilha)
+    problemas = validar_planilha(df)
+    if problemas:
+        for problema in problemas:
+            print(f"[inválida] {planilha}: {problema}")
+        return 1
+
+    inicio = time.perf_counter()
+    indice = IndiceEstatisticas(normalizar_planilha(df))
+    os.makedirs(args.saida, exist_ok=True)
+    if "html" in args.formatos:
+        with open(os.path.join(args.saida, "plotly.min.js"), "w", encoding="utf-8") as arquivo:
+            arquivo.write(get_plotlyjs())
+
+    matriz = indice.matriz
+    turma = {
+        "turma": planilha,
+        "bimestre": args.bimestre,
+        "saida": args.saida,
+        "formatos": args.formatos,
+        "disciplinas": indice.disciplinas,
+        "numeros": indice.numeros,
+        "nomes": indice.nomes,
+        "matriz": matriz,
+        "medias": indice.medias,
+        "percentis": calcular_percentis(matriz),
+    }
+    lotes = np.array_split(np.arange(len(indice.numeros)), max(1, -(-len(indice.numeros) // args.lote)))
+    gerados = 0
+    with ProcessPoolExecutor(max_workers=args.processos, initializer=_iniciar_processo, initargs=(turma,)) as executor:
+        for futuro in as_completed([executor.submit(gerar_lote, lote) for lote in lotes]):
+            gerados += futuro.result()
+            print(f"\r{gerados}/{len(indice.numeros)} relatório(s)", end="", flush=True)
+    print(f"\n{gerados} relatório(s) gerado(s) em '{args.saida}' em {time.perf_counter() - inicio:.1f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
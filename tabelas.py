@@ -0,0 +1,40 @@
+# Paginação das tabelas e resumo do gráfico de ranking
+# Ordenação, filtro e recorte da página são feitos no servidor sobre as permutações
+# do índice de estatísticas, e só a página visível é enviada ao navegador.
+import math
+
+import numpy as np
+
+TAMANHOS_PAGINA = [25, 50, 100, 250]
+
+
+def total_paginas(total, tamanho):
+    return max(1, math.ceil(total / tamanho))
+
+
+# Recorta a página pedida (a partir de 1) de uma permutação de linhas
+def fatia_pagina(ordem, pagina, tamanho):
+    pagina = min(max(int(pagina), 1), total_paginas(len(ordem), tamanho))
+    inicio = (pagina - 1) * tamanho
+    return ordem[inicio:inicio + tamanho], inicio
+
+
+# Aplica um filtro (máscara booleana por linha) a uma permutação, preservando a ordem
+def filtrar_ordem(ordem, mascara=None):
+    if mascara is None:
+        return ordem
+    return ordem[mascara[ordem]]
+
+
+# Dados do gráfico de ranking: os "n" primeiros, os "n" últimos e uma barra "Outros"
+# com a média dos demais, para que o tamanho do gráfico não dependa da turma
+def resumo_ranking(nomes, notas, n):
+    nomes = np.asarray(nomes, dtype=object)
+    notas = np.asarray(notas, dtype=np.float64)
+    if len(notas) <= 2 * n:
+        return list(nomes), list(notas), ["green"] * len(notas)
+    meio = notas[n:len(notas) - n]
+    rotulos = list(nomes[:n]) + [f"Outros ({len(meio)} estudantes)"] + list(nomes[-n:])
+    valores = list(notas[:n]) + [float(np.nanmean(meio)) if np.isfinite(meio).any() else np.nan] + list(notas[-n:])
+    cores = ["green"] * n + ["gray"] + ["firebrick"] * n
+    return rotulos, valores, cores
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from analise import METRICAS, atualizar_momentos, distancias, mais_semelhantes, matriz_distancias, parametros_normais
+
+
+def _alterar(matriz, gerador):
+    nova = matriz.copy()
+    celulas = gerador.random(matriz.shape) < 0.2
+    nova[celulas] = np.round(gerador.uniform(0, 10, celulas.sum()), 1)
+    nova[gerador.random(matriz.shape) < 0.05] = np.nan  # Notas apagadas
+    return nova
+
+
+# Retirar as notas antigas e incluir as novas dá os mesmos momentos do cálculo completo
+def test_atualizar_momentos_igual_ao_calculo_completo():
+    gerador = np.random.default_rng(7)
+    matriz = np.round(gerador.uniform(0, 10, (300, 5)), 1)
+    matriz[gerador.random(matriz.shape) < 0.1] = np.nan
+    matriz[:, 3] = np.nan  # Disciplina que passa a ter notas
+    nova = _alterar(matriz, gerador)
+    nova[:, 4] = np.nan  # Disciplina que fica sem notas
+
+    antes = parametros_normais(matriz)
+    alteradas = ~((matriz == nova) | (np.isnan(matriz) & np.isnan(nova)))
+    contagens, medias, m2 = atualizar_momentos(
+        antes["contagens"], antes["medias"], antes["m2"],
+        np.where(alteradas, matriz, np.nan), np.where(alteradas, nova, np.nan),
+    )
+
+    esperado = parametros_normais(nova)
+    np.testing.assert_array_equal(contagens, esperado["contagens"])
+    np.testing.assert_allclose(medias, esperado["medias"], rtol=1e-12)
+    np.testing.assert_allclose(m2[:4], esperado["m2"][:4], rtol=1e-9)
+    assert m2[4] == 0.0
+
+
+def test_atualizar_momentos_sem_alteracoes():
+    matriz = np.array([[1.0, np.nan], [3.0, 4.0], [8.0, 6.0]])
+    antes = parametros_normais(matriz)
+    vazio = np.full((0, 2), np.nan)
+    contagens, medias, m2 = atualizar_momentos(antes["contagens"], antes["medias"], antes["m2"], vazio, vazio)
+    np.testing.assert_array_equal(contagens, [3, 2])
+    np.testing.assert_allclose(medias, antes["medias"])
+    np.testing.assert_allclose(m2, antes["m2"])
+
+
+# Distância de referência, par a par, só nas disciplinas em que os dois têm nota
+def distancia_referencia(x, y, metrica):
+    comum = ~np.isnan(x) & ~np.isnan(y)
+    if not comum.any():
+        return np.nan
+    x, y, total = x[comum], y[comum], len(comum)
+    if metrica == "euclidiana":
+        return np.sqrt(total / comum.sum() * np.sum((x - y) ** 2))
+    if metrica == "cosseno":
+        normas = np.linalg.norm(x) * np.linalg.norm(y)
+        return 1 - x @ y / normas if normas else np.nan
+    if x.size < 2 or np.std(x) < 1e-9 or np.std(y) < 1e-9:
+        return np.nan
+    return 1 - np.corrcoef(x, y)[0, 1]
+
+
+def notas_com_lacunas():
+    gerador = np.random.default_rng(11)
+    notas = np.round(gerador.uniform(0, 10, (40, 6)), 1)
+    notas[gerador.random(notas.shape) < 0.25] = np.nan
+    notas[0] = np.nan            # Estudante sem notas
+    notas[1, :] = np.nan
+    notas[1, 0] = 5.0            # Uma única nota (correlação indefinida)
+    notas[2] = notas[3] + 1.0    # Mesma variação de outro estudante
+    return notas
+
+
+@pytest.mark.parametrize("metrica", METRICAS)
+def test_matriz_distancias_igual_a_referencia(metrica):
+    notas = notas_com_lacunas()
+    esperado = np.array([[distancia_referencia(x, y, metrica) for y in notas] for x in notas])
+    np.fill_diagonal(esperado, np.where(np.isnan(np.diag(esperado)), np.nan, 0.0))
+    np.testing.assert_allclose(matriz_distancias(notas, metrica), esperado, rtol=1e-4, atol=1e-4)
+    assert matriz_distancias(notas, metrica).dtype == np.float32
+
+
+@pytest.mark.parametrize("metrica", METRICAS)
+def test_mais_semelhantes_com_e_sem_matriz(metrica):
+    notas = notas_com_lacunas()
+    linha = 5
+    esperado = np.array([distancia_referencia(notas[linha], y, metrica) for y in notas])
+    esperado[linha] = np.nan
+    ordem = [j for j in np.argsort(np.where(np.isnan(esperado), np.inf, esperado), kind="stable") if not np.isnan(esperado[j])]
+
+    linhas, valores = mais_semelhantes(notas, linha, 4, metrica)
+    np.testing.assert_allclose(valores, esperado[ordem[:4]], rtol=1e-9, atol=1e-9)
+    assert linha not in linhas and 0 not in linhas
+    linhas_matriz, valores_matriz = mais_semelhantes(notas, linha, 4, metrica, matriz_distancias(notas, metrica))
+    np.testing.assert_allclose(valores_matriz, valores, rtol=1e-5, atol=1e-6)
+    # Estudante sem nenhuma nota: ninguém é comparável
+    assert mais_semelhantes(notas, 0, 4, metrica)[0].size == 0
+
+
+def test_distancias_metrica_desconhecida():
+    with pytest.raises(ValueError):
+        distancias(np.zeros((2, 2)), metrica="manhattan")
@@ -0,0 +1,110 @@
+import http.client
+import json
+import threading
+from urllib.parse import quote
+
+import pandas as pd
+import pytest
+
+from api import APIHumanitas, criar_servidor, etag_corresponde
+from cache_compartilhado import CacheCompartilhado, cache_do_processo
+from dados import DadosTurma
+from estatisticas import IndiceEstatisticas
+from ingestao import gravar_planilhas
+
+HASH = "ab" * 32
+PLANILHA = "1A"
+
+
+@pytest.fixture(scope="module")
+def servidor(tmp_path_factory):
+    pasta = str(tmp_path_factory.mktemp("cache"))
+    gravar_planilhas(HASH, {PLANILHA: pd.DataFrame({
+        "Numero": [1, 2, 3],
+        "Nome": ["Ana", "Bruno", "Carla"],
+        "Matemática": [7.0, None, 9.5],
+        "Final score": [7.5, 5.0, 9.0],
+    })}, pasta)
+    servidor = criar_servidor(porta=0, api=APIHumanitas(pasta, CacheCompartilhado()))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def requisitar(servidor, caminho, metodo="GET", cabecalhos=None):
+    conexao = http.client.HTTPConnection("127.0.0.1", servidor.server_address[1])
+    try:
+        conexao.request(metodo, caminho, headers=cabecalhos or {})
+        resposta = conexao.getresponse()
+        return resposta.status, dict(resposta.getheaders()), resposta.read()
+    finally:
+        conexao.close()
+
+
+def test_ranking_e_revalidacao_com_etag(servidor):
+    caminho = f"/turmas/{HASH}/{PLANILHA}/ranking"
+    status, cabecalhos, corpo = requisitar(servidor, caminho)
+    assert status == 200
+    ranking = json.loads(corpo)
+    assert ranking["coluna"] == "Final score"
+    assert [estudante["nome"] for estudante in ranking["estudantes"]] == ["Carla", "Ana", "Bruno"]
+    etag = cabecalhos["ETag"]
+
+    status, cabecalhos, corpo = requisitar(servidor, caminho, cabecalhos={"If-None-Match": etag})
+    assert (status, corpo, cabecalhos["ETag"]) == (304, b"", etag)
+    status, _, corpo = requisitar(servidor, caminho, cabecalhos={"If-None-Match": '"outro"'})
+    assert status == 200 and json.loads(corpo) == ranking
+    # HEAD: mesmos cabeçalhos, sem corpo
+    status, cabecalhos, corpo = requisitar(servidor, caminho, "HEAD")
+    assert (status, corpo, cabecalhos["ETag"]) == (200, b"", etag)
+
+
+def test_consultas_da_turma(servidor):
+    base = f"/turmas/{HASH}/{quote(PLANILHA)}"
+    _, _, corpo = requisitar(servidor, f"{base}/ranking?coluna=Matem%C3%A1tica&situacao=aprovados")
+    assert [(e["nome"], e["nota"]) for e in json.loads(corpo)["estudantes"]] == [("Carla", 9.5), ("Ana", 7.0)]
+    _, _, corpo = requisitar(servidor, f"{base}/estudantes/2")
+    estudante = json.loads(corpo)
+    assert (estudante["nome"], estudante["final"]) == ("Bruno", 5.0)
+    _, _, corpo = requisitar(servidor, "/turmas")
+    assert [(t["hash"], t["planilhas"]) for t in json.loads(corpo)["turmas"]] == [(HASH, [PLANILHA])]
+
+
+@pytest.mark.parametrize("caminho, status", [
+    ("/turmas/../../etc/1A/medias", 404),          # Hash inválido não vira caminho no disco
+    (f"/turmas/{'AB' * 32}/1A/medias", 404),       # Só hexadecimal minúsculo
+    (f"/turmas/{'cd' * 32}/1A/medias", 404),       # Arquivo inexistente
+    (f"/turmas/{HASH}/2B/medias", 404),            # Planilha inexistente
+    (f"/turmas/{HASH}/1A/estudantes/99", 404),
+    (f"/turmas/{HASH}/1A/estudantes/abc", 400),
+    (f"/turmas/{HASH}/1A/ranking?limite=0", 400),
+    (f"/turmas/{HASH}/1A/ranking?coluna=Inexistente", 404),
+    (f"/turmas/{HASH}/1A/medias?situacao=todos", 400),
+    ("/outra", 404),
+])
+def test_erros(servidor, caminho, status):
+    recebido, cabecalhos, corpo = requisitar(servidor, caminho)
+    assert recebido == status
+    assert "erro" in json.loads(corpo) and "ETag" not in cabecalhos
+
+
+@pytest.mark.parametrize("if_none_match, esperado", [
+    (None, False), ('"a"', True), ('W/"a"', True), ('"b", "a"', True), ("*", True), ('"b"', False),
+])
+def test_etag_corresponde(if_none_match, esperado):
+    assert etag_corresponde(if_none_match, '"a"') is esperado
+
+
+# No mesmo processo, a API usa o índice que o dashboard já guardou (mesma chave), sem ler
+# a planilha do disco (a pasta do teste está vazia)
+def test_api_usa_o_cache_do_processo(tmp_path):
+    indice = IndiceEstatisticas(DadosTurma(pd.DataFrame({
+        "Numero": [1, 2], "Nome": ["Ana", "Bruno"], "Final score": [7.5, 5.0],
+    })))
+    hash_arquivo = "cd" * 32
+    cache_do_processo().obter((hash_arquivo, PLANILHA, "indice"), lambda: indice)
+    api = APIHumanitas(str(tmp_path))
+    assert api.cache is cache_do_processo()
+    assert api.indice(hash_arquivo, PLANILHA) is indice
+    assert api.responder(f"/turmas/{hash_arquivo}/{PLANILHA}", {})[0]
@@ -0,0 +1,65 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from coortes import APROVADOS, REPROVADOS, IndiceCoortes, abaixo_da_aprovacao, descrever
+from dados import DadosTurma
+from estatisticas import IndiceEstatisticas
+from ingestao import normalizar_planilha
+
+
+def turma(estudantes=37):
+    gerador = np.random.default_rng(5)
+    notas = np.round(gerador.uniform(0, 10, (estudantes, 3)), 1)
+    notas[gerador.random(notas.shape) < 0.15] = np.nan
+    return normalizar_planilha(pd.DataFrame({
+        "Numero": np.arange(1, estudantes + 1), "Nome": [f"Aluno {i}" for i in range(estudantes)],
+        "Matemática": notas[:, 0], "História": notas[:, 1], "Final score": notas[:, 2],
+    }))
+
+
+# Interseção dos mapas de bits = filtro booleano equivalente (notas em branco nunca entram);
+# 37 estudantes: o último byte dos mapas fica incompleto
+def test_mascara_igual_ao_filtro_booleano():
+    df = turma()
+    coortes = IndiceCoortes(DadosTurma(df))
+    maior_que_8 = coortes.condicao("Matemática", ">", 8)
+    assert coortes.condicao("Matemática", ">", 8.0) == maior_que_8  # Calculada uma vez
+    matematica, final = df["Matemática"].to_numpy(np.float64), df["Final score"].to_numpy(np.float64)
+
+    np.testing.assert_array_equal(coortes.mascara(APROVADOS), final >= 6)
+    np.testing.assert_array_equal(coortes.mascara(REPROVADOS), final < 6)
+    np.testing.assert_array_equal(coortes.mascara(APROVADOS, maior_que_8), (final >= 6) & (matematica > 8))
+    np.testing.assert_array_equal(coortes.mascara(abaixo_da_aprovacao("História")),
+                                  df["História"].to_numpy(np.float64) < 6)
+    assert coortes.mascara().all() and coortes.mascara().size == len(df)
+    assert coortes.contar(REPROVADOS, maior_que_8) == int(np.sum((final < 6) & (matematica > 8)))
+
+
+def test_coortes_em_outro_processo():
+    coortes = IndiceCoortes(DadosTurma(turma()))
+    chave = coortes.condicao("História", "<=", 4.5)
+    copia = pickle.loads(pickle.dumps(coortes))
+    np.testing.assert_array_equal(copia.mascara(chave), coortes.mascara(chave))
+    nova = copia.condicao("Matemática", "<", 2)  # A trava é recriada na cópia
+    np.testing.assert_array_equal(copia.mascara(nova), coortes.mascara(coortes.condicao("Matemática", "<", 2)))
+
+
+def test_indice_da_coorte():
+    df = turma()
+    indice = IndiceEstatisticas(df)
+    chave = indice.coortes.condicao("Matemática", ">=", 5)
+    sub = indice.coorte(APROVADOS, chave)
+    linhas = np.flatnonzero(indice.coortes.mascara(APROVADOS, chave))
+    np.testing.assert_array_equal(sub.linhas, linhas)
+    np.testing.assert_array_equal(sub.numeros, indice.numeros[linhas])
+    esperado = IndiceEstatisticas(df.iloc[linhas].reset_index(drop=True))
+    np.testing.assert_allclose(sub.medias, esperado.medias)
+    assert sub.assinaturas == esperado.assinaturas
+
+
+def test_descrever():
+    assert descrever(APROVADOS, 6.0) == "Aprovados (Final score >= 6)"
+    assert descrever(abaixo_da_aprovacao("História"), 5.0) == "História < 5"
+    assert descrever(("Matemática", ">", 8.0)) == "Matemática > 8"
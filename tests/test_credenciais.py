@@ -0,0 +1,120 @@
+import json
+import os
+
+import pytest
+
+import credenciais
+from credenciais import LimitadorTentativas, VerificadorCredenciais, conferir_hash, hash_senha
+
+N_TESTE = 2 ** 10  # scrypt mais leve nos testes; o custo fica gravado no próprio hash
+
+
+def test_hash_senha_confere_so_a_senha_correta():
+    armazenado = hash_senha("segredo", n=N_TESTE)
+    algoritmo, n, r, p, _, _ = armazenado.split("$")
+    assert (algoritmo, int(n), int(r), int(p)) == ("scrypt", N_TESTE, credenciais.SCRYPT_R, credenciais.SCRYPT_P)
+    assert conferir_hash("segredo", armazenado)
+    assert not conferir_hash("Segredo", armazenado)
+    # Salt individual: a mesma senha gera hashes diferentes
+    assert hash_senha("segredo", n=N_TESTE) != armazenado
+
+
+@pytest.mark.parametrize("armazenado", ["", "texto puro", "bcrypt$1$2$3$c2FsdA==$aGFzaA==", "scrypt$x$8$1$c2FsdA==$aGFzaA=="])
+def test_conferir_hash_invalido(armazenado):
+    assert not conferir_hash("segredo", armazenado)
+
+
+def test_verificador_rele_o_arquivo_quando_muda(tmp_path):
+    caminho = str(tmp_path / "credenciais.json")
+    credenciais.gravar_arquivo({"usuarios": [
+        {"usuario": "ana", "hash": hash_senha("s1", n=N_TESTE), "admin": True},
+        {"usuario": "bruno", "senha": "antiga"},  # Arquivo ainda não migrado
+    ]}, caminho)
+    verificador = VerificadorCredenciais(caminho)
+    assert verificador.verificar("ana", "s1")
+    assert not verificador.verificar("ana", "s2")
+    assert verificador.verificar("bruno", "antiga")
+    assert not verificador.verificar("carla", "s1")
+    assert verificador.usuario("ana")["admin"]
+
+    credenciais.gravar_arquivo({"usuarios": [{"usuario": "ana", "hash": hash_senha("s2", n=N_TESTE)}]}, caminho)
+    os.utime(caminho, (0, 1))
+    assert verificador.verificar("ana", "s2")
+    assert verificador.usuario("bruno") is None
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_limitador_bloqueia_e_devolve_fichas(monkeypatch):
+    relogio = Relogio()
+    monkeypatch.setattr(credenciais.time, "monotonic", relogio)
+    limitador = LimitadorTentativas(capacidade=3, fichas_por_segundo=1 / 60)
+    for _ in range(3):
+        assert limitador.espera("usuario:ana") == 0
+        limitador.registrar_falha("usuario:ana")
+    assert limitador.espera("usuario:ana") == pytest.approx(60)
+    assert limitador.espera("usuario:bruno") == 0  # Outras chaves não são afetadas
+    relogio.agora += 30
+    assert limitador.espera("usuario:ana") == pytest.approx(30)
+    relogio.agora += 30
+    assert limitador.espera("usuario:ana") == 0
+    # As fichas voltam até a capacidade, não além
+    relogio.agora += 3600
+    for _ in range(3):
+        limitador.registrar_falha("usuario:ana")
+    assert limitador.espera("usuario:ana") > 0
+
+
+# Chaves do login: o usuário em cada IP e o IP. Falhas de outro endereço não bloqueiam
+# o usuário, e um login correto devolve as fichas da chave dele
+def test_limitador_por_usuario_e_ip_com_sucesso(monkeypatch):
+    monkeypatch.setattr(credenciais.time, "monotonic", Relogio())
+    limitador = LimitadorTentativas(capacidade=2)
+    atacante = ["usuario:ana@10.0.0.9", "ip:10.0.0.9"]
+    for _ in range(2):
+        limitador.registrar_falha(*atacante)
+    assert limitador.espera(*atacante) > 0
+    assert limitador.espera("usuario:ana@10.0.0.1", "ip:10.0.0.1") == 0
+
+    legitimo = ["usuario:ana@10.0.0.1", "ip:10.0.0.1"]
+    limitador.registrar_falha(*legitimo)
+    limitador.registrar_sucesso("usuario:ana@10.0.0.1")
+    limitador.registrar_falha(*legitimo)
+    assert limitador.espera("usuario:ana@10.0.0.1") == 0
+    assert limitador.espera("ip:10.0.0.1") > 0  # O IP continua contando as falhas
+
+
+def test_limitador_memoria_limitada():
+    limitador = LimitadorTentativas(max_chaves=3)
+    for i in range(5):
+        limitador.registrar_falha(f"ip:{i}")
+    assert len(limitador) == 3
+
+
+def test_cli_adicionar_grava_apenas_o_hash(tmp_path, monkeypatch):
+    caminho = str(tmp_path / "credenciais.json")
+    monkeypatch.setattr(credenciais.getpass, "getpass", lambda prompt="": "nova senha")
+    assert credenciais.main(["--arquivo", caminho, "adicionar", "ana", "--admin"]) == 0
+    with open(caminho, encoding="utf-8") as arquivo:
+        (registro,) = json.load(arquivo)["usuarios"]
+    assert "senha" not in registro and registro["admin"] is True
+    assert "nova senha" not in registro["hash"]
+    assert VerificadorCredenciais(caminho).verificar("ana", "nova senha")
+
+
+# Sem --admin/--no-admin, trocar a senha mantém o acesso que o usuário já tinha
+@pytest.mark.parametrize("opcao, admin", [([], True), (["--admin"], True), (["--no-admin"], None)])
+def test_cli_adicionar_opcao_admin(tmp_path, monkeypatch, opcao, admin):
+    caminho = str(tmp_path / "credenciais.json")
+    monkeypatch.setattr(credenciais.getpass, "getpass", lambda prompt="": "senha")
+    credenciais.gravar_arquivo({"usuarios": [{"usuario": "ana", "senha": "antiga", "admin": True}]}, caminho)
+    assert credenciais.main(["--arquivo", caminho, "adicionar", "ana", *opcao]) == 0
+    assert credenciais.main(["--arquivo", caminho, "adicionar", "bruno"]) == 0
+    ana, bruno = credenciais.ler_arquivo(caminho)["usuarios"]
+    assert ana.get("admin") == admin and "admin" not in bruno
@@ -0,0 +1,63 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dados import DadosTurma, codificar_notas, decodificar_notas
+from ingestao import normalizar_planilha
+
+
+def planilha(notas):
+    notas = np.asarray(notas, dtype=np.float64)
+    colunas = {f"Disciplina {j}": notas[:, j] for j in range(notas.shape[1])}
+    return normalizar_planilha(pd.DataFrame({
+        "Numero": np.arange(1, len(notas) + 1), "Nome": ["Ana", "Bia", "Ana", ""][:len(notas)], **colunas,
+    }))
+
+
+# Menor tipo sem perda: uma casa decimal -> uint8, duas -> uint16; o resto fica em float32
+@pytest.mark.parametrize("notas, tipo, escala", [
+    ([[0, 10], [7.3, np.nan], [np.nan, 5.5]], np.uint8, 10),
+    ([[0, 25.4], [7.35, np.nan], [9.99, 0.01]], np.uint16, 100),
+    ([[10.123, 1], [np.nan, 2]], np.float32, None),
+    ([[-1, 1], [np.nan, 2]], np.float32, None),
+    ([[700, 1], [np.nan, 2]], np.float32, None),
+])
+def test_codificacao_sem_perda(notas, tipo, escala):
+    notas = np.asarray(notas, dtype=np.float32)
+    codificadas, escala_usada = codificar_notas(notas)
+    assert codificadas.dtype == tipo and escala_usada == escala
+    # Em branco continua em branco; as demais voltam iguais às notas em float32
+    np.testing.assert_array_equal(decodificar_notas(codificadas, escala_usada, np.float32), notas)
+    np.testing.assert_allclose(decodificar_notas(codificadas, escala_usada), notas, rtol=1e-6)
+
+
+def test_dados_iguais_a_planilha():
+    df = planilha([[7.3, np.nan], [np.nan, 5.5], [10, 0], [4.1, 9.9]])
+    dados = DadosTurma(df)
+    assert dados.codificadas.dtype == np.uint8 and len(dados) == 4
+    assert dados.disciplinas == ("Disciplina 0", "Disciplina 1")
+    assert dados.nomes[0] is dados.nomes[2] and dados.nomes[3] == ""
+    esperado = df[list(dados.disciplinas)].to_numpy(np.float64)
+    np.testing.assert_allclose(dados.matriz(), esperado, rtol=1e-6)
+    np.testing.assert_allclose(dados.matriz(linhas=[3, 1]), esperado[[3, 1]], rtol=1e-6)
+    np.testing.assert_allclose(dados.notas("Disciplina 1"), esperado[:, 1], rtol=1e-6)
+    pd.testing.assert_frame_equal(dados.tabela([2, 0])[list(dados.disciplinas)],
+                                  df.iloc[[2, 0]][list(dados.disciplinas)].astype(np.float32))
+
+    sub = dados.subconjunto([1, 3])
+    np.testing.assert_array_equal(sub.numeros, [2, 4])
+    np.testing.assert_allclose(sub.matriz(), esperado[[1, 3]], rtol=1e-6)
+
+
+def test_dados_somente_leitura():
+    dados = DadosTurma(planilha([[7.3, 1], [np.nan, 2]]))
+    copia = pickle.loads(pickle.dumps(dados))
+    for objeto in (dados, copia, dados.subconjunto([1])):
+        for array in (objeto.numeros, objeto.nomes, objeto.codificadas, objeto.matriz(), objeto.notas("Disciplina 0")):
+            with pytest.raises(ValueError):
+                array[0] = array[-1]
+    # Cada chamada decodifica de novo: nada de matriz decodificada guardada
+    assert dados.matriz() is not dados.matriz()
+    np.testing.assert_array_equal(copia.matriz(), dados.matriz())
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from estatisticas import IndiceEstatisticas
+from ingestao import normalizar_planilha
+
+
+def planilha_com_colunas_iguais():
+    notas = [7.5, 6.0, 8.2, 5.1]
+    return normalizar_planilha(pd.DataFrame({
+        "Numero": [1, 2, 3, 4],
+        "Nome": ["Ana", "Bruno", "Carla", "Daniel"],
+        "Matemática": [np.nan] * 4,
+        "História": [np.nan] * 4,
+        "Total4 Final": notas,
+        "Final score": notas,
+    }))
+
+
+# Disciplinas com as mesmas notas não podem compartilhar os gráficos do cache
+def test_disciplinas_iguais_tem_assinaturas_diferentes():
+    indice = IndiceEstatisticas(planilha_com_colunas_iguais())
+    assert indice.assinaturas["Matemática"] != indice.assinaturas["História"]
+    assert indice.assinaturas["Total4 Final"] != indice.assinaturas["Final score"]
+
+
+def test_assinaturas_estaveis_na_atualizacao():
+    df = planilha_com_colunas_iguais()
+    indice = IndiceEstatisticas(df)
+    corrigida = df.copy()
+    corrigida.loc[0, "Total4 Final"] = 9.0
+    novo, _, colunas = indice.atualizado(corrigida)
+    assert list(colunas) == [indice.posicao["Total4 Final"]]
+    assert novo.assinaturas["Final score"] == indice.assinaturas["Final score"]
+    assert novo.assinaturas["Total4 Final"] != indice.assinaturas["Total4 Final"]
+    assert novo.assinaturas == IndiceEstatisticas(corrigida).assinaturas
+
+
+# As notas ficam só nos dados compactos: nenhum array do índice (nem dos mapas de
+# coortes) guarda a matriz decodificada, que é calculada de novo a cada acesso
+def test_indice_nao_guarda_matriz_decodificada():
+    indice = IndiceEstatisticas(planilha_com_colunas_iguais())
+    forma = (len(indice.numeros), len(indice.disciplinas))
+    guardados = list(vars(indice).values()) + list(vars(indice.coortes).values())
+    assert not any(isinstance(valor, np.ndarray) and valor.shape == forma for valor in guardados)
+    assert indice.matriz is not indice.matriz
+    np.testing.assert_array_equal(indice.notas("Final score"), [7.5, 6.0, 8.2, 5.1])
+    assert indice.coortes.contar(indice.coortes.condicao("Total4 Final", ">", 7)) == 2
+
+
+# O índice atualizado só nas disciplinas e estudantes alterados é igual ao recalculado
+def test_atualizado_igual_ao_indice_completo():
+    gerador = np.random.default_rng(3)
+    notas = np.round(gerador.uniform(0, 10, (200, 4)), 1)
+    notas[gerador.random(notas.shape) < 0.1] = np.nan
+    df = normalizar_planilha(pd.DataFrame({
+        "Numero": np.arange(1, 201), "Nome": [f"Aluno {i}" for i in range(200)],
+        "Matemática": notas[:, 0], "História": notas[:, 1], "Geografia": notas[:, 2], "Final score": notas[:, 3],
+    }))
+    corrigida = df.copy()
+    corrigida.loc[[5, 50, 150], "História"] = [10.0, np.nan, 0.5]
+    corrigida.loc[7, "Final score"] = 9.9
+
+    novo, linhas, colunas = IndiceEstatisticas(df).atualizado(corrigida)
+    completo = IndiceEstatisticas(corrigida)
+    assert list(linhas) == [5, 7, 50, 150]
+    assert list(colunas) == [1, 3]
+    for atributo in ("contagens", "medias", "desvios", "medianas", "quantis", "histogramas", "medias_estudantes"):
+        np.testing.assert_allclose(getattr(novo, atributo), getattr(completo, atributo), rtol=1e-9, err_msg=atributo)
+    for disciplina in completo.disciplinas:
+        np.testing.assert_array_equal(novo.rankings[disciplina], completo.rankings[disciplina])
+    np.testing.assert_array_equal(novo.ranking_medias, completo.ranking_medias)
+    assert novo.assinaturas == completo.assinaturas
@@ -0,0 +1,22 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from graficos import figura_normal_disciplina, figura_ranking
+
+
+# Título e eixo acompanham a coluna usada no ranking
+def test_figura_ranking_rotulos_da_coluna():
+    figura = figura_ranking(["Ana", "Bruno"], [9.0, 7.5], ["green", "green"], "Média Geral", "1º Bimestre")
+    assert figura.layout.title.text == "Ranking de Estudantes por Média Geral - 1º Bimestre"
+    assert figura.layout.yaxis.title.text == "Média Geral"
+
+
+# Disciplina sem notas (desvio nulo ou NaN): gráfico sem curva e sem avisos do NumPy
+@pytest.mark.parametrize("desvio", [np.nan, 0.0, -0.0])
+def test_figura_normal_disciplina_sem_desvio(desvio):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        figura = figura_normal_disciplina(["Ana", "Bruno"], [np.nan, np.nan], np.nan, desvio, "Matemática")
+    assert figura.layout.yaxis.range[1] == 0.5
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import historico
+from ingestao import normalizar_planilha, validar_planilha
+
+
+def planilha_com_numero_repetido():
+    return normalizar_planilha(pd.DataFrame({
+        "Numero": [1, 2, 2],
+        "Nome": ["Ana", "Bruno", "Bruna"],
+        "Matemática": [7.0, 5.0, np.nan],
+        "Final score": [7.5, 6.0, 8.0],
+    }))
+
+
+# Um Numero repetido é recusado com a mesma mensagem da validação da ingestão,
+# sem gravar nada no histórico
+def test_gravar_bimestre_recusa_numero_repetido(tmp_path):
+    caminho = str(tmp_path / "historico.db")
+    df = planilha_com_numero_repetido()
+    with pytest.raises(ValueError, match=r"'Numero' repetido: \[2\]") as erro:
+        historico.gravar_bimestre("1A", "1º Bimestre", df, caminho=caminho)
+    assert validar_planilha(df) == [str(erro.value)]
+    assert historico.turmas(caminho=caminho) == []
+
+
+def test_gravar_bimestre_grava_so_o_que_mudou(tmp_path):
+    caminho = str(tmp_path / "historico.db")
+    df = planilha_com_numero_repetido().iloc[:2]
+    assert historico.gravar_bimestre("1A", "1º Bimestre", df, caminho=caminho) == 6  # 2 estudantes e 4 notas
+    assert historico.gravar_bimestre("1A", "1º Bimestre", df, caminho=caminho) == 0
+    corrigida = df.copy()
+    corrigida.loc[1, "Matemática"] = np.nan
+    assert historico.gravar_bimestre("1A", "1º Bimestre", corrigida, caminho=caminho) == 1
+    assert historico.contar("1A", "1º Bimestre", "Matemática", caminho=caminho) == 1
@@ -0,0 +1,34 @@
+import io
+
+import pandas as pd
+
+from ingestao import arquivos_em_cache, carregar_planilhas, ler_planilha
+
+
+def pasta_de_trabalho():
+    arquivo = io.BytesIO()
+    with pd.ExcelWriter(arquivo) as escritor:
+        pd.DataFrame({"Numero": [1, 2], "Nome": ["Ana", "Bruno"], "Final score": [7.0, 5.5]}).to_excel(
+            escritor, sheet_name="1A", index=False)
+        pd.DataFrame({"Nome": ["Carla"], "Final score": [8.0]}).to_excel(escritor, sheet_name="Rascunho", index=False)
+    return arquivo.getvalue()
+
+
+# Planilhas inválidas não vão para o cache, e os problemas voltam também nos próximos envios
+def test_carregar_planilhas_ignora_planilhas_invalidas(tmp_path):
+    dados = pasta_de_trabalho()
+    for _ in range(2):
+        hash_arquivo, nomes, problemas = carregar_planilhas(dados, str(tmp_path), "notas.xlsx")
+        assert nomes == ["1A"]
+        assert problemas == {"Rascunho": ["coluna obrigatória ausente: 'Numero'"]}
+    assert ler_planilha(hash_arquivo, "1A", str(tmp_path))["Numero"].tolist() == [1, 2]
+    assert arquivos_em_cache(str(tmp_path))[0]["problemas"] == problemas
+
+
+def test_carregar_planilhas_sem_planilhas_validas(tmp_path):
+    arquivo = io.BytesIO()
+    pd.DataFrame({"Nome": ["Ana"]}).to_excel(arquivo, sheet_name="Planilha1", index=False)
+    _, nomes, problemas = carregar_planilhas(arquivo.getvalue(), str(tmp_path), "notas.xlsx")
+    assert nomes == []
+    assert set(problemas) == {"Planilha1"}
+    assert arquivos_em_cache(str(tmp_path)) == []
@@ -0,0 +1,26 @@
+import gc
+import tracemalloc
+
+from instrumentacao import Instrumentacao
+
+
+# O tracemalloc fica ligado só enquanto houver reruns medidos em andamento
+def test_tracemalloc_desligado_ao_finalizar():
+    primeiro = Instrumentacao(ativo=True)
+    segundo = Instrumentacao(ativo=True)
+    assert tracemalloc.is_tracing()
+    assert primeiro.finalizar()["pico_memoria_bytes"] is not None
+    assert tracemalloc.is_tracing()
+    segundo.finalizar()
+    segundo.finalizar()
+    assert not tracemalloc.is_tracing()
+    Instrumentacao(ativo=False).finalizar()
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracemalloc_desligado_em_rerun_interrompido():
+    medidor = Instrumentacao(ativo=True)
+    assert tracemalloc.is_tracing()
+    del medidor
+    gc.collect()
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from trabalhos import FilaTrabalhos
+
+
+@pytest.fixture
+def fila():
+    fila = FilaTrabalhos(trabalhadores=1, limite_fila=2, processos=False)
+    yield fila
+    fila.encerrar()
+
+
+# As métricas são atualizadas logo depois que o resultado fica disponível
+def metricas_finais(fila):
+    limite = time.monotonic() + 5
+    while fila.metricas()["pendentes"] and time.monotonic() < limite:
+        time.sleep(0.01)
+    return fila.metricas()
+
+
+def test_pedidos_iguais_sao_calculados_uma_vez(fila):
+    liberar = threading.Event()
+    chamadas = []
+
+    def calcular(valor):
+        chamadas.append(valor)
+        liberar.wait(5)
+        return valor * 2
+
+    primeiro = fila.enviar(("turma", "boxplot"), calcular, 21)
+    segundo = fila.enviar(("turma", "boxplot"), calcular, 21)
+    sem_chave = fila.enviar(None, calcular, 1)  # Sem chave: nunca coalescido
+    liberar.set()
+    assert primeiro is segundo
+    assert (primeiro.result(5), segundo.result(5), sem_chave.result(5)) == (42, 42, 2)
+    assert sorted(chamadas) == [1, 21]
+    # Terminado o cálculo, a mesma chave é calculada de novo
+    assert fila.executar(("turma", "boxplot"), calcular, 5) == 10
+    metricas = metricas_finais(fila)
+    assert (metricas["concluidos"], metricas["coalescidos"], metricas["pendentes"]) == (3, 1, 0)
+
+
+def test_envio_espera_vaga_quando_a_fila_esta_cheia(fila):
+    liberar = threading.Event()
+    futuros = [fila.enviar(None, liberar.wait, 5) for _ in range(fila.limite_fila)]
+    assert fila.metricas()["na_fila"] == fila.limite_fila - fila.trabalhadores
+
+    enviado = threading.Event()
+    threading.Thread(target=lambda: (fila.enviar(None, int, 7), enviado.set()), daemon=True).start()
+    assert not enviado.wait(0.2)  # Acima do limite: espera uma vaga
+    liberar.set()
+    assert enviado.wait(5)
+    assert all(futuro.result(5) for futuro in futuros)
+
+
+def test_falha_libera_a_chave_e_a_vaga(fila):
+    def falhar():
+        raise RuntimeError("erro no cálculo")
+
+    with pytest.raises(RuntimeError):
+        fila.executar("chave", falhar)
+    metricas_finais(fila)
+    assert fila.executar("chave", int, 3) == 3
+    metricas = metricas_finais(fila)
+    assert (metricas["falhas"], metricas["concluidos"], metricas["pendentes"]) == (1, 1, 0)
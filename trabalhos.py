@@ -0,0 +1,136 @@
+# Fila de trabalhos pesados compartilhada pelas sessões
+# Os cálculos caros (índices da turma, curvas normais de cada disciplina, boxplot) são
+# executados num conjunto limitado de trabalhadores, e não na thread de cada sessão:
+# muitas sessões abrindo a aba "Estatísticas da Turma" ao mesmo tempo enfileiram os
+# cálculos em vez de disputar todos os núcleos com as abas leves das outras sessões.
+# Pedidos com a mesma chave (dados + visão) enquanto o primeiro ainda não terminou
+# recebem o mesmo resultado, sem novo cálculo.
+#
+# Por padrão os trabalhadores são threads (as funções de NumPy liberam o GIL); com
+# HUMANITAS_FILA=processos são processos, e então as funções e os argumentos enviados
+# precisam ser serializáveis (funções de módulo e arrays NumPy).
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+TRABALHADORES = int(os.environ.get("HUMANITAS_TRABALHADORES", os.cpu_count() or 1))
+LIMITE_FILA = int(os.environ.get("HUMANITAS_LIMITE_FILA", 64))
+USAR_PROCESSOS = os.environ.get("HUMANITAS_FILA", "threads") == "processos"
+AMOSTRAS_LATENCIA = 1_000
+
+
+# Executado pelo trabalhador: devolve o resultado e os instantes de início e de fim
+# (relógio de parede, comparável entre processos)
+def _cronometrar(funcao, args):
+    inicio = time.time()
+    resultado = funcao(*args)
+    return resultado, inicio, time.time()
+
+
+# JSON de um gráfico Plotly construído no trabalhador (é o que o cache guarda)
+def figura_json(construir, *args):
+    return construir(*args).to_json()
+
+
+class FilaTrabalhos:
+    def __init__(self, trabalhadores=TRABALHADORES, limite_fila=LIMITE_FILA, processos=USAR_PROCESSOS):
+        self.trabalhadores = max(1, trabalhadores)
+        self.processos = processos
+        if processos:
+            self._executor = ProcessPoolExecutor(self.trabalhadores, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            self._executor = ThreadPoolExecutor(self.trabalhadores, thread_name_prefix="humanitas-trabalho")
+        # Trabalhos aceitos e ainda não concluídos (na fila ou executando); quem envia
+        # além do limite espera uma vaga
+        self._vagas = threading.BoundedSemaphore(max(limite_fila, self.trabalhadores))
+        self.limite_fila = max(limite_fila, self.trabalhadores)
+        self._em_andamento = {}  # chave -> Future, para a coalescência
+        self._trava = threading.Lock()
+        self.pendentes = 0
+        self.concluidos = 0
+        self.falhas = 0
+        self.coalescidos = 0
+        self._esperas = deque(maxlen=AMOSTRAS_LATENCIA)
+        self._duracoes = deque(maxlen=AMOSTRAS_LATENCIA)
+
+    # Envia funcao(*args) para a fila e devolve um Future com o resultado. Enquanto um
+    # trabalho com a mesma chave não termina, novos envios recebem o mesmo Future.
+    # Chave None desativa a coalescência.
+    def enviar(self, chave, funcao, *args):
+        with self._trava:
+            if chave is not None and chave in self._em_andamento:
+                self.coalescidos += 1
+                return self._em_andamento[chave]
+        self._vagas.acquire()
+        with self._trava:
+            if chave is not None and chave in self._em_andamento:  # Enviado enquanto esperava a vaga
+                self._vagas.release()
+                self.coalescidos += 1
+                return self._em_andamento[chave]
+            self.pendentes += 1
+            enviado = time.time()
+            futuro_trabalho = self._executor.submit(_cronometrar, funcao, args)
+            futuro = _Resultado(futuro_trabalho)
+            if chave is not None:
+                self._em_andamento[chave] = futuro
+        futuro_trabalho.add_done_callback(lambda feito: self._concluir(chave, futuro, enviado, feito))
+        return futuro
+
+    # Envia e espera o resultado
+    def executar(self, chave, funcao, *args):
+        return self.enviar(chave, funcao, *args).result()
+
+    def _concluir(self, chave, futuro, enviado, feito):
+        with self._trava:
+            self.pendentes -= 1
+            if chave is not None and self._em_andamento.get(chave) is futuro:
+                del self._em_andamento[chave]
+            if feito.cancelled() or feito.exception() is not None:
+                self.falhas += 1
+            else:
+                _, inicio, fim = feito.result()
+                self.concluidos += 1
+                self._esperas.append(max(0.0, inicio - enviado))
+                self._duracoes.append(fim - inicio)
+        self._vagas.release()
+
+    def metricas(self):
+        with self._trava:
+            esperas = np.array(self._esperas) * 1000
+            duracoes = np.array(self._duracoes) * 1000
+            return {
+                "trabalhadores": self.trabalhadores,
+                "tipo": "processos" if self.processos else "threads",
+                "limite_fila": self.limite_fila,
+                # Trabalhos aceitos ainda não concluídos além dos que os trabalhadores
+                # conseguem executar ao mesmo tempo
+                "na_fila": max(0, self.pendentes - self.trabalhadores),
+                "pendentes": self.pendentes,
+                "concluidos": self.concluidos,
+                "falhas": self.falhas,
+                "coalescidos": self.coalescidos,
+                "espera_media_ms": float(esperas.mean()) if esperas.size else 0.0,
+                "espera_p95_ms": float(np.percentile(esperas, 95)) if esperas.size else 0.0,
+                "execucao_media_ms": float(duracoes.mean()) if duracoes.size else 0.0,
+                "execucao_p95_ms": float(np.percentile(duracoes, 95)) if duracoes.size else 0.0,
+            }
+
+    def encerrar(self):
+        self._executor.shutdown(wait=True)
+
+
+# Future devolvido por FilaTrabalhos.enviar: o resultado sem os instantes medidos
+class _Resultado:
+    def __init__(self, futuro):
+        self._futuro = futuro
+
+    def result(self, timeout=None):
+        return self._futuro.result(timeout)[0]
+
+    def done(self):
+        return self._futuro.done()